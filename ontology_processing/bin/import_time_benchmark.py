@@ -0,0 +1,105 @@
+# Measure the cold-start import cost of each entry point. Every import runs in a fresh interpreter, so
+# nothing is cached between measurements, and the heavy third party packages it pulled in are listed.
+#
+# example: python3 ontology_processing/bin/import_time_benchmark.py -repeat 5
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = [
+    "ontology_processing.loader",
+    "ontology_processing.loader:load_graph",
+    "ontology_processing.loader:GraphQuery",
+    "ontology_processing.loader:MappedGraph",
+    "ontology_processing.loader:ValueScorer",
+    "ontology_processing.loader:apply_delta",
+    "ontology_processing.process_new_ontology_file",
+    "ontology_processing.graph_creation.make_graph",
+    "ontology_processing.visualize.visualize",
+]
+
+HEAVY_PACKAGES = [
+    "owlready2",
+    "pandas",
+    "validators",
+    "networkx",
+    "numpy",
+    "dash",
+    "plotly",
+    "matplotlib",
+    "pygraphviz",
+    "scipy",
+]
+
+MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    module = __import__({module!r}, fromlist=["_"])
+    if {name!r}:
+        getattr(module, {name!r})
+    error = None
+except Exception as e:
+    error = repr(e)
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "error": error,
+                  "heavy": [p for p in {heavy!r} if p in sys.modules]}}))
+"""
+
+
+def measure_entry_point(entry_point, repeat=3):
+    """
+    Import entry_point ("package.module" or "package.module:name") in repeat fresh interpreters.
+
+    output: dict with the median seconds, the import error (if any) and the heavy packages loaded
+    """
+    module, _, name = entry_point.partition(":")
+    code = MEASURE.format(module=module, name=name, heavy=HEAVY_PACKAGES)
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+    return {
+        "entry point": entry_point,
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "error": runs[0]["error"],
+        "heavy": runs[0]["heavy"],
+    }
+
+
+def main(args):
+    """
+    Print the median cold import time of every entry point.
+    """
+    entry_points = args.entry_points or ENTRY_POINTS
+    width = max(len(entry_point) for entry_point in entry_points)
+    for entry_point in entry_points:
+        result = measure_entry_point(entry_point, repeat=args.repeat)
+        line = f"{entry_point:<{width}}  {result['seconds'] * 1000:8.1f} ms  {', '.join(result['heavy'])}"
+        if result["error"]:
+            line += f"  (import failed: {result['error']})"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="measure the cold-start import time of the ontology_processing entry points"
+    )
+    parser.add_argument(
+        "entry_points",
+        type=str,
+        nargs="*",
+        help='modules to import, optionally with a name to access ("package.module:name")',
+    )
+    parser.add_argument(
+        "-repeat", type=int, default=3, help="number of fresh interpreters per entry point"
+    )
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,94 @@
+import hashlib
+
+
+class ClassClosure:
+    """
+    Memoized class membership, ancestors and descendants of the (reasoned) ontology classes.
+
+    build_attributes_dict asks for the ancestors of the same classes and the descendants of
+    the same super classes for every node, and checked class membership by scanning
+    onto.classes(). Here each closure is computed once per class and kept by IRI. When the
+    same ClassClosure is bound to the ontology of a later run (e.g. by the watch mode of
+    process_new_ontology_file.py) the closures are reused as long as the class hierarchy
+    did not change.
+
+    Sample Usage
+    ------------
+        closure = ClassClosure()
+        closure.bind(onto)
+        closure.labels(onto.get_parents_of(node))
+        closure.ancestor_labels(node_class)
+        closure.is_descendant(node_class, super_class)
+    """
+
+    def __init__(self):
+        self.fingerprint = None
+        self._classes = frozenset()
+        self._ancestor_labels = {}
+        self._descendant_iris = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hierarchy_fingerprint(classes):
+        """
+        Hash of the labels and class parents of every class.
+        """
+        classes = set(classes)
+        digest = hashlib.sha256()
+        for ontology_class in sorted(classes, key=lambda c: c.iri):
+            parents = sorted(
+                parent.iri
+                for parent in list(ontology_class.is_a)
+                + list(ontology_class.equivalent_to)
+                if parent in classes
+            )
+            digest.update(ontology_class.iri.encode("utf-8"))
+            digest.update(repr(list(ontology_class.label)).encode("utf-8"))
+            digest.update("\0".join(parents).encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def bind(self, onto):
+        """
+        Use the classes of onto. Memoized closures are dropped if its class hierarchy
+        differs from the one they were computed on.
+        """
+        classes = list(onto.classes())
+        fingerprint = self.hierarchy_fingerprint(classes)
+        if fingerprint != self.fingerprint:
+            self._ancestor_labels = {}
+            self._descendant_iris = {}
+            self.fingerprint = fingerprint
+        self._classes = frozenset(classes)
+
+    def is_class(self, thing):
+        return thing in self._classes
+
+    def labels(self, collection):
+        """
+        Labels of the ontology classes in collection (same as listify).
+        """
+        return [str(thing.label[0]) for thing in collection if thing in self._classes]
+
+    def ancestor_labels(self, ontology_class):
+        """
+        Labels of the ancestor classes of a class (including itself), as a tuple.
+        """
+        labels = self._ancestor_labels.get(ontology_class.iri)
+        if labels is None:
+            self.misses += 1
+            labels = self._ancestor_labels[ontology_class.iri] = tuple(
+                self.labels(ontology_class.ancestors())
+            )
+        else:
+            self.hits += 1
+        return labels
+
+    def is_descendant(self, thing, super_class):
+        descendants = self._descendant_iris.get(super_class.iri)
+        if descendants is None:
+            descendants = self._descendant_iris[super_class.iri] = frozenset(
+                descendant.iri for descendant in super_class.descendants()
+            )
+        return getattr(thing, "iri", None) in descendants
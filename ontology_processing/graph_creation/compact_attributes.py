@@ -0,0 +1,157 @@
+"""
+Compact node and edge attributes of the processed graph.
+
+"direct classes", "all classes" and the superclass buckets (e.g. "risk solution") repeat the
+same class names on thousands of nodes, each node holding its own list of its own strings,
+and every edge holds its own copy of its "type" string. compact_attributes rewrites them in
+place:
+    - class names, edge types and attribute names are interned with sys.intern
+    - class lists and personal / political value lists become hash-consed tuples, so every
+      node with the same classes (or values) shares one immutable tuple
+
+The attributes stay plain dicts holding str and tuple values, so existing consumers
+(indexing, iteration, json output) keep working. Shared objects are pickled once, so the
+sharing carries over to the saved gpickle and to every process that loads it. Consumers that
+need a mutable list have to copy it (list(G.nodes[node]["all classes"])).
+
+Sample Usage
+------------
+    attribute_memory_report(G)
+    compact_attributes(G)
+    attribute_memory_report(G)
+"""
+
+import argparse
+import sys
+
+from ontology_processing.graph_creation.source_table import deep_sizeof
+
+CLASS_ATTRIBUTES = ("direct classes", "all classes")
+VALUE_ATTRIBUTES = ("personal_values_10", "personal_values_19", "political_value")
+
+
+class AttributeInterner:
+    """
+    Canonical instances of strings and tuples: equal values are replaced by one shared object.
+    """
+
+    def __init__(self):
+        self._tuples = {}
+
+    @staticmethod
+    def string(value):
+        return sys.intern(value) if type(value) is str else value
+
+    def tuple(self, values):
+        values = tuple(self.string(value) for value in values)
+        return self._tuples.setdefault(values, values)
+
+    def __len__(self):
+        return len(self._tuples)
+
+
+def class_bucket_attributes(attributes):
+    """
+    Superclass bucket attributes of a node: attributes named after one of its classes.
+    """
+    all_classes = attributes.get("all classes") or ()
+    return [key for key in attributes if key in all_classes and key not in CLASS_ATTRIBUTES]
+
+
+def compact_attributes(G, interner=None):
+    """
+    Intern class names, edge types and attribute names and share the class and value
+    lists as tuples, in place.
+
+    output: the AttributeInterner used (can be passed again to share tuples across graphs)
+    """
+    if interner is None:
+        interner = AttributeInterner()
+    string = interner.string
+
+    for node, attributes in G.nodes(data=True):
+        buckets = class_bucket_attributes(attributes)
+        compacted = {}
+        for key, value in attributes.items():
+            if isinstance(value, (list, tuple)) and (
+                key in CLASS_ATTRIBUTES or key in VALUE_ATTRIBUTES or key in buckets
+            ):
+                value = interner.tuple(sorted(value) if key == "all classes" else value)
+            elif isinstance(value, dict):
+                value = {string(k): v for k, v in value.items()}
+            compacted[string(key)] = value
+        attributes.clear()
+        attributes.update(compacted)
+
+    for u, v, attributes in G.edges(data=True):
+        compacted = {string(key): value for key, value in attributes.items()}
+        if "type" in compacted:
+            compacted["type"] = string(compacted["type"])
+        attributes.clear()
+        attributes.update(compacted)
+    return interner
+
+
+def attribute_category(key, attributes):
+    if key in CLASS_ATTRIBUTES:
+        return "classes"
+    if key in VALUE_ATTRIBUTES:
+        return "values"
+    if key in ("properties", "data_properties"):
+        return key
+    if key in (attributes.get("all classes") or ()):
+        return "class buckets"
+    return "other"
+
+
+def attribute_memory_report(G, print_report=True):
+    """
+    Bytes held by the node and edge attributes, per attribute category. Objects shared between
+    nodes are counted once (in the category that reaches them first).
+
+    output: dict of category to bytes
+    """
+    seen = set()
+    report = {}
+    for node, attributes in G.nodes(data=True):
+        for key, value in attributes.items():
+            category = attribute_category(key, attributes)
+            report[category] = report.get(category, 0) + deep_sizeof(value, seen)
+    for u, v, attributes in G.edges(data=True):
+        for key, value in attributes.items():
+            category = "edge types" if key == "type" else "edge " + key
+            report[category] = report.get(category, 0) + deep_sizeof(value, seen)
+
+    if print_report:
+        width = max((len(category) for category in report), default=0)
+        for category, size in sorted(report.items(), key=lambda item: -item[1]):
+            print(f"{category:<{width}}  {size / 1e6:8.3f} MB")
+        print(f"{'total':<{width}}  {sum(report.values()) / 1e6:8.3f} MB")
+    return report
+
+
+def main(args):
+    """
+    Report the attribute memory of a processed graph before and after compacting it.
+
+    example: python3 compact_attributes.py "Climate_Mind_DiGraph.gpickle"
+    """
+    import networkx as nx
+
+    G = nx.read_gpickle(args.gpickle_file_path)
+    print("plain attributes:")
+    attribute_memory_report(G)
+    interner = compact_attributes(G)
+    print(f"\ncompacted attributes ({len(interner)} distinct tuples):")
+    attribute_memory_report(G)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="report node and edge attribute memory per category before and after compacting"
+    )
+    parser.add_argument(
+        "gpickle_file_path", type=str, help="path to the processed networkx gpickle"
+    )
+    args = parser.parse_args()
+    main(args)
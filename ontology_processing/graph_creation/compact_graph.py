@@ -0,0 +1,572 @@
+"""
+Compact, versioned binary format for the processed Climate Mind graph.
+
+Layout of a .cmgraph file (little endian):
+
+    magic       8 bytes   b"CMGRAPH\\0"
+    version     uint32
+    header_len  uint32
+    header      header_len bytes of UTF-8 JSON describing the sections below
+    padding     up to the next multiple of 8 bytes
+    sections    raw numpy arrays, each starting on a multiple of 8 bytes
+
+The sections hold:
+    - a string table (int64 offsets into a UTF-8 blob). Every node name, edge type, class
+      name, url... is stored once and referenced by its integer id everywhere else.
+    - node names (string ids, in node order; the position is the integer node id)
+    - CSR adjacency: indptr (int64, one per node + 1), indices (int32 target node ids) and an
+      edge type column (string ids, -1 when the edge has no "type", -2 when it is None)
+      aligned with indices
+    - columnar attribute tables for node and edge attributes. A column is one of
+        "str"       int32 string id per row (-1 when missing)
+        "str_list"  present flags, int64 offsets and int32 string ids. "sequence" is "list"
+                    or "tuple" when all the rows hold that type, "mixed" adds a section of
+                    per row tuple flags
+        "dict"      present flags and one child column per key (e.g. "properties")
+        "json"      int32 string id of the JSON encoding of the value (-1 when missing), plus
+                    per row tuple flags when some values are tuples
+
+Round trip
+----------
+Strings, None, numbers, booleans, lists and tuples, and dicts of those come back as they were
+written. Values are JSON encoded below the top level: tuples nested inside a value come back
+as lists, sets as lists and unknown objects (numpy scalars...) as their str(). The graph
+attributes (G.graph) are stored as JSON too.
+
+Sample Usage
+------------
+    save_graph_to_compact(G, output_folder_path)
+    graph = read_compact_graph(os.path.join(output_folder_path, "Climate_Mind_DiGraph.cmgraph"))
+    graph.successors("increase in greenhouse effect")
+    graph.node_attr("increase in greenhouse effect", "mitigation solutions")
+    G = graph.to_networkx()
+"""
+
+import argparse
+import json
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+
+MAGIC = b"CMGRAPH\0"
+VERSION = 2
+
+# edge type ids that are not strings
+_NO_EDGE_TYPE = -1
+_NONE_EDGE_TYPE = -2
+
+_MISSING = object()
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _align8(n):
+    return (n + 7) // 8 * 8
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, string):
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.ids[string] = string_id
+            self.strings.append(string)
+        return string_id
+
+    def arrays(self):
+        encoded = [string.encode("utf-8") for string in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return offsets, data
+
+
+def _infer_kind(values):
+    present = [v for v in values if v is not _MISSING]
+    if not present:
+        return "json"
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    if all(
+        isinstance(v, (list, tuple)) and all(isinstance(x, str) for x in v)
+        for v in present
+    ):
+        return "str_list"
+    if all(isinstance(v, dict) and all(isinstance(k, str) for k in v) for v in present):
+        return "dict"
+    return "json"
+
+
+def _encode_column(name, values, strings, sections):
+    """
+    Encode one attribute column. Appends the column's arrays to sections and returns the
+    column description stored in the header.
+    """
+
+    def add_section(array):
+        sections.append(array)
+        return len(sections) - 1
+
+    kind = _infer_kind(values)
+    meta = {"name": name, "kind": kind}
+    if kind == "str":
+        meta["ids"] = add_section(
+            np.array(
+                [-1 if v is _MISSING else strings.add(v) for v in values],
+                dtype=np.int32,
+            )
+        )
+    elif kind == "str_list":
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([0 if v is _MISSING else len(v) for v in values], out=offsets[1:])
+        meta["present"] = add_section(
+            np.array([v is not _MISSING for v in values], dtype=np.uint8)
+        )
+        tuples = [isinstance(v, tuple) for v in values if v is not _MISSING]
+        if all(tuples):
+            meta["sequence"] = "tuple"
+        elif not any(tuples):
+            meta["sequence"] = "list"
+        else:
+            meta["sequence"] = "mixed"
+            meta["tuples"] = add_section(
+                np.array([isinstance(v, tuple) for v in values], dtype=np.uint8)
+            )
+        meta["offsets"] = add_section(offsets)
+        meta["values"] = add_section(
+            np.array(
+                [strings.add(x) for v in values if v is not _MISSING for x in v],
+                dtype=np.int32,
+            )
+        )
+    elif kind == "dict":
+        keys = list(
+            dict.fromkeys(k for v in values if v is not _MISSING for k in v)
+        )
+        meta["present"] = add_section(
+            np.array([v is not _MISSING for v in values], dtype=np.uint8)
+        )
+        meta["children"] = [
+            _encode_column(
+                key,
+                [_MISSING if v is _MISSING else v.get(key, _MISSING) for v in values],
+                strings,
+                sections,
+            )
+            for key in keys
+        ]
+    else:
+        tuples = [isinstance(v, tuple) for v in values]
+        if any(tuples):
+            meta["tuples"] = add_section(np.array(tuples, dtype=np.uint8))
+        meta["ids"] = add_section(
+            np.array(
+                [
+                    -1
+                    if v is _MISSING
+                    else strings.add(json.dumps(v, default=_json_default))
+                    for v in values
+                ],
+                dtype=np.int32,
+            )
+        )
+    return meta
+
+
+def _encode_attribute_table(rows, strings, sections, skip=()):
+    keys = list(dict.fromkeys(k for row in rows for k in row if k not in skip))
+    return [
+        _encode_column(key, [row.get(key, _MISSING) for row in rows], strings, sections)
+        for key in keys
+    ]
+
+
+def write_compact_graph(G, outfile):
+    """
+    Write the networkx DiGraph G to the binary file object outfile in the compact format.
+    """
+    strings = _StringTable()
+    sections = []
+
+    def add_section(array):
+        sections.append(array)
+        return len(sections) - 1
+
+    nodes = list(G.nodes)
+    node_id = {node: i for i, node in enumerate(nodes)}
+
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    indices = []
+    edge_types = []
+    edge_rows = []
+    for i, node in enumerate(nodes):
+        for target, data in G.adj[node].items():
+            indices.append(node_id[target])
+            edge_type = data.get("type", _MISSING)
+            if edge_type is _MISSING:
+                edge_types.append(_NO_EDGE_TYPE)
+            elif edge_type is None:
+                edge_types.append(_NONE_EDGE_TYPE)
+            else:
+                edge_types.append(strings.add(edge_type))
+            edge_rows.append(data)
+        indptr[i + 1] = len(indices)
+
+    header = {
+        "version": VERSION,
+        "graph": json.loads(json.dumps(G.graph, default=_json_default)),
+        "num_nodes": len(nodes),
+        "num_edges": len(indices),
+        "node_names": add_section(
+            np.array([strings.add(str(node)) for node in nodes], dtype=np.int32)
+        ),
+        "indptr": add_section(indptr),
+        "indices": add_section(np.array(indices, dtype=np.int32)),
+        "edge_types": add_section(np.array(edge_types, dtype=np.int32)),
+        "node_columns": _encode_attribute_table(
+            [G.nodes[node] for node in nodes], strings, sections
+        ),
+        "edge_columns": _encode_attribute_table(
+            edge_rows, strings, sections, skip=("type",)
+        ),
+    }
+    string_offsets, string_data = strings.arrays()
+    header["string_offsets"] = add_section(string_offsets)
+    header["string_data"] = add_section(string_data)
+
+    offset = 0
+    layout = []
+    for array in sections:
+        array = np.ascontiguousarray(array)
+        layout.append(
+            {"dtype": array.dtype.str, "length": int(array.size), "offset": offset}
+        )
+        offset = _align8(offset + array.nbytes)
+    header["sections"] = layout
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    preamble = MAGIC + struct.pack("<II", VERSION, len(header_bytes)) + header_bytes
+    outfile.write(preamble)
+    outfile.write(b"\0" * (_align8(len(preamble)) - len(preamble)))
+
+    written = 0
+    for array, section in zip(sections, layout):
+        outfile.write(b"\0" * (section["offset"] - written))
+        data = np.ascontiguousarray(array).tobytes()
+        outfile.write(data)
+        written = section["offset"] + len(data)
+
+
+class _Column:
+    def __init__(self, meta, section):
+        self.name = meta["name"]
+        self.kind = meta["kind"]
+        self.ids = section(meta["ids"]) if "ids" in meta else None
+        self.present = section(meta["present"]) if "present" in meta else None
+        self.offsets = section(meta["offsets"]) if "offsets" in meta else None
+        self.values = section(meta["values"]) if "values" in meta else None
+        # files of version 1 did not record the sequence type, their lists stay lists
+        self.sequence = meta.get("sequence", "list")
+        self.tuples = section(meta["tuples"]) if "tuples" in meta else None
+        self.children = [_Column(child, section) for child in meta.get("children", [])]
+
+    def decode(self, row, string):
+        if self.kind == "str":
+            string_id = self.ids[row]
+            return _MISSING if string_id < 0 else string(string_id)
+        if self.kind == "json":
+            string_id = self.ids[row]
+            if string_id < 0:
+                return _MISSING
+            value = json.loads(string(string_id))
+            return tuple(value) if self.tuples is not None and self.tuples[row] else value
+        if not self.present[row]:
+            return _MISSING
+        if self.kind == "str_list":
+            value = [
+                string(string_id)
+                for string_id in self.values[self.offsets[row] : self.offsets[row + 1]]
+            ]
+            if self.sequence == "tuple" or (self.sequence == "mixed" and self.tuples[row]):
+                return tuple(value)
+            return value
+        value = {}
+        for child in self.children:
+            child_value = child.decode(row, string)
+            if child_value is not _MISSING:
+                value[child.name] = child_value
+        return value
+
+
+class CompactGraph:
+    """
+    Read-only view of a graph stored in the compact format. Serves node, neighbour and
+    attribute queries straight from the arrays, or rebuilds a networkx DiGraph.
+
+    Parameters
+    ----------
+    data : bytes of a .cmgraph file
+    """
+
+    def __init__(self, data):
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a compact Climate Mind graph file")
+        version, header_len = struct.unpack_from("<II", data, len(MAGIC))
+        if version > VERSION:
+            raise ValueError(
+                f"Compact graph format version {version} is newer than supported version {VERSION}"
+            )
+        header_start = len(MAGIC) + 8
+        header = json.loads(data[header_start : header_start + header_len])
+        data_start = _align8(header_start + header_len)
+
+        def section(index):
+            spec = header["sections"][index]
+            if not spec["length"]:
+                return np.empty(0, dtype=np.dtype(spec["dtype"]))
+            return np.frombuffer(
+                data,
+                dtype=np.dtype(spec["dtype"]),
+                count=spec["length"],
+                offset=data_start + spec["offset"],
+            )
+
+        self.version = version
+        self.graph = header["graph"]
+        self.num_nodes = header["num_nodes"]
+        self.num_edges = header["num_edges"]
+        self._string_offsets = section(header["string_offsets"])
+        self._string_data = section(header["string_data"])
+        self._strings = [None] * (len(self._string_offsets) - 1)
+        self._node_names = section(header["node_names"])
+        self.indptr = section(header["indptr"])
+        self.indices = section(header["indices"])
+        self.edge_types = section(header["edge_types"])
+        self._node_columns = [_Column(c, section) for c in header["node_columns"]]
+        self._node_column = {column.name: column for column in self._node_columns}
+        self._edge_columns = [_Column(c, section) for c in header["edge_columns"]]
+        self._node_ids = None
+        self._reverse = None
+
+    def string(self, string_id):
+        value = self._strings[string_id]
+        if value is None:
+            start, end = self._string_offsets[string_id : string_id + 2]
+            value = self._string_data[start:end].tobytes().decode("utf-8")
+            self._strings[string_id] = value
+        return value
+
+    def node_name(self, node_id):
+        return self.string(self._node_names[node_id])
+
+    def node_id(self, name):
+        if self._node_ids is None:
+            self._node_ids = {
+                self.node_name(i): i for i in range(self.num_nodes)
+            }
+        return self._node_ids[name]
+
+    def nodes(self):
+        return [self.node_name(i) for i in range(self.num_nodes)]
+
+    def successors(self, name):
+        node_id = self.node_id(name)
+        return [
+            self.node_name(target)
+            for target in self.indices[self.indptr[node_id] : self.indptr[node_id + 1]]
+        ]
+
+    def predecessors(self, name):
+        if self._reverse is None:
+            sources = np.repeat(
+                np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr)
+            )
+            order = np.argsort(self.indices, kind="stable")
+            reverse_indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(self.indices, minlength=self.num_nodes),
+                out=reverse_indptr[1:],
+            )
+            self._reverse = (reverse_indptr, sources[order])
+        reverse_indptr, reverse_indices = self._reverse
+        node_id = self.node_id(name)
+        return [
+            self.node_name(source)
+            for source in reverse_indices[
+                reverse_indptr[node_id] : reverse_indptr[node_id + 1]
+            ]
+        ]
+
+    def out_edges(self, name):
+        """
+        (target, edge type) pairs of the edges leaving a node.
+        """
+        node_id = self.node_id(name)
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        return [
+            (self.node_name(target), self._edge_type(edge_type))
+            for target, edge_type in zip(
+                self.indices[start:end], self.edge_types[start:end]
+            )
+        ]
+
+    def _edge_type(self, string_id):
+        return None if string_id < 0 else self.string(string_id)
+
+    def _edge_row(self, source, target):
+        source_id, target_id = self.node_id(source), self.node_id(target)
+        start, end = self.indptr[source_id], self.indptr[source_id + 1]
+        matches = np.nonzero(self.indices[start:end] == target_id)[0]
+        if not len(matches):
+            raise KeyError((source, target))
+        return start + matches[0]
+
+    def edge_type(self, source, target):
+        return self._edge_type(self.edge_types[self._edge_row(source, target)])
+
+    def edge_attrs(self, source, target):
+        return self._edge_attrs(self._edge_row(source, target))
+
+    def _edge_attrs(self, row):
+        attrs = {}
+        if self.edge_types[row] != _NO_EDGE_TYPE:
+            attrs["type"] = self._edge_type(self.edge_types[row])
+        for column in self._edge_columns:
+            value = column.decode(row, self.string)
+            if value is not _MISSING:
+                attrs[column.name] = value
+        return attrs
+
+    def node_attr(self, name, key, default=None):
+        column = self._node_column.get(key)
+        if column is None:
+            return default
+        value = column.decode(self.node_id(name), self.string)
+        return default if value is _MISSING else value
+
+    def node_attrs(self, name):
+        return self._node_attrs(self.node_id(name))
+
+    def _node_attrs(self, node_id):
+        attrs = {}
+        for column in self._node_columns:
+            value = column.decode(node_id, self.string)
+            if value is not _MISSING:
+                attrs[column.name] = value
+        return attrs
+
+    def to_networkx(self):
+        """
+        Rebuild the networkx DiGraph.
+        """
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.graph.update(self.graph)
+        names = self.nodes()
+        G.add_nodes_from(
+            (name, self._node_attrs(node_id)) for node_id, name in enumerate(names)
+        )
+        sources = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        G.add_edges_from(
+            (names[source], names[target], self._edge_attrs(row))
+            for row, (source, target) in enumerate(zip(sources, self.indices))
+        )
+        return G
+
+
+def read_compact_graph(path):
+    """
+    Load a .cmgraph file written by save_graph_to_compact.
+    """
+    with open(path, "rb") as f:
+        return CompactGraph(f.read())
+
+
+def benchmark_compact_graph(G, repeat=5):
+    """
+    Compare file size and load time of the gpickle and compact formats for the graph G.
+
+    output: dict of format to {"bytes", "seconds"} (also printed)
+    """
+    import networkx as nx
+
+    from ontology_processing.graph_creation.ontology_processing_utils import (
+        save_graph_to_compact,
+        save_graph_to_pickle,
+    )
+
+    def best_of(function):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    with tempfile.TemporaryDirectory() as folder:
+        save_graph_to_pickle(G, folder)
+        save_graph_to_compact(G, folder)
+        gpickle_path = os.path.join(folder, "Climate_Mind_DiGraph.gpickle")
+        compact_path = os.path.join(folder, "Climate_Mind_DiGraph.cmgraph")
+        results = {
+            "gpickle (read_gpickle)": {
+                "bytes": os.path.getsize(gpickle_path),
+                "seconds": best_of(lambda: nx.read_gpickle(gpickle_path)),
+            },
+            "compact (load only)": {
+                "bytes": os.path.getsize(compact_path),
+                "seconds": best_of(lambda: read_compact_graph(compact_path)),
+            },
+            "compact (to_networkx)": {
+                "bytes": os.path.getsize(compact_path),
+                "seconds": best_of(
+                    lambda: read_compact_graph(compact_path).to_networkx()
+                ),
+            },
+        }
+
+    for label, result in results.items():
+        print(
+            f"{label:>24}: {result['bytes'] / 1e6:8.2f} MB, {result['seconds'] * 1e3:9.2f} ms"
+        )
+    return results
+
+
+def main(args):
+    """
+    Benchmark the compact graph format against gpickle.
+
+    example: python3 compact_graph.py "Climate_Mind_DiGraph.gpickle"
+    """
+    import networkx as nx
+
+    G = nx.read_gpickle(args.gpickle_file_path)
+    benchmark_compact_graph(G, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="compare the compact graph format with gpickle for a processed graph"
+    )
+    parser.add_argument(
+        "gpickle_file_path", type=str, help="path to the processed networkx gpickle"
+    )
+    parser.add_argument(
+        "-repeat", type=int, default=5, help="number of timed runs per format"
+    )
+    args = parser.parse_args()
+    main(args)
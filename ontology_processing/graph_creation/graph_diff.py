@@ -0,0 +1,258 @@
+"""
+Structural diff between two processed Climate Mind graphs and delta patches to hot-apply it.
+
+Every node and edge gets a content hash of its attributes (canonical JSON, so dict order,
+tuples vs lists and set order don't matter). Diffing compares the hash dicts of both graphs,
+which is linear in the size of the graphs, and only the nodes and edges whose hash changed
+are compared attribute by attribute.
+
+A delta is a JSON compatible dict:
+
+    {
+        "format": "climate-mind-graph-delta", "version": 1,
+        "base": fingerprint of the old graph, "target": fingerprint of the new graph,
+        "graph": {"set": {...}, "unset": [...]},
+        "nodes": {"removed": [node...], "added": [[node, attrs]...],
+                  "changed": [[node, {"set": {...}, "unset": [...]}]...]},
+        "edges": {"removed": [[u, v]...], "added": [[u, v, attrs]...],
+                  "changed": [[u, v, {"set": {...}, "unset": [...]}]...]},
+    }
+
+Sample Usage
+------------
+    delta = diff_graphs(old_G, new_G)
+    save_delta(delta, "Climate_Mind_DiGraph.delta.json")
+    running_G = apply_delta(running_G, load_delta("Climate_Mind_DiGraph.delta.json"))
+
+Graph attributes that are not content (see RUNTIME_GRAPH_ATTRIBUTES, e.g. the side store of
+the gpickle) are left out of the hashes and the deltas and kept as they are by apply_delta.
+"""
+
+import argparse
+import hashlib
+import json
+
+from ontology_processing.graph_creation.side_store import LazyValue
+
+DELTA_FORMAT = "climate-mind-graph-delta"
+DELTA_VERSION = 1
+
+_HASH_BITS = 128
+
+# graph attributes holding runtime objects rather than graph content
+RUNTIME_GRAPH_ATTRIBUTES = ("side store",)
+
+
+class DeltaMismatchError(ValueError):
+    """
+    The graph a delta is applied to is not the graph the delta was computed from.
+    """
+
+
+def _json_default(value):
+    if isinstance(value, LazyValue):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=canonical_json)
+    if hasattr(value, "tolist"):
+        # numpy arrays and scalars
+        return value.tolist()
+    return str(value)
+
+
+def canonical_json(value):
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_json_default,
+    )
+
+
+def content_hash(value):
+    return hashlib.blake2b(
+        canonical_json(value).encode("utf-8"), digest_size=_HASH_BITS // 8
+    ).hexdigest()
+
+
+def content_graph_attributes(G):
+    return {
+        key: value for key, value in G.graph.items() if key not in RUNTIME_GRAPH_ATTRIBUTES
+    }
+
+
+def node_hashes(G):
+    return {node: content_hash(data) for node, data in G.nodes(data=True)}
+
+
+def edge_hashes(G):
+    return {(u, v): content_hash(data) for u, v, data in G.edges(data=True)}
+
+
+def graph_fingerprint(G, nodes=None, edges=None):
+    """
+    Order independent hash of the whole graph (sum of the node, edge and graph attribute
+    hashes), computed in linear time.
+    """
+    nodes = node_hashes(G) if nodes is None else nodes
+    edges = edge_hashes(G) if edges is None else edges
+    total = int(content_hash(["graph", content_graph_attributes(G)]), 16)
+    for node, digest in nodes.items():
+        total += int(content_hash(["node", node, digest]), 16)
+    for (u, v), digest in edges.items():
+        total += int(content_hash(["edge", u, v, digest]), 16)
+    return format(total % (1 << _HASH_BITS), "032x")
+
+
+def diff_attributes(old, new):
+    """
+    {"set": attributes added or changed in new, "unset": attributes missing from new}
+    """
+    changed = {
+        key: value
+        for key, value in new.items()
+        if key not in old or canonical_json(old[key]) != canonical_json(value)
+    }
+    return {"set": changed, "unset": [key for key in old if key not in new]}
+
+
+def diff_graphs(old_G, new_G):
+    """
+    Delta that turns old_G into new_G (see the module docstring for its layout).
+    """
+    old_nodes, new_nodes = node_hashes(old_G), node_hashes(new_G)
+    old_edges, new_edges = edge_hashes(old_G), edge_hashes(new_G)
+
+    nodes = {
+        "removed": [node for node in old_nodes if node not in new_nodes],
+        "added": [
+            [node, dict(new_G.nodes[node])]
+            for node in new_nodes
+            if node not in old_nodes
+        ],
+        "changed": [
+            [node, diff_attributes(old_G.nodes[node], new_G.nodes[node])]
+            for node, digest in new_nodes.items()
+            if node in old_nodes and old_nodes[node] != digest
+        ],
+    }
+    edges = {
+        "removed": [[u, v] for u, v in old_edges if (u, v) not in new_edges],
+        "added": [
+            [u, v, dict(new_G.edges[u, v])]
+            for u, v in new_edges
+            if (u, v) not in old_edges
+        ],
+        "changed": [
+            [u, v, diff_attributes(old_G.edges[u, v], new_G.edges[u, v])]
+            for (u, v), digest in new_edges.items()
+            if (u, v) in old_edges and old_edges[u, v] != digest
+        ],
+    }
+    return {
+        "format": DELTA_FORMAT,
+        "version": DELTA_VERSION,
+        "base": graph_fingerprint(old_G, old_nodes, old_edges),
+        "target": graph_fingerprint(new_G, new_nodes, new_edges),
+        "graph": diff_attributes(
+            content_graph_attributes(old_G), content_graph_attributes(new_G)
+        ),
+        "nodes": nodes,
+        "edges": edges,
+    }
+
+
+def is_empty_delta(delta):
+    return not (
+        delta["graph"]["set"]
+        or delta["graph"]["unset"]
+        or any(delta["nodes"].values())
+        or any(delta["edges"].values())
+    )
+
+
+def _apply_attributes(attributes, change):
+    for key in change["unset"]:
+        attributes.pop(key, None)
+    attributes.update(change["set"])
+
+
+def apply_delta(G, delta, check=True):
+    """
+    Apply a delta from diff_graphs to a copy of G. G itself is never modified, so on an error
+    the caller still holds the unpatched graph.
+
+    input: check = verify that G is the graph the delta was computed from, and that the
+                   result is the target graph (raises DeltaMismatchError)
+    output: the patched graph
+    """
+    if delta.get("format") != DELTA_FORMAT or delta.get("version", 0) > DELTA_VERSION:
+        raise ValueError("Not a supported Climate Mind graph delta")
+    if check and graph_fingerprint(G) != delta["base"]:
+        raise DeltaMismatchError("The graph is not the base graph of the delta")
+
+    # G.copy() copies the attribute dicts (not their values), which is all that is modified
+    patched = G.copy()
+    patched.remove_edges_from(tuple(edge) for edge in delta["edges"]["removed"])
+    patched.remove_nodes_from(delta["nodes"]["removed"])
+    patched.add_nodes_from(
+        (node, attributes) for node, attributes in delta["nodes"]["added"]
+    )
+    for node, change in delta["nodes"]["changed"]:
+        _apply_attributes(patched.nodes[node], change)
+    patched.add_edges_from(
+        (u, v, attributes) for u, v, attributes in delta["edges"]["added"]
+    )
+    for u, v, change in delta["edges"]["changed"]:
+        _apply_attributes(patched.edges[u, v], change)
+    _apply_attributes(patched.graph, delta["graph"])
+
+    if check and graph_fingerprint(patched) != delta["target"]:
+        raise DeltaMismatchError("Applying the delta did not produce the target graph")
+    return patched
+
+
+def save_delta(delta, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(canonical_json(delta))
+
+
+def load_delta(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def delta_summary(delta):
+    return ", ".join(
+        f"{len(delta[kind][change])} {kind} {change}"
+        for kind in ("nodes", "edges")
+        for change in ("added", "removed", "changed")
+    )
+
+
+def main(args):
+    """
+    Write the delta between two processed graphs.
+
+    example: python3 graph_diff.py old/Climate_Mind_DiGraph.gpickle new/Climate_Mind_DiGraph.gpickle delta.json
+    """
+    import networkx as nx
+
+    delta = diff_graphs(
+        nx.read_gpickle(args.old_gpickle_file_path),
+        nx.read_gpickle(args.new_gpickle_file_path),
+    )
+    save_delta(delta, args.delta_file_path)
+    print(delta_summary(delta))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="compute the delta patch between two processed networkx graphs"
+    )
+    parser.add_argument("old_gpickle_file_path", type=str, help="previous processed gpickle")
+    parser.add_argument("new_gpickle_file_path", type=str, help="new processed gpickle")
+    parser.add_argument("delta_file_path", type=str, help="path of the JSON delta to write")
+    args = parser.parse_args()
+    main(args)
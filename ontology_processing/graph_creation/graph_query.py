@@ -0,0 +1,241 @@
+"""
+Precomputed indexes over the processed Climate Mind graph for the backend feed queries.
+
+The feeds (adaptation solutions of an impact, myths and sources of a solution, mitigation
+solutions, general myths...) are otherwise answered by digging through the nested node
+attribute dicts of the DiGraph on every request. GraphQuery walks the graph once and keeps
+flat dicts of immutable tuples, so each accessor is a single dict lookup that returns a
+shared tuple without copying.
+
+Sample Usage
+------------
+    query = GraphQuery(G)   # or GraphQuery.from_gpickle("Climate_Mind_DiGraph.gpickle")
+    for solution in query.adaptation_solutions("increase in flooding"):
+        query.solution_myths(solution), query.solution_sources(solution)
+    query.mitigation_solutions()
+    query.nodes_of_class("risk solution")
+    query.causal_chain("increase in flooding")
+"""
+
+import argparse
+import time
+
+ROOT_NODE = "increase in greenhouse effect"
+
+_EMPTY = ()
+
+# node attribute written by the processing pipeline -> GraphQuery index holding it
+LIST_ATTRIBUTES = {
+    "adaptation solutions": "_adaptation_solutions",
+    "solution myths": "_solution_myths",
+    "impact myths": "_impact_myths",
+    "solution sources": "_solution_sources",
+    "myth sources": "_myth_sources",
+    "causal sources": "_causal_sources",
+    "mitigation solutions": "_mitigation_solutions",
+    "general myths": "_general_myths",
+}
+
+SOURCE_ATTRIBUTES = ("solution sources", "myth sources", "causal sources")
+
+
+class GraphQuery:
+    """
+    Read-only feed indexes built from the processed networkx DiGraph.
+
+    Every accessor returns a tuple (empty when the node has no entry). Orders are the ones
+    the processing pipeline stored: mitigation solutions sorted by CO2 reduced, general myths
+    by myth frequency. Adaptation solutions are not ranked, they come in causal path order.
+
+    Parameters
+    ----------
+    G : processed networkx DiGraph (the Climate_Mind_DiGraph.gpickle output)
+    """
+
+    def __init__(self, G):
+        for index in LIST_ATTRIBUTES.values():
+            setattr(self, index, {})
+        nodes_by_class = {}
+        nodes_by_direct_class = {}
+        self._causal_chain_distance = {}
+        self._causal_chain_parent = {}
+        # urls of a graph with interned sources (see source_table.intern_sources)
+        source_table = G.graph.get("source table")
+
+        for node, data in G.nodes(data=True):
+            for attribute, index in LIST_ATTRIBUTES.items():
+                values = data.get(attribute)
+                if values:
+                    if source_table is not None and attribute in SOURCE_ATTRIBUTES:
+                        values = [source_table[source_id] for source_id in values]
+                    getattr(self, index)[node] = tuple(values)
+            if "causal chain distance" in data:
+                self._causal_chain_distance[node] = data["causal chain distance"]
+            if "causal chain parent" in data:
+                self._causal_chain_parent[node] = data["causal chain parent"]
+            for node_class in data.get("all classes") or _EMPTY:
+                nodes_by_class.setdefault(node_class, []).append(node)
+            for node_class in data.get("direct classes") or _EMPTY:
+                nodes_by_direct_class.setdefault(node_class, []).append(node)
+
+        self._nodes_by_class = {
+            node_class: tuple(nodes) for node_class, nodes in nodes_by_class.items()
+        }
+        self._nodes_by_direct_class = {
+            node_class: tuple(nodes)
+            for node_class, nodes in nodes_by_direct_class.items()
+        }
+
+    @classmethod
+    def from_gpickle(cls, gpickle_file_path):
+        import networkx as nx
+
+        return cls(nx.read_gpickle(gpickle_file_path))
+
+    def impacts(self):
+        """
+        Nodes downstream of the root that have adaptation solutions.
+        """
+        return tuple(self._adaptation_solutions)
+
+    def adaptation_solutions(self, impact):
+        """
+        Solutions inhibiting the impact or a node on a causal path to it, in causal path
+        order from the root (the graph has no score to rank adaptation solutions by).
+        """
+        return self._adaptation_solutions.get(impact, _EMPTY)
+
+    def impact_myths(self, impact):
+        return self._impact_myths.get(impact, _EMPTY)
+
+    def solution_myths(self, solution):
+        return self._solution_myths.get(solution, _EMPTY)
+
+    def solution_sources(self, solution):
+        return self._solution_sources.get(solution, _EMPTY)
+
+    def myth_sources(self, myth):
+        return self._myth_sources.get(myth, _EMPTY)
+
+    def causal_sources(self, node):
+        return self._causal_sources.get(node, _EMPTY)
+
+    def mitigation_solutions(self, root=ROOT_NODE):
+        return self._mitigation_solutions.get(root, _EMPTY)
+
+    def general_myths(self, root=ROOT_NODE):
+        return self._general_myths.get(root, _EMPTY)
+
+    def nodes_of_class(self, node_class, direct=False):
+        """
+        Nodes of a class, including subclasses unless direct is True.
+        """
+        if direct:
+            return self._nodes_by_direct_class.get(node_class, _EMPTY)
+        return self._nodes_by_class.get(node_class, _EMPTY)
+
+    def classes(self):
+        return tuple(sorted(self._nodes_by_class))
+
+    def causal_chain_distance(self, node):
+        """
+        Number of causes_or_promotes edges from the root to node (None if not downstream).
+        """
+        return self._causal_chain_distance.get(node)
+
+    def causal_chain(self, node):
+        """
+        Shortest causal chain from the root to node, root first (empty if not downstream).
+        """
+        if node not in self._causal_chain_distance:
+            return _EMPTY
+        chain = [node]
+        while chain[-1] in self._causal_chain_parent:
+            chain.append(self._causal_chain_parent[chain[-1]])
+        return tuple(reversed(chain))
+
+
+def _feed_from_graph(G):
+    """
+    The feed walk the backend does directly on the DiGraph, used as benchmark baseline.
+    """
+    count = 0
+    for impact, solutions in G.nodes(data="adaptation solutions"):
+        count += len(G.nodes[impact].get("impact myths") or [])
+        for solution in solutions or []:
+            count += len(G.nodes[solution].get("solution myths") or [])
+            count += len(G.nodes[solution].get("solution sources") or [])
+    for solution in G.nodes[ROOT_NODE].get("mitigation solutions") or []:
+        count += len(G.nodes[solution].get("solution myths") or [])
+        count += len(G.nodes[solution].get("solution sources") or [])
+    count += len(G.nodes[ROOT_NODE].get("general myths") or [])
+    return count
+
+
+def _feed_from_query(query):
+    count = 0
+    for impact in query.impacts():
+        count += len(query.impact_myths(impact))
+        for solution in query.adaptation_solutions(impact):
+            count += len(query.solution_myths(solution))
+            count += len(query.solution_sources(solution))
+    for solution in query.mitigation_solutions():
+        count += len(query.solution_myths(solution))
+        count += len(query.solution_sources(solution))
+    count += len(query.general_myths())
+    return count
+
+
+def benchmark_graph_query(G, repeat=20):
+    """
+    Time the build of the indexes and compare the throughput of a full feed walk (every
+    impact with its solutions, myths and sources, plus mitigations and general myths)
+    against the same walk over the DiGraph attributes.
+
+    output: dict with the build time and feeds per second of both approaches (also printed)
+    """
+    start = time.perf_counter()
+    query = GraphQuery(G)
+    build_seconds = time.perf_counter() - start
+
+    def feeds_per_second(function, argument):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function(argument)
+        return repeat / (time.perf_counter() - start)
+
+    results = {
+        "build seconds": build_seconds,
+        "networkx feeds/s": feeds_per_second(_feed_from_graph, G),
+        "GraphQuery feeds/s": feeds_per_second(_feed_from_query, query),
+    }
+    print(f"GraphQuery built in {build_seconds * 1e3:.2f} ms")
+    print(f"networkx attribute walk: {results['networkx feeds/s']:10.1f} feeds/s")
+    print(f"GraphQuery indexes:      {results['GraphQuery feeds/s']:10.1f} feeds/s")
+    return results
+
+
+def main(args):
+    """
+    Benchmark GraphQuery against walking the DiGraph attributes.
+
+    example: python3 graph_query.py "Climate_Mind_DiGraph.gpickle"
+    """
+    import networkx as nx
+
+    G = nx.read_gpickle(args.gpickle_file_path)
+    benchmark_graph_query(G, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="benchmark the GraphQuery feed indexes for a processed graph"
+    )
+    parser.add_argument(
+        "gpickle_file_path", type=str, help="path to the processed networkx gpickle"
+    )
+    parser.add_argument(
+        "-repeat", type=int, default=20, help="number of timed feed walks"
+    )
+    args = parser.parse_args()
+    main(args)
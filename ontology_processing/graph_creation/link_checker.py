@@ -0,0 +1,219 @@
+"""
+Concurrent URL liveness checker for the causal, myth and solution sources.
+
+URLs are requested with asyncio on top of urllib (run in a thread pool, no extra dependency)
+with a bounded number of requests in flight, a minimum interval between two requests to the
+same host and a timeout per request. Answers (alive, or dead with a 404 / 410 status, also at
+the end of redirects) are kept in a JSON cache file with a time to live, so URLs shared by many
+nodes, or already checked on a previous run, are not requested again. Any other error status
+(401 / 403 / 429 bot blocking, 5xx server trouble...), timeouts, DNS, connection and protocol
+errors say nothing about the url: they are reported as unknown (None), never cached and never
+filtered out.
+
+Sample Usage
+------------
+    checker = LinkChecker(cache_path=os.path.join(output_folder_path, "link_cache.json"))
+    checker.check(["https://www.drawdown.org/", "https://example.com/gone"])
+    filter_dead_links(G, checker)
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import networkx as nx
+
+from ontology_processing.graph_creation.ontology_processing_utils import atomic_output_path
+
+SOURCE_ATTRIBUTES = ("causal sources", "myth sources", "solution sources")
+
+# servers that refuse HEAD requests answer with one of these, retry them with GET
+HEAD_REFUSED = (403, 405, 501)
+
+# the only statuses that say the url is gone
+DEAD_STATUSES = (404, 410)
+
+
+class LinkChecker:
+    """
+    Check which URLs are alive (answer with a status below 400) or dead (answer 404 or 410).
+
+    Parameters
+    ----------
+    cache_path : JSON file to persist results in (None keeps them in memory only)
+    ttl : seconds a cached result stays valid
+    concurrency : maximum number of requests in flight
+    per_host_interval : minimum seconds between two requests to the same host
+    timeout : seconds before a request counts as failed
+    """
+
+    def __init__(
+        self,
+        cache_path=None,
+        ttl=7 * 24 * 3600,
+        concurrency=16,
+        per_host_interval=0.5,
+        timeout=10,
+        user_agent="climatemind-ontology-processing link checker",
+    ):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.per_host_interval = per_host_interval
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.cache = self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # a corrupt cache only costs re-checking the urls
+            return {}
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        with atomic_output_path(self.cache_path) as temp_path:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f, indent=1, sort_keys=True)
+
+    def _cached(self, url, now):
+        entry = self.cache.get(url)
+        # older caches also stored unreachable urls (no status) and other error statuses
+        if entry is None or now - entry["checked"] >= self.ttl:
+            return None
+        return is_alive(entry.get("status"))
+
+    def _request(self, url):
+        """
+        Blocking request of a url, returns the HTTP status (None when unreachable).
+        """
+        for method in ("HEAD", "GET"):
+            request = urllib.request.Request(
+                url, method=method, headers={"User-Agent": self.user_agent}
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return response.status
+            except urllib.error.HTTPError as error:
+                if method == "HEAD" and error.code in HEAD_REFUSED:
+                    continue
+                return error.code
+            except (
+                urllib.error.URLError,
+                http.client.HTTPException,
+                OSError,
+                ValueError,
+            ):
+                return None
+        return None
+
+    async def _check_one(self, url, loop, executor, semaphore, host_locks, host_last):
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        lock = host_locks.setdefault(host, asyncio.Lock())
+        # throttle per host before taking a request slot, so the urls of one busy host wait
+        # on their host lock instead of holding every slot
+        async with lock:
+            wait = host_last.get(host, float("-inf")) + self.per_host_interval
+            delay = wait - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await semaphore.acquire()
+            host_last[host] = loop.time()
+        try:
+            status = await loop.run_in_executor(executor, self._request, url)
+        finally:
+            semaphore.release()
+        alive = is_alive(status)
+        if alive is not None:
+            self.cache[url] = {"alive": alive, "status": status, "checked": time.time()}
+        return url, alive
+
+    async def check_async(self, urls):
+        """
+        Check urls concurrently, using cached results that are still fresh.
+
+        output: dict of url to True (alive) / False (dead) / None (unknown)
+        """
+        now = time.time()
+        results = {}
+        to_check = []
+        for url in dict.fromkeys(urls):
+            alive = self._cached(url, now)
+            if alive is None:
+                to_check.append(url)
+            else:
+                results[url] = alive
+
+        if to_check:
+            loop = asyncio.get_running_loop()
+            semaphore = asyncio.Semaphore(self.concurrency)
+            host_locks, host_last = {}, {}
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                checked = await asyncio.gather(
+                    *(
+                        self._check_one(
+                            url, loop, executor, semaphore, host_locks, host_last
+                        )
+                        for url in to_check
+                    )
+                )
+            results.update(checked)
+        return results
+
+    def check(self, urls):
+        """
+        Blocking version of check_async that also saves the cache.
+        """
+        results = asyncio.run(self.check_async(urls))
+        self.save_cache()
+        return results
+
+
+def is_alive(status):
+    """
+    True for a status below 400, False for 404 / 410, None (unknown) for anything else.
+    """
+    if status is None:
+        return None
+    if status < 400:
+        return True
+    if status in DEAD_STATUSES:
+        return False
+    return None
+
+
+def filter_dead_links(G, link_checker, attributes=SOURCE_ATTRIBUTES):
+    """
+    Remove the dead urls from the source attributes of every node. Unknown urls (None)
+    are kept. All urls are collected first and checked in one concurrent batch.
+
+    output: list of the urls removed
+    """
+    urls = []
+    for attribute in attributes:
+        for sources in nx.get_node_attributes(G, attribute).values():
+            urls.extend(sources or ())
+    alive = link_checker.check(urls)
+
+    for attribute in attributes:
+        nx.set_node_attributes(
+            G,
+            {
+                node: [url for url in sources if alive[url] is not False]
+                for node, sources in nx.get_node_attributes(G, attribute).items()
+                if sources
+            },
+            attribute,
+        )
+    return [url for url, is_alive in alive.items() if is_alive is False]
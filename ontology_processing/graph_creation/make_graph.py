@@ -1,67 +1,155 @@
-import pickle
-import argparse
-import networkx as nx
-import pandas as pd
-import validators
+import os
+import logging
 
 import owlready2
-from owlready2 import sync_reasoner
-from collections import OrderedDict
 
 from ontology_processing.graph_creation.ontology_processing_utils import (
-    give_alias,
     save_test_ontology_to_json,
-    save_graph_to_pickle,
+    save_graph_all_formats,
     get_valid_test_ont,
     get_non_test_ont,
-    remove_non_test_nodes,
-    get_test_ontology,
+    get_ontology_slice,
 )
 from ontology_processing.graph_creation.process_visualization import ProcessVisualization
 from ontology_processing.graph_creation.process_myths import ProcessMyths
 from ontology_processing.graph_creation.process_causal_sources import ProcessCausalSources
 from ontology_processing.graph_creation.make_graph_class import MakeGraph
+from ontology_processing.graph_creation.link_checker import LinkChecker, filter_dead_links
+from ontology_processing.graph_creation.value_scoring import save_value_matrices
+from ontology_processing.graph_creation.source_table import intern_sources
+from ontology_processing.graph_creation.compact_attributes import compact_attributes
+from ontology_processing.graph_creation.side_store import (
+    SIDE_STORE_FILE_NAME,
+    move_to_side_store,
+)
+from ontology_processing.graph_creation.phase_timings import PhaseTimings
+
+logger = logging.getLogger(__name__)
 
 # Set a lower JVM memory limit
 owlready2.reasoning.JAVA_MEMORY = 500
 
-def make_graph(onto_path, edge_path, output_folder_path):
-    mg = MakeGraph(onto_path, edge_path, output_folder_path)
-    mg.load_ontology()
-    mg.set_properties()
-    mg.automate_reasoning()
-    mg.add_edges_to_graph()
-    mg.build_attributes_dict()
-    to_remove = mg.set_edge_properties()
-    mg.remove_edge_properties_from_nodes(to_remove)
-    mg.make_acyclic()
-    mitigation_solutions, nodes_upstream_greenhouse_effect = mg.get_mitigations()
-    mg.add_mitigations(mitigation_solutions)
-    total_adaptation_nodes = mg.process_node_identity()
-    G = mg.get_graph()
-
-    annotated_graph = mg.get_annotated()
-    pv = ProcessVisualization(annotated_graph)
-    pv.annotate_graph_with_problems()
-    pv.get_subgraphs(total_adaptation_nodes, mitigation_solutions)
-    pv.save_output(output_folder_path)
-
-    pm = ProcessMyths(G)
-    subgraph_downstream_adaptations = pv.get_downstream_adaptations()
-    pm.process_myths(subgraph_downstream_adaptations, nodes_upstream_greenhouse_effect)
-    pm.add_general_myths()
-    G = pm.get_graph()
-
-    cs = ProcessCausalSources(G)
-    cs.process_sources()
-    G = cs.get_graph()
-
-    save_graph_to_pickle(G, output_folder_path)
-
-    T = G.copy()
-
-    valid_test_ont = get_valid_test_ont()
-    not_test_ont = get_non_test_ont()
-    get_test_ontology(T, valid_test_ont, not_test_ont)
-
-    save_test_ontology_to_json(T, output_folder_path)
\ No newline at end of file
+def save_mmap_artifact(G, output_folder_path, fname="Climate_Mind_DiGraph"):
+    """
+    Write the optional .cmmap artifact. Graphs the mmap format cannot hold (e.g. non integer
+    personal value scores) only log a warning, and a .cmmap left by an earlier run is removed
+    so it is never out of date with the other outputs.
+    """
+    try:
+        save_graph_all_formats(G, output_folder_path, formats=(".cmmap",), fname=fname)
+    except ValueError as error:
+        logger.warning("skipping the .cmmap output: %s", error)
+        stale_path = os.path.join(output_folder_path, fname + ".cmmap")
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
+
+def make_graph(
+    onto_path,
+    edge_path,
+    output_folder_path,
+    check_links=False,
+    intern_source_urls=False,
+    wait_for_edges=None,
+    timings=None,
+    class_closure=None,
+    java_memory=500,
+    compact_node_attributes=False,
+    side_store=False,
+):
+    """
+    Build the processed networkx graph from the ontology and the edge csv and save the outputs.
+
+    input: wait_for_edges = optional callable that blocks until edge_path has been written.
+                            It is called after reasoning, right before the edges are read, so
+                            edge extraction can run at the same time as loading and reasoning.
+           timings = PhaseTimings to record the phases in (a new one by default)
+           class_closure = ClassClosure to reuse memoized class closures from a previous run
+           java_memory = JVM memory limit of the reasoner in MB
+           compact_node_attributes = intern class names and edge types and share class and value lists
+                                     as tuples (see compact_attributes)
+           side_store = keep the comments and annotation properties of the nodes in a SQLite file next to
+                        the gpickle, loaded lazily on first access (see side_store.py). The other
+                        outputs keep them inline.
+    output: the processed networkx graph (also saved to output_folder_path)
+    """
+    if timings is None:
+        timings = PhaseTimings()
+
+    mg = MakeGraph(
+        onto_path,
+        edge_path,
+        output_folder_path,
+        class_closure=class_closure,
+        java_memory=java_memory,
+    )
+    with timings.phase("load ontology"):
+        mg.load_ontology()
+        mg.set_properties()
+    with timings.phase("reasoning"):
+        mg.automate_reasoning()
+    if wait_for_edges is not None:
+        with timings.phase("wait for edge extraction", wait=True):
+            wait_for_edges()
+    with timings.phase("build graph"):
+        mg.add_edges_to_graph()
+        mg.build_attributes_dict()
+        to_remove = mg.set_edge_properties()
+        mg.remove_edge_properties_from_nodes(to_remove)
+        mg.make_acyclic()
+        mitigation_solutions, nodes_upstream_greenhouse_effect = mg.get_mitigations()
+        mg.add_mitigations(mitigation_solutions)
+        total_adaptation_nodes = mg.process_node_identity()
+        mg.add_causal_chains()
+        G = mg.get_graph()
+
+    with timings.phase("visualization, myths and sources"):
+        annotated_graph = mg.get_annotated()
+        pv = ProcessVisualization(annotated_graph)
+        pv.annotate_graph_with_problems()
+        pv.get_subgraphs(total_adaptation_nodes, mitigation_solutions)
+        pv.save_output(output_folder_path)
+
+        pm = ProcessMyths(G)
+        subgraph_downstream_adaptations = pv.get_downstream_adaptations()
+        pm.process_myths(subgraph_downstream_adaptations, nodes_upstream_greenhouse_effect)
+        pm.add_general_myths()
+        G = pm.get_graph()
+
+        cs = ProcessCausalSources(G)
+        cs.process_sources()
+        G = cs.get_graph()
+
+    if check_links:
+        # drop causal, myth and solution source urls that no longer answer
+        with timings.phase("link check"):
+            link_checker = LinkChecker(
+                cache_path=os.path.join(output_folder_path, "link_cache.json")
+            )
+            filter_dead_links(G, link_checker)
+
+    with timings.phase("save outputs"):
+        # written before the sources are interned, the json does not carry the source table
+        T = get_ontology_slice(G, get_valid_test_ont(), get_non_test_ont())
+
+        save_test_ontology_to_json(T, output_folder_path)
+
+        if intern_source_urls:
+            # store each source url once in G.graph["source table"] and reference it by id
+            intern_sources(G)
+
+        if compact_node_attributes:
+            # shared class / value tuples and interned strings, also shared in the saved gpickle
+            compact_attributes(G)
+
+        formats = (".cmgraph",) if side_store else (".gpickle", ".cmgraph")
+        save_graph_all_formats(G, output_folder_path, formats=formats)
+        save_mmap_artifact(G, output_folder_path)
+        save_value_matrices(G, output_folder_path)
+
+        if side_store:
+            # the other outputs are written, only the gpickle gets the lazy attributes
+            move_to_side_store(G, os.path.join(output_folder_path, SIDE_STORE_FILE_NAME))
+            save_graph_all_formats(G, output_folder_path, formats=(".gpickle",))
+
+    return G
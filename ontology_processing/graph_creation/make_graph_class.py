@@ -1,8 +1,5 @@
-import pickle
-import argparse
 import networkx as nx
 import pandas as pd
-import validators
 
 import owlready2
 from owlready2 import sync_reasoner
@@ -18,9 +15,10 @@ from ontology_processing.graph_creation.ontology_processing_utils import (
     get_test_ontology,
     get_source_types,
     solution_sources,
-    listify,
     union_subgraph,
+    causal_chain_tree,
 )
+from ontology_processing.graph_creation.class_closure import ClassClosure
 
 class MakeGraph:
 
@@ -36,8 +34,16 @@ class MakeGraph:
     should be relatively digestible.
     """
 
-    def __init__(self, onto_path, edge_path, output_folder_path="."):
+    def __init__(
+        self,
+        onto_path,
+        edge_path,
+        output_folder_path=".",
+        class_closure=None,
+        java_memory=500,
+    ):
         self.onto_path = onto_path
+        self.java_memory = java_memory
         self.edge_path = edge_path
         self.output_folder_path = output_folder_path
         self.onto = None
@@ -48,6 +54,8 @@ class MakeGraph:
         self.B = None
         self.superclasses = None
         self.subgraph_mitigation = None
+        # memoized class closures, may be shared across runs (see ClassClosure)
+        self.class_closure = class_closure if class_closure is not None else ClassClosure()
 
     def load_ontology(self):
         """
@@ -76,8 +84,8 @@ class MakeGraph:
         and to deduce new fact in the ontology. Typically be reclassing Individuals to new Classes, 
         and Classes to new superclasses, depending on their relations.
         """
-        # Set a lower JVM memory limit
-        owlready2.reasoning.JAVA_MEMORY = 500
+        # Set a lower JVM memory limit (in MB)
+        owlready2.reasoning.JAVA_MEMORY = self.java_memory
         with self.onto:
             sync_reasoner()
 
@@ -93,6 +101,7 @@ class MakeGraph:
     def build_attributes_dict(self):
         cm_class = self.onto.search_one(label="climate mind")
         self.superclasses = list(cm_class.subclasses())
+        self.class_closure.bind(self.onto)
 
         # get annotation properties for all objects of the ontology (whether node or class)
         annot_properties = [
@@ -130,15 +139,15 @@ class MakeGraph:
         """
         Specifically, all the classes that node directly belongs to and all the ancestor nodes classes that the node should inherit.
         """
+        closure = self.class_closure
         class_objects = self.onto.get_parents_of(ontology_node)
-        attributes_dict["direct classes"] = listify(class_objects, self.onto)
+        attributes_dict["direct classes"] = closure.labels(class_objects)
         all_classes = []
         for parent in class_objects:
-            if parent in self.onto.classes():
-                all_classes.extend(parent.ancestors())
+            if closure.is_class(parent):
+                all_classes.extend(closure.ancestor_labels(parent))
 
-        list_classes = listify(all_classes, self.onto)
-        list_classes = list(set(list_classes))
+        list_classes = list(set(all_classes))
         if "climate mind" in list_classes:
             list_classes.remove("climate mind")
         attributes_dict["all classes"] = list_classes
@@ -146,8 +155,8 @@ class MakeGraph:
         # for each class in the classes associated with the node, list that class in the appropriate super_class in the attributes_dict and all of the ancestor classes of that class
         for node_class in class_objects:
             for super_class in self.superclasses:
-                if node_class in super_class.descendants():
-                    to_add = listify(node_class.ancestors(), self.onto)
+                if closure.is_descendant(node_class, super_class):
+                    to_add = list(closure.ancestor_labels(node_class))
                     if "climate mind" in to_add:
                         to_add.remove("climate mind")
                     if super_class in attributes_dict.keys():
@@ -558,11 +567,14 @@ class MakeGraph:
             total_adaptation_nodes.extend(node_adaptation_solutions)
         return total_adaptation_nodes
 
-
-
-
-
-
-
-
-
+    def add_causal_chains(self):
+        """
+        Store for every node downstream of "increase in greenhouse effect" its shortest causal
+        chain from it, as compact parent pointers: "causal chain distance" (number of
+        causes_or_promotes edges from the root) and "causal chain parent" (the node before it
+        on the chain; the root has none). Computed on the acyclic graph B in linear time.
+        Use get_causal_chain to read a chain back.
+        """
+        distance, parent = causal_chain_tree(self.B, "increase in greenhouse effect")
+        nx.set_node_attributes(self.G, distance, "causal chain distance")
+        nx.set_node_attributes(self.G, parent, "causal chain parent")
@@ -30,8 +30,9 @@ def outputEdges(onto_path, output_path, source):
     output: Saves a csv file of the list of result edges
         (list of object, subject, predicate triples)
     """
-    # load ontology
-    onto = get_ontology(onto_path).load()
+    # load ontology in its own World, so repeated calls in one process (batch and watch
+    # modes) don't share or accumulate ontologies in the default world
+    onto = World().get_ontology(onto_path).load()
 
     # make list of edges along all paths leaving the target node
     node_network = Network(onto, source)
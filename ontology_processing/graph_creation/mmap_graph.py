@@ -0,0 +1,275 @@
+"""
+Read-only, memory-mappable graph artifact for the climatemind-backend workers.
+
+Every array is fixed width and stored at an aligned offset of a single file, so a reader only
+has to numpy.memmap the file: nothing is unpickled or copied, and all worker processes on a
+host share the same physical pages through the OS page cache.
+
+Layout of a .cmmap file (little endian):
+
+    magic       8 bytes   b"CMGMMAP\\0"
+    version     uint32
+    header_len  uint32
+    header      header_len bytes of UTF-8 JSON (array dtypes, shapes and offsets, edge type table)
+    arrays      each starting on a multiple of 64 bytes
+
+Arrays:
+    string_offsets      int64 (S + 1)  offsets of node names in string_data
+    string_data         uint8          UTF-8 node names
+    name_order          int32 (N)      node ids sorted by name, for binary search lookups
+    indptr, indices     int64 (N + 1), int32 (E)   CSR adjacency of the out edges
+    edge_types          uint8 (E)      index into the header's edge type table
+    rev_indptr, rev_indices            CSR adjacency of the in edges
+    personal_values_10  int8 (N, 10)   MISSING_VALUE where the value is None
+    personal_values_19  int8 (N, 19)
+    political_value     int8 (N, 2)
+
+Sample Usage
+------------
+    save_graph_to_mmap(G, output_folder_path)
+    graph = MappedGraph(os.path.join(output_folder_path, "Climate_Mind_DiGraph.cmmap"))
+    node = graph.node_id("increase in greenhouse effect")
+    graph.successor_names(node)
+    graph.personal_values_10[node]
+"""
+
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b"CMGMMAP\0"
+VERSION = 1
+ALIGNMENT = 64
+
+# int8 value stored for personal / political values that are None
+MISSING_VALUE = -128
+
+VALUE_ARRAYS = {
+    "personal_values_10": 10,
+    "personal_values_19": 19,
+    "political_value": 2,
+}
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _value_matrix(G, nodes, attribute, width):
+    matrix = np.full((len(nodes), width), MISSING_VALUE, dtype=np.int8)
+    for i, node in enumerate(nodes):
+        values = G.nodes[node].get(attribute)
+        if not values:
+            continue
+        if isinstance(values, (str, bytes)) or len(values) > width:
+            raise ValueError(
+                f"{attribute} of node {node!r} is not a list of at most {width} values"
+            )
+        for j, value in enumerate(values):
+            if value is None:
+                continue
+            if (
+                not isinstance(value, (int, float, np.integer, np.floating))
+                or not -127 <= value <= 127
+                or value != int(value)
+            ):
+                raise ValueError(
+                    f"{attribute} of node {node!r} has value {value!r} which does not fit the mmap format"
+                )
+            matrix[i, j] = int(value)
+    return matrix
+
+
+def _csr(num_nodes, sources, targets):
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32), order
+
+
+def write_mmap_graph(G, outfile):
+    """
+    Write the networkx DiGraph G to the binary file object outfile in the mmap format.
+    """
+    nodes = list(G.nodes)
+    node_id = {node: i for i, node in enumerate(nodes)}
+
+    encoded = [str(node).encode("utf-8") for node in nodes]
+    string_offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=string_offsets[1:])
+    string_data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    name_order = np.array(
+        sorted(range(len(nodes)), key=lambda i: encoded[i]), dtype=np.int32
+    )
+
+    edge_type_table = []
+    edge_type_ids = {}
+    sources, targets, types = [], [], []
+    for source, target, edge_type in G.edges(data="type"):
+        if edge_type not in edge_type_ids:
+            edge_type_ids[edge_type] = len(edge_type_table)
+            edge_type_table.append(edge_type)
+        sources.append(node_id[source])
+        targets.append(node_id[target])
+        types.append(edge_type_ids[edge_type])
+    if len(edge_type_table) > 255:
+        raise ValueError("The mmap format supports at most 255 edge types")
+    sources = np.array(sources, dtype=np.int64)
+    targets = np.array(targets, dtype=np.int64)
+    types = np.array(types, dtype=np.uint8)
+
+    indptr, indices, order = _csr(len(nodes), sources, targets)
+    rev_indptr, rev_indices, _ = _csr(len(nodes), targets, sources)
+
+    arrays = {
+        "string_offsets": string_offsets,
+        "string_data": string_data,
+        "name_order": name_order,
+        "indptr": indptr,
+        "indices": indices,
+        "edge_types": types[order],
+        "rev_indptr": rev_indptr,
+        "rev_indices": rev_indices,
+    }
+    for attribute, width in VALUE_ARRAYS.items():
+        arrays[attribute] = _value_matrix(G, nodes, attribute, width)
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = {
+        "version": VERSION,
+        "num_nodes": len(nodes),
+        "num_edges": int(len(indices)),
+        "edge_types": edge_type_table,
+        "missing_value": MISSING_VALUE,
+        "arrays": layout,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    preamble = MAGIC + struct.pack("<II", VERSION, len(header_bytes)) + header_bytes
+    outfile.write(preamble)
+    outfile.write(b"\0" * (_align(len(preamble)) - len(preamble)))
+
+    written = 0
+    for name, array in arrays.items():
+        outfile.write(b"\0" * (layout[name]["offset"] - written))
+        data = np.ascontiguousarray(array).tobytes()
+        outfile.write(data)
+        written = layout[name]["offset"] + len(data)
+
+
+class MappedGraph:
+    """
+    Read-only graph backed by numpy.memmap arrays of a .cmmap file.
+
+    Node ids are integers; use node_id and node_name to convert from and to node names.
+    The personal value matrices are exposed directly (personal_values_10,
+    personal_values_19, political_value) for vectorized scoring.
+
+    Parameters
+    ----------
+    path : path of the .cmmap file written by save_graph_to_mmap
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            preamble = f.read(len(MAGIC) + 8)
+            if preamble[: len(MAGIC)] != MAGIC:
+                raise ValueError("Not a memory-mappable Climate Mind graph file")
+            version, header_len = struct.unpack_from("<II", preamble, len(MAGIC))
+            if version > VERSION:
+                raise ValueError(
+                    f"mmap graph format version {version} is newer than supported version {VERSION}"
+                )
+            header = json.loads(f.read(header_len))
+        data_start = _align(len(MAGIC) + 8 + header_len)
+
+        self.version = version
+        self.num_nodes = header["num_nodes"]
+        self.num_edges = header["num_edges"]
+        self.edge_type_names = header["edge_types"]
+        self.missing_value = header["missing_value"]
+        for name, spec in header["arrays"].items():
+            if np.prod(spec["shape"]) == 0:
+                array = np.empty(spec["shape"], dtype=np.dtype(spec["dtype"]))
+            else:
+                array = np.memmap(
+                    path,
+                    dtype=np.dtype(spec["dtype"]),
+                    mode="r",
+                    offset=data_start + spec["offset"],
+                    shape=tuple(spec["shape"]),
+                )
+            setattr(self, name, array)
+
+    def _name_bytes(self, node_id):
+        start, end = self.string_offsets[node_id], self.string_offsets[node_id + 1]
+        return self.string_data[start:end].tobytes()
+
+    def node_name(self, node_id):
+        return self._name_bytes(node_id).decode("utf-8")
+
+    def node_id(self, name):
+        """
+        Integer id of a node, found by binary search over the sorted names.
+        """
+        key = name.encode("utf-8")
+        low, high = 0, self.num_nodes
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(self.name_order[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.num_nodes:
+            node_id = int(self.name_order[low])
+            if self._name_bytes(node_id) == key:
+                return node_id
+        raise KeyError(name)
+
+    def successors(self, node_id):
+        return self.indices[self.indptr[node_id] : self.indptr[node_id + 1]]
+
+    def predecessors(self, node_id):
+        return self.rev_indices[self.rev_indptr[node_id] : self.rev_indptr[node_id + 1]]
+
+    def out_edges(self, node_id):
+        """
+        (target id, edge type name) pairs of the edges leaving a node.
+        """
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        return [
+            (int(target), self.edge_type_names[edge_type])
+            for target, edge_type in zip(
+                self.indices[start:end], self.edge_types[start:end]
+            )
+        ]
+
+    def successor_names(self, node_id, edge_type=None):
+        """
+        Names of the successors of a node, optionally only along edges of one type.
+        """
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        targets = self.indices[start:end]
+        if edge_type is not None:
+            if edge_type not in self.edge_type_names:
+                return []
+            type_id = self.edge_type_names.index(edge_type)
+            targets = targets[self.edge_types[start:end] == type_id]
+        return [self.node_name(target) for target in targets]
+
+    def values(self, node_id, attribute="personal_values_10"):
+        """
+        Personal or political values of a node as a list with None for missing values.
+        """
+        row = getattr(self, attribute)[node_id]
+        return [None if value == self.missing_value else int(value) for value in row]
@@ -1,8 +1,15 @@
 import networkx as nx
-from networkx.readwrite import json_graph
+import contextlib
+import gzip
+import json
+import lzma
 import os
+import tempfile
+import threading
+
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
-from collections import OrderedDict
 
 def custom_bfs(graph, start_node, direction="forward", edge_type="causes_or_promotes"):
     """
@@ -40,6 +47,47 @@ def custom_bfs(graph, start_node, direction="forward", edge_type="causes_or_prom
 
     return graph.subgraph(queue)
 
+
+def causal_chain_tree(graph, start_node, follow_type="causes_or_promotes"):
+    """
+    Breadth first search tree along follow_type edges from start_node, in linear time.
+
+    Parameters
+    ----------
+    graph - nx.DiGraph to explore (should be acyclic, e.g. the graph without feedback loops)
+    start_node - root of the causal chains
+    follow_type - only follow edges of this type
+    Returns
+    -------
+    (distance, parent) dicts: number of edges from start_node to each reached node, and the
+    node before it on one shortest causal chain (start_node has no parent)
+    """
+    distance = {start_node: 0}
+    parent = {}
+    queue = deque([start_node])
+    while queue:
+        node = queue.popleft()
+        for start, end, edge_type in graph.out_edges(node, "type"):
+            if edge_type == follow_type and end not in distance:
+                distance[end] = distance[node] + 1
+                parent[end] = node
+                queue.append(end)
+    return distance, parent
+
+
+def get_causal_chain(G, node):
+    """
+    Causal chain from the root ("increase in greenhouse effect") to node, following the
+    "causal chain parent" node attributes. Empty if node is not downstream of the root.
+    """
+    if "causal chain distance" not in G.nodes[node]:
+        return []
+    chain = [node]
+    while "causal chain parent" in G.nodes[chain[-1]]:
+        chain.append(G.nodes[chain[-1]]["causal chain parent"])
+    chain.reverse()
+    return chain
+
     
 def union_subgraph(subgraphs, *, base_graph):
     """
@@ -142,27 +190,53 @@ def get_non_test_ont():
     }
 
 
+def in_ontology_slice(classes, include, exclude):
+    """
+    A node is in a slice if one of its classes is included and none is excluded.
+    """
+    return not include.isdisjoint(classes) and exclude.isdisjoint(classes)
+
+
+def get_ontology_slice(
+    G, include, exclude=(), copy=True, class_attribute="direct classes"
+):
+    """
+    Subgraph of the nodes with a class in include and no class in exclude, with the
+    edges between them. Membership is decided in one pass over the class lists of all
+    nodes (including isolated ones) without mutating G.
+
+    input: include, exclude = collections of class names (e.g. get_valid_test_ont() and
+                              get_non_test_ont())
+           copy = return an independent compact copy. Otherwise a read-only view on G.
+    output: networkx DiGraph
+
+    example: T = get_ontology_slice(G, get_valid_test_ont(), get_non_test_ont())
+    """
+    include = frozenset(include)
+    exclude = frozenset(exclude)
+    members = [
+        node
+        for node, classes in G.nodes(data=class_attribute)
+        if in_ontology_slice(classes or (), include, exclude)
+    ]
+    view = G.subgraph(members)
+    return view.copy() if copy else view
+
+
 def remove_non_test_nodes(T, node, valid_test_ont, not_test_ont):
-    if node in T.nodes:
-        is_test_ont = False
-        for c in T.nodes[node]["direct classes"]:
-            if c in valid_test_ont:
-                is_test_ont = True
-            if c in not_test_ont:
-                is_test_ont = False
-                break
-        if not is_test_ont:
-            T.remove_node(node)
-        else:
-            is_test_ont = False
+    if node in T.nodes and not in_ontology_slice(
+        T.nodes[node]["direct classes"], set(valid_test_ont), set(not_test_ont)
+    ):
+        T.remove_node(node)
 
 
 def get_test_ontology(T, valid_test_ont, not_test_ont):
-    for edge in list(T.edges):
-        node_a = edge[0]
-        node_b = edge[1]
-        remove_non_test_nodes(T, node_a, valid_test_ont, not_test_ont)
-        remove_non_test_nodes(T, node_b, valid_test_ont, not_test_ont)
+    """
+    Remove in place every node of T that is not in the test ontology slice
+    (see get_ontology_slice).
+    """
+    members = get_ontology_slice(T, valid_test_ont, not_test_ont, copy=False)
+    T.remove_nodes_from([node for node in list(T.nodes) if node not in members])
 
 
 def give_alias(property_object):
@@ -174,21 +248,174 @@ def give_alias(property_object):
     return label_name
 
 
-def _save_graph_helper(G, outfile_path, fname="Climate_Mind_DiGraph", ext=".gpickle"):
+def write_jit_json(G, outfile, indent=4, compact=False):
+    """
+    Stream G to the text file object outfile in the same JIT JSON format as
+    networkx's json_graph.jit_data. One node record (with its adjacencies) is
+    serialized and written at a time instead of building the whole document in memory.
+
+    input: indent = indentation of the output (None writes everything on one line)
+           compact = drop the whitespace after separators (smallest output)
+    """
+    separators = (",", ":") if compact else None
+    if indent is not None:
+        record_separator = ",\n" + " " * indent
+        start, end = "[\n" + " " * indent, "\n]"
+    else:
+        record_separator = "," if compact else ", "
+        start, end = "[", "]"
+
+    first = True
+    for node in G.nodes():
+        json_node = {"id": node, "name": node, "data": G.nodes[node]}
+        if G[node]:
+            json_node["adjacencies"] = [
+                {"nodeTo": neighbour, "data": data}
+                for neighbour, data in G[node].items()
+            ]
+        record = json.dumps(json_node, indent=indent, separators=separators)
+        if indent is not None:
+            record = record.replace("\n", "\n" + " " * indent)
+        outfile.write(start if first else record_separator)
+        outfile.write(record)
+        first = False
+    outfile.write("[]" if first else end)
+
+
+GRAPH_FORMATS = (".gpickle", ".gexf", ".gml", ".graphml", ".json", ".cmgraph", ".cmmap")
+
+TEXT_FORMATS = (".json", ".yaml")
+
+COMPRESSION = {
+    None: ("", open),
+    "gzip": (".gz", gzip.open),
+    "lzma": (".xz", lzma.open),
+}
+
+
+_umask_lock = threading.Lock()
+_umask = None
+
+
+def output_file_mode(file_path):
+    """
+    Permissions for a new output file: those of the file it replaces, otherwise what open()
+    would give it under the process umask (0644 with the usual 022).
+    """
+    global _umask
+    try:
+        return os.stat(file_path).st_mode & 0o777
+    except FileNotFoundError:
+        pass
+    with _umask_lock:
+        if _umask is None:
+            # os.umask can only be read by setting it, done once and under a lock since
+            # the graph formats are written from several threads
+            _umask = os.umask(0o022)
+            os.umask(_umask)
+    return 0o666 & ~_umask
+
+
+@contextlib.contextmanager
+def atomic_output_path(file_path):
+    """
+    Yield a temporary path in the folder of file_path to write to. When the block succeeds the
+    temporary file gets the permissions of a normally created file (mkstemp makes it 0600) and
+    replaces file_path, so readers never see a partially written file. On error it is removed.
+    """
+    folder, name = os.path.split(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix="." + name + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield temp_path
+        os.chmod(temp_path, output_file_mode(file_path))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _save_graph_helper(
+    G,
+    outfile_path,
+    fname="Climate_Mind_DiGraph",
+    ext=".gpickle",
+    compression=None,
+    **writer_options,
+):
+    """
+    Write G to outfile_path/fname + ext (+ .gz or .xz when compressed), atomically (see
+    atomic_output_path).
+
+    output: path of the written file
+    """
+    # numpy based writers, imported here so loading the utils stays light
+    from ontology_processing.graph_creation.compact_graph import write_compact_graph
+    from ontology_processing.graph_creation.mmap_graph import write_mmap_graph
+
     writer = {
         ".gpickle": nx.write_gpickle,
         ".gexf": nx.write_gexf,
         ".gml": nx.write_gml,
         ".graphml": nx.write_graphml,
         #".yaml": nx.write_yaml,
-        ".json": lambda g, f: f.write(json_graph.jit_data(g, indent=4)),
+        ".json": write_jit_json,
+        ".cmgraph": write_compact_graph,
+        ".cmmap": write_mmap_graph,
     }
-    mode = "wb"
-    if ext in (".json", ".yaml"):
-        mode = "w"
-    file_path = os.path.join(outfile_path, fname + ext)
-    with open(file_path, mode) as outfile:
-        writer[ext](G, outfile)
+    suffix, opener = COMPRESSION[compression]
+    mode = "wt" if ext in TEXT_FORMATS else "wb"
+    file_path = os.path.join(outfile_path, fname + ext + suffix)
+    open_options = {"encoding": "utf-8"} if mode == "wt" else {}
+    with atomic_output_path(file_path) as temp_path:
+        with opener(temp_path, mode, **open_options) as outfile:
+            writer[ext](G, outfile, **writer_options)
+    return file_path
+
+
+def save_graph_all_formats(
+    G,
+    outfile_path,
+    formats=(".gpickle", ".json"),
+    fname="Climate_Mind_DiGraph",
+    max_workers=None,
+    compression=None,
+    json_indent=4,
+    json_compact=False,
+):
+    """
+    Write G in several formats concurrently, each one atomically (see _save_graph_helper).
+
+    Writers run on a thread pool: file writes and gzip/lzma compression release the GIL, so
+    slow formats overlap instead of running one after another.
+
+    input: formats = file extensions from GRAPH_FORMATS
+           compression = None, "gzip" or "lzma", applied to the text formats
+           json_indent, json_compact = options for the streaming JSON writer
+    output: dict mapping each format to the path written
+    """
+    unknown = [ext for ext in formats if ext not in GRAPH_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown graph formats {unknown}")
+
+    def save(ext):
+        options = {}
+        if ext == ".json":
+            options = {"indent": json_indent, "compact": json_compact}
+        return _save_graph_helper(
+            G,
+            outfile_path,
+            fname,
+            ext,
+            compression=compression if ext in TEXT_FORMATS else None,
+            **options,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(formats)) as executor:
+        futures = {ext: executor.submit(save, ext) for ext in formats}
+    # every writer has finished here; result() re-raises the first failure
+    return {ext: future.result() for ext, future in futures.items()}
 
 
 def save_graph_to_pickle(G, outfile_path, fname="Climate_Mind_DiGraph"):
@@ -207,12 +434,30 @@ def save_graph_to_graphml(G, outfile_path, fname="Climate_Mind_DiGraph"):
     _save_graph_helper(G, outfile_path, fname, ext=".graphml")
 
 
+def save_graph_to_compact(G, outfile_path, fname="Climate_Mind_DiGraph"):
+    """
+    Save in the compact binary format (see compact_graph.py), loaded with read_compact_graph.
+    """
+    _save_graph_helper(G, outfile_path, fname, ext=".cmgraph")
+
+
+def save_graph_to_mmap(G, outfile_path, fname="Climate_Mind_DiGraph"):
+    """
+    Save the read-only memory-mappable artifact (see mmap_graph.py), opened with MappedGraph.
+    """
+    _save_graph_helper(G, outfile_path, fname, ext=".cmmap")
+
+
 #def save_graph_to_yaml(G, outfile_path, fname="Climate_Mind_DiGraph"):
 #    _save_graph_helper(G, outfile_path, fname, ext=".yaml")
 
 
-def save_graph_to_json(G, outfile_path, fname="Climate_Mind_DiGraph"):
-    _save_graph_helper(G, outfile_path, fname, ext=".json")
+def save_graph_to_json(
+    G, outfile_path, fname="Climate_Mind_DiGraph", indent=4, compact=False, compression=None
+):
+    _save_graph_helper(
+        G, outfile_path, fname, ext=".json", compression=compression, indent=indent, compact=compact
+    )
 
 
 def save_test_ontology_to_json(G, outfile_path, fname="Climate_Mind_Digraph_Test_Ont"):
@@ -0,0 +1,237 @@
+"""
+Watch mode for process_new_ontology_file.py: keep one warm process that reprocesses every new
+OWL export dropped into an input folder.
+
+What is kept between runs:
+    - the imported Python modules (networkx, pandas, owlready2...)
+    - a ClassClosure with the memoized class ancestors / descendants, reused as long as the
+      class hierarchy of the new export is unchanged
+    - the published outputs of previous runs, by content hash of the OWL file. Re-exporting
+      an unchanged ontology just publishes the existing outputs again.
+
+The parsed owlready2 World can't be reused for a different file, and owlready2 starts a new
+JVM for every sync_reasoner call, so parsing and the reasoner cold start are still paid for
+each changed export.
+
+Outputs are published atomically: a run writes into a staging folder, which is renamed to
+output_folder/versions/<version> once complete, and the output_folder/latest symlink is
+then swapped to it with os.replace. Readers of latest never see a partial output folder.
+A side store (--side-store) is relocated to the version folder before the rename, so a plain
+nx.read_gpickle of a published version finds it.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+
+from ontology_processing.graph_creation.class_closure import ClassClosure
+from ontology_processing.graph_creation.phase_timings import PhaseTimings
+from ontology_processing.graph_creation.side_store import (
+    SIDE_STORE_FILE_NAME,
+    relocate_side_store,
+)
+
+logger = logging.getLogger(__name__)
+
+SOURCE_HASH_FILE = "source.sha256"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def swap_symlink(target, link_path):
+    """
+    Point link_path at target atomically (a new symlink replaces the old one).
+    """
+    temp_link = f"{link_path}.{os.getpid()}.tmp"
+    if os.path.lexists(temp_link):
+        os.remove(temp_link)
+    os.symlink(target, temp_link)
+    os.replace(temp_link, link_path)
+
+
+class OntologyWatcher:
+    """
+    Poll input_folder for new or changed .owl files and process them with process.
+
+    Parameters
+    ----------
+    input_folder : folder the OWL exports are saved to
+    output_folder_path : folder holding versions/ and the latest symlink
+    process : callable(onto_path, output_folder_path, timings=, class_closure=), usually
+              processOntology
+    poll_interval : seconds between two scans of input_folder
+    keep_versions : number of published versions to keep (older ones are deleted)
+
+    Sample Usage
+    ------------
+        watcher = OntologyWatcher("exports", "output", processOntology)
+        watcher.run_forever()
+    """
+
+    def __init__(
+        self,
+        input_folder,
+        output_folder_path,
+        process,
+        poll_interval=5.0,
+        keep_versions=5,
+    ):
+        self.input_folder = input_folder
+        self.output_folder_path = output_folder_path
+        self.process = process
+        self.poll_interval = poll_interval
+        self.keep_versions = keep_versions
+        self.class_closure = ClassClosure()
+        self.versions_folder = os.path.join(output_folder_path, "versions")
+        self.latest_link = os.path.join(output_folder_path, "latest")
+        os.makedirs(self.versions_folder, exist_ok=True)
+
+        # path -> (mtime, size) of the last scan, and of the last processed state
+        self._last_scan = {}
+        self._processed = {}
+        # content hash -> published version folder
+        self.published = self._find_published_versions()
+
+    def _find_published_versions(self):
+        published = {}
+        for version in sorted(os.listdir(self.versions_folder)):
+            hash_path = os.path.join(self.versions_folder, version, SOURCE_HASH_FILE)
+            if os.path.exists(hash_path):
+                with open(hash_path) as f:
+                    published[f.read().strip()] = os.path.join(
+                        self.versions_folder, version
+                    )
+        return published
+
+    def _stable_owl_files(self):
+        """
+        .owl files that are new or changed and whose size and modification time did not
+        change since the previous scan (so a file still being written is not picked up).
+        """
+        scan = {}
+        for name in sorted(os.listdir(self.input_folder)):
+            path = os.path.join(self.input_folder, name)
+            if name.lower().endswith(".owl") and os.path.isfile(path):
+                stat = os.stat(path)
+                scan[path] = (stat.st_mtime_ns, stat.st_size)
+        # oldest first, so the newest export ends up published as latest
+        ready = sorted(
+            (
+                path
+                for path, state in scan.items()
+                if self._last_scan.get(path) == state
+                and self._processed.get(path) != state
+            ),
+            key=lambda path: scan[path][0],
+        )
+        self._last_scan = scan
+        return ready, scan
+
+    def process_file(self, onto_path):
+        """
+        Process one OWL file (or reuse the outputs of an identical earlier export) and
+        publish the result as latest.
+
+        output: path of the published version folder
+        """
+        started = time.time()
+        source_hash = file_sha256(onto_path)
+        version_folder = self.published.get(source_hash)
+        if version_folder is not None and os.path.isdir(version_folder):
+            swap_symlink(os.path.abspath(version_folder), self.latest_link)
+            logger.info(
+                "%s is unchanged from %s, republished in %.2f s",
+                onto_path,
+                version_folder,
+                time.time() - started,
+            )
+            return version_folder
+
+        version = time.strftime("%Y%m%d-%H%M%S") + "-" + source_hash[:12]
+        staging_folder = os.path.join(self.output_folder_path, f".staging-{version}")
+        os.makedirs(staging_folder)
+        timings = PhaseTimings()
+        try:
+            self.process(
+                onto_path,
+                staging_folder,
+                timings=timings,
+                class_closure=self.class_closure,
+            )
+            with open(os.path.join(staging_folder, SOURCE_HASH_FILE), "w") as f:
+                f.write(source_hash + "\n")
+            version_folder = os.path.join(self.versions_folder, version)
+            if os.path.exists(os.path.join(staging_folder, SIDE_STORE_FILE_NAME)):
+                relocate_side_store(
+                    os.path.join(staging_folder, "Climate_Mind_DiGraph.gpickle"),
+                    version_folder,
+                )
+            os.rename(staging_folder, version_folder)
+        except BaseException:
+            shutil.rmtree(staging_folder, ignore_errors=True)
+            raise
+        swap_symlink(os.path.abspath(version_folder), self.latest_link)
+        self.published[source_hash] = version_folder
+        self._prune_versions()
+
+        logger.info(
+            "published %s from %s in %.2f s (class closure cache: %d hits, %d misses)",
+            version_folder,
+            onto_path,
+            time.time() - started,
+            self.class_closure.hits,
+            self.class_closure.misses,
+        )
+        return version_folder
+
+    def _prune_versions(self):
+        latest = os.path.realpath(self.latest_link)
+        versions = sorted(os.listdir(self.versions_folder))
+        for version in versions[: max(len(versions) - self.keep_versions, 0)]:
+            path = os.path.join(self.versions_folder, version)
+            if os.path.realpath(path) == latest:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            self.published = {
+                source_hash: folder
+                for source_hash, folder in self.published.items()
+                if folder != path
+            }
+
+    def run_once(self):
+        """
+        Scan the input folder once and process the files that are ready.
+
+        output: list of published version folders
+        """
+        ready, scan = self._stable_owl_files()
+        published = []
+        for onto_path in ready:
+            try:
+                published.append(self.process_file(onto_path))
+            except Exception:
+                # keep watching, the editor can export a fixed version
+                logger.exception("processing %s failed", onto_path)
+            self._processed[onto_path] = scan[onto_path]
+        return published
+
+    def run_forever(self):
+        logger.info(
+            "watching %s for .owl files, publishing to %s",
+            self.input_folder,
+            self.latest_link,
+        )
+        try:
+            while True:
+                self.run_once()
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("stopped watching %s", self.input_folder)
@@ -0,0 +1,100 @@
+"""
+Wall clock timings of the processing phases.
+
+Phases are recorded with time.time() so that phases timed in another process (e.g. the edge
+extraction of processOntology(concurrent=True)) line up with the ones of the main process,
+which makes overlapping phases visible in the summary. Phases spent waiting for another one
+(wait=True) are listed but not counted as work when the overlap is computed.
+
+Sample Usage
+------------
+    timings = PhaseTimings()
+    with timings.phase("reasoning"):
+        sync_reasoner()
+    timings.add("edge extraction", start, end)
+    with timings.phase("wait for edge extraction", wait=True):
+        wait_for_edges()
+    timings.log_summary()
+"""
+
+import contextlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseTimings:
+    """
+    Named (start, end) wall clock intervals, in the order they were recorded.
+    """
+
+    def __init__(self):
+        self.created = time.time()
+        self.phases = []
+        self.waits = set()
+
+    @contextlib.contextmanager
+    def phase(self, name, wait=False):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time(), wait=wait)
+
+    def add(self, name, start, end, wait=False):
+        self.phases.append((name, start, end))
+        if wait:
+            self.waits.add(name)
+        logger.info("%s took %.2f s", name, end - start)
+
+    def wall_clock(self):
+        if not self.phases:
+            return 0.0
+        return max(end for _, _, end in self.phases) - min(
+            start for _, start, _ in self.phases
+        )
+
+    def overlap(self):
+        """
+        Seconds saved by phases running at the same time: the summed duration of the work
+        phases minus the time covered by at least one of them. Wait phases are left out,
+        they lie inside the phase they wait for.
+        """
+        intervals = sorted(
+            (start, end) for name, start, end in self.phases if name not in self.waits
+        )
+        total = sum(end - start for start, end in intervals)
+        covered = 0.0
+        current_start = current_end = None
+        for start, end in intervals:
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    covered += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            covered += current_end - current_start
+        return max(total - covered, 0.0)
+
+    def summary(self):
+        """
+        One line per phase with its start offset and duration, followed by the total wall
+        clock time and the time saved by phases running at the same time.
+        """
+        if not self.phases:
+            return "no phases recorded"
+        origin = min(start for _, start, _ in self.phases)
+        width = max(len(name) for name, _, _ in self.phases)
+        width = max(width, len("overlap"))
+        lines = [
+            f"{name:<{width}}  starts {start - origin:8.2f} s  takes {end - start:8.2f} s"
+            for name, start, end in self.phases
+        ]
+        lines.append(f"{'wall clock':<{width}}  {self.wall_clock():8.2f} s")
+        lines.append(f"{'overlap':<{width}}  {self.overlap():8.2f} s")
+        return "\n".join(lines)
+
+    def log_summary(self):
+        logger.info("phase timings:\n%s", self.summary())
@@ -0,0 +1,427 @@
+"""
+Pre-flight validation of an OWL file, run before the ontology is loaded and reasoned.
+
+Some mistakes in the ontology only surface deep in a run, after minutes of parsing and JVM
+reasoning: a missing personal value data property (KeyError in add_personal_values), opposing
+1 / -1 values in one value group (raised by compute), a missing "climate mind" class, entities
+without a label... check_ontology reads the RDF/XML triples with the standard library in one
+linear pass and reports every problem at once, so a broken export fails in seconds.
+
+Only asserted triples are checked (nothing is inferred), and only RDF/XML files (the web
+protege export format) are parsed; other formats (Turtle, N-Triples...) are recognised from
+their first bytes and skipped with a warning.
+
+Sample Usage
+------------
+    report = check_ontology("climate_mind_ontology.owl")   # raises PreflightError on errors
+    report.warnings
+"""
+
+import argparse
+import logging
+import re
+import sys
+import urllib.parse
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+OWL = "http://www.w3.org/2002/07/owl#"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+ROOT_CLASS = "climate mind"
+MYTH_CLASS = "myth"
+
+# mitigation solutions inhibit a node upstream of this one (see MakeGraph.get_mitigations)
+GREENHOUSE_EFFECT = "increase in greenhouse effect"
+CAUSES = "causes_or_promotes"
+INHIBITED_BY = "is_inhibited_or_prevented_or_blocked_or_slowed_by"
+
+# start of an XML document: declaration, comment / doctype or an element (an N-Triples or
+# Turtle IRI like <http://...> is not an element name)
+XML_START = re.compile(rb"<(\?xml|!|[A-Za-z_][\w.-]*(:[A-Za-z_][\w.-]*)?[\s/>])")
+
+PERSONAL_VALUES_19 = (
+    "achievement",
+    "benevolence_caring",
+    "benevolence_dependability",
+    "conformity_interpersonal",
+    "conformity_rules",
+    "face",
+    "hedonism",
+    "humility",
+    "power_dominance",
+    "power_resources",
+    "security_personal",
+    "security_societal",
+    "self-direction_autonomy_of_action",
+    "self-direction_autonomy_of_thought",
+    "stimulation",
+    "tradition",
+    "universalism_concern",
+    "universalism_nature",
+    "universalism_tolerance",
+)
+
+# values collapsed into one of the 10 personal values by MakeGraph.compute
+VALUE_GROUPS = {
+    "benevolence": ("benevolence_caring", "benevolence_dependability"),
+    "conformity": ("conformity_interpersonal", "conformity_rules"),
+    "power": ("power_dominance", "power_resources"),
+    "security": ("security_personal", "security_societal"),
+    "self-direction": (
+        "self-direction_autonomy_of_action",
+        "self-direction_autonomy_of_thought",
+    ),
+    "universalism": (
+        "universalism_concern",
+        "universalism_nature",
+        "universalism_tolerance",
+    ),
+}
+
+POLITICAL_VALUES = ("conservative", "liberal")
+
+# data properties read by name while building the graph (after spaces are replaced by _)
+REQUIRED_DATA_PROPERTIES = PERSONAL_VALUES_19 + POLITICAL_VALUES + (
+    "CO2_eq_reduced",
+    "myth_frequency",
+)
+
+# data properties whose values are compared or sorted
+NUMERIC_DATA_PROPERTIES = ("CO2_eq_reduced", "myth_frequency")
+
+
+class PreflightError(Exception):
+    """
+    The ontology has problems that would make processing fail. errors lists all of them.
+    """
+
+    def __init__(self, onto_path, errors, warnings=()):
+        self.errors = list(errors)
+        self.warnings = list(warnings)
+        super().__init__(
+            f"{onto_path} failed the pre-flight check with {len(self.errors)} error(s):\n"
+            + "\n".join(f"  - {error}" for error in self.errors)
+        )
+
+
+class PreflightReport:
+    def __init__(self, errors, warnings, num_entities):
+        self.errors = errors
+        self.warnings = warnings
+        self.num_entities = num_entities
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+class _Entity:
+    __slots__ = ("types", "labels", "parents", "values", "links")
+
+    def __init__(self):
+        self.types = set()
+        self.labels = []
+        self.parents = []
+        # predicate IRI -> list of literal values
+        self.values = {}
+        # predicate IRI -> list of object IRIs
+        self.links = {}
+
+
+def looks_like_xml(onto_path):
+    """
+    Whether the file starts like an XML document (after whitespace and a byte order mark).
+    """
+    with open(onto_path, "rb") as f:
+        start = f.read(1024).lstrip(b"\xef\xbb\xbf").lstrip()
+    return XML_START.match(start) is not None
+
+
+def read_rdf_xml(onto_path):
+    """
+    Read the top level descriptions of an RDF/XML file.
+
+    output: dict of subject IRI to _Entity, or None if the file is not RDF/XML
+    """
+    root = ET.parse(onto_path).getroot()
+    if root.tag != f"{{{RDF}}}RDF":
+        return None
+    base = root.get(XML_BASE, "")
+
+    entities = {}
+    for element in root:
+        subject = element.get(f"{{{RDF}}}about")
+        if subject is None and element.get(f"{{{RDF}}}ID") is not None:
+            subject = "#" + element.get(f"{{{RDF}}}ID")
+        if subject is None:
+            # blank nodes (axiom annotations, restrictions...) are not checked
+            continue
+        subject = urllib.parse.urljoin(base, subject)
+        entity = entities.get(subject)
+        if entity is None:
+            entity = entities[subject] = _Entity()
+        if element.tag != f"{{{RDF}}}Description":
+            entity.types.add(element.tag.replace("{", "").replace("}", ""))
+
+        for child in element:
+            predicate = child.tag.replace("{", "").replace("}", "")
+            resource = child.get(f"{{{RDF}}}resource")
+            if resource is not None:
+                resource = urllib.parse.urljoin(base, resource)
+            if predicate == RDF + "type" and resource is not None:
+                entity.types.add(resource)
+            elif predicate == RDFS + "label":
+                if child.text and child.text.strip():
+                    entity.labels.append(child.text.strip())
+            elif predicate == RDFS + "subClassOf" and resource is not None:
+                entity.parents.append(resource)
+            elif resource is not None:
+                entity.links.setdefault(predicate, []).append(resource)
+            elif resource is None and len(child) == 0:
+                entity.values.setdefault(predicate, []).append((child.text or "").strip())
+    return entities
+
+
+def _python_name(label):
+    # same as give_alias, the names the properties are read by in the pipeline
+    return label.replace("/", "_or_").replace(" ", "_").replace(":", "_")
+
+
+def _number(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _descendants(entities, root_iris):
+    """
+    IRIs of the classes below root_iris (inclusive), along the asserted subClassOf triples.
+    """
+    children = {}
+    for iri, entity in entities.items():
+        for parent in entity.parents:
+            children.setdefault(parent, []).append(iri)
+    found = set(root_iris)
+    stack = list(root_iris)
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            if child not in found:
+                found.add(child)
+                stack.append(child)
+    return found
+
+
+def validate_entities(entities):
+    """
+    Check the invariants the processing pipeline relies on.
+
+    output: (errors, warnings) lists of messages
+    """
+    errors = []
+    warnings = []
+
+    classes = {iri for iri, e in entities.items() if OWL + "Class" in e.types}
+    individuals = {iri for iri, e in entities.items() if OWL + "NamedIndividual" in e.types}
+    data_properties = {
+        iri for iri, e in entities.items() if OWL + "DatatypeProperty" in e.types
+    }
+    object_properties = {
+        iri for iri, e in entities.items() if OWL + "ObjectProperty" in e.types
+    }
+
+    # labels (the edge extraction and the graph use label[0] of every class and individual)
+    for kind, iris in (("classes", classes), ("individuals", individuals)):
+        unlabeled = sorted(iri for iri in iris if not entities[iri].labels)
+        if unlabeled:
+            errors.append(
+                f"{len(unlabeled)} {kind} without a label: {', '.join(unlabeled[:10])}"
+                + (" ..." if len(unlabeled) > 10 else "")
+            )
+    individuals_by_label = {}
+    for iri in individuals:
+        if entities[iri].labels:
+            individuals_by_label.setdefault(entities[iri].labels[0], []).append(iri)
+    for label, iris in sorted(individuals_by_label.items()):
+        if len(iris) > 1:
+            warnings.append(
+                f'{len(iris)} individuals share the label "{label}" (only one becomes a node)'
+            )
+
+    # classes the pipeline looks up by label
+    class_by_label = {}
+    for iri in classes:
+        for label in entities[iri].labels:
+            class_by_label.setdefault(label, iri)
+    if ROOT_CLASS not in class_by_label:
+        errors.append(f'no class labeled "{ROOT_CLASS}"')
+
+    # data properties read by name
+    property_name = {}
+    for iri in data_properties:
+        if entities[iri].labels:
+            property_name[iri] = _python_name(entities[iri].labels[0])
+    declared = set(property_name.values())
+    for name in REQUIRED_DATA_PROPERTIES:
+        if name not in declared:
+            errors.append(f'no data property labeled "{name}"')
+
+    myth_classes = (
+        _descendants(entities, [class_by_label[MYTH_CLASS]])
+        if MYTH_CLASS in class_by_label
+        else set()
+    )
+    missing_frequency = []
+
+    # values of the individuals
+    for iri in sorted(individuals):
+        entity = entities[iri]
+        name = entity.labels[0] if entity.labels else iri
+        values = {
+            property_name[predicate]: literals
+            for predicate, literals in entity.values.items()
+            if predicate in property_name
+        }
+
+        for prop in PERSONAL_VALUES_19 + POLITICAL_VALUES + NUMERIC_DATA_PROPERTIES:
+            literals = values.get(prop, ())
+            if len(literals) > 1:
+                errors.append(f'"{name}" has {len(literals)} values for {prop}')
+            for literal in literals:
+                number = _number(literal)
+                if number is None:
+                    errors.append(f'"{name}" has a non numeric {prop} value "{literal}"')
+                elif prop not in NUMERIC_DATA_PROPERTIES and number not in (-1, 0, 1):
+                    errors.append(f'"{name}" has {prop} = {literal} (expected -1, 0 or 1)')
+
+        for group, members in VALUE_GROUPS.items():
+            group_values = {
+                _number(literal) for member in members for literal in values.get(member, ())
+            }
+            if 1 in group_values and -1 in group_values:
+                errors.append(f'"{name}" has opposing 1 and -1 {group} values')
+
+        if myth_classes and entity.types & myth_classes and not values.get(
+            "myth_frequency"
+        ):
+            missing_frequency.append(name)
+
+    mitigations = _mitigation_solutions(entities, individuals, object_properties)
+    missing_co2 = sorted(
+        entities[iri].labels[0] if entities[iri].labels else iri
+        for iri in mitigations
+        if not any(
+            property_name.get(predicate) == "CO2_eq_reduced"
+            for predicate in entities[iri].values
+        )
+    )
+    if missing_co2:
+        warnings.append(
+            f"{len(missing_co2)} mitigation solution(s) without a CO2_eq_reduced (ranked last): "
+            + ", ".join(missing_co2[:10])
+            + (" ..." if len(missing_co2) > 10 else "")
+        )
+
+    if missing_frequency:
+        warnings.append(
+            f"{len(missing_frequency)} myth(s) without a myth_frequency (ranked last): "
+            + ", ".join(missing_frequency[:10])
+            + (" ..." if len(missing_frequency) > 10 else "")
+        )
+    return errors, warnings
+
+
+def _mitigation_solutions(entities, individuals, object_properties):
+    """
+    IRIs of the individuals that inhibit a node upstream of the greenhouse effect, along the
+    asserted object property triples between individuals.
+    """
+    names = {
+        iri: _python_name(entities[iri].labels[0])
+        for iri in object_properties
+        if entities[iri].labels
+    }
+    greenhouse_effect = [
+        iri for iri in individuals if GREENHOUSE_EFFECT in entities[iri].labels
+    ]
+    causes = {}
+    inhibitors = {}
+    for iri in individuals:
+        for predicate, objects in entities[iri].links.items():
+            for target in objects:
+                if target not in individuals:
+                    continue
+                if names.get(predicate) == CAUSES:
+                    causes.setdefault(target, []).append(iri)
+                elif names.get(predicate) == INHIBITED_BY:
+                    inhibitors.setdefault(iri, []).append(target)
+
+    upstream = set(greenhouse_effect)
+    stack = list(greenhouse_effect)
+    while stack:
+        for cause in causes.get(stack.pop(), ()):
+            if cause not in upstream:
+                upstream.add(cause)
+                stack.append(cause)
+    return {
+        solution for node in upstream for solution in inhibitors.get(node, ())
+    }
+
+
+def check_ontology(onto_path, raise_on_error=True):
+    """
+    Run the pre-flight checks on an OWL file and log the warnings.
+
+    input: raise_on_error = raise a PreflightError listing every error (otherwise only report)
+    output: PreflightReport
+    """
+    if not looks_like_xml(onto_path):
+        logger.warning("%s is not RDF/XML, skipping the pre-flight check", onto_path)
+        return PreflightReport([], [], 0)
+    try:
+        entities = read_rdf_xml(onto_path)
+    except ET.ParseError as error:
+        report = PreflightReport([f"not well-formed XML: {error}"], [], 0)
+    else:
+        if entities is None:
+            logger.warning(
+                "%s is not RDF/XML, skipping the pre-flight check", onto_path
+            )
+            return PreflightReport([], [], 0)
+        errors, warnings = validate_entities(entities)
+        report = PreflightReport(errors, warnings, len(entities))
+
+    for warning in report.warnings:
+        logger.warning("pre-flight: %s", warning)
+    if report.errors and raise_on_error:
+        raise PreflightError(onto_path, report.errors, report.warnings)
+    return report
+
+
+def main(args):
+    """
+    Check an OWL file and print every problem found.
+
+    example: python3 preflight.py "./climate_mind_ontology20200721.owl"
+    """
+    report = check_ontology(args.OWL_file, raise_on_error=False)
+    for error in report.errors:
+        print(f"error: {error}")
+    print(
+        f"{report.num_entities} entities checked, {len(report.errors)} error(s), "
+        f"{len(report.warnings)} warning(s)"
+    )
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="check an OWL file for problems that would make processing fail, before loading and reasoning"
+    )
+    parser.add_argument("OWL_file", type=str, help="path to OWL file")
+    args = parser.parse_args()
+    sys.exit(main(args))
@@ -57,7 +57,8 @@ class ProcessCausalSources:
         # remove duplicate urls
         sources_list = list(dict.fromkeys(sources_list))
 
-        # remove urls that aren't active or aren't real
+        # remove urls that aren't real. Whether they are still active is checked for all
+        # source attributes at once by link_checker.filter_dead_links (make_graph check_links)
         sources_list = [url for url in sources_list if validators.url(url)]
 
         nx.set_node_attributes(
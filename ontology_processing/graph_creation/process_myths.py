@@ -1,3 +1,4 @@
+import heapq
 import networkx as nx
 from collections import OrderedDict
 
@@ -19,80 +20,96 @@ class ProcessMyths:
     def process_myths(self, subgraph_downstream_adaptations, nodes_upstream_greenhouse_effect):
         """
         Structures myth data in NetworkX object to be easier for API use.
+
+        Makes a single pass over the is_a_myth_about edges leaving myth nodes, collects the
+        solution, impact and general myths per node and writes all the lists at once,
+        each sorted by myth frequency (most popular first).
         """
-        general_myths = list()
         all_myths = list(nx.get_node_attributes(self.G, "myth").keys())
+        downstream_adaptations = set(subgraph_downstream_adaptations.nodes)
+        upstream_greenhouse_effect = set(nodes_upstream_greenhouse_effect)
 
-        for myth in all_myths:
-            node_neighbors = self.G.neighbors(myth)
-            for neighbor in node_neighbors:
-                if self.G[myth][neighbor]["type"] == "is_a_myth_about":
+        solution_myths = dict()
+        impact_myths = dict()
+        general_myths = list()
 
-                    impact_myths = []
+        for myth, neighbor, edge_type in self.G.out_edges(all_myths, data="type"):
+            if edge_type != "is_a_myth_about":
+                continue
+            if "risk solution" in self.G.nodes[neighbor]:
+                if neighbor not in solution_myths:
+                    solution_myths[neighbor] = list(
+                        self.G.nodes[neighbor].get("solution myths", [])
+                    )
+                solution_myths[neighbor].append(myth)
+            if neighbor in downstream_adaptations:
+                if neighbor not in impact_myths:
+                    impact_myths[neighbor] = list(
+                        self.G.nodes[neighbor].get("impact myths", [])
+                    )
+                impact_myths[neighbor].append(myth)
+            if neighbor in upstream_greenhouse_effect:
+                general_myths.append(myth)
 
-                    if "risk solution" in self.G.nodes[neighbor].keys():
-                        if "solution myths" not in self.G.nodes[neighbor].keys():
-                            solution_myths = []
-                        else:
-                            solution_myths = self.G.nodes[neighbor]["solution myths"]
-                        solution_myths.append(myth)
-                        nx.set_node_attributes(
-                            self.G, {neighbor: solution_myths}, "solution myths"
-                        )
-                    if subgraph_downstream_adaptations.has_node(neighbor):
-                        if "impact myths" not in self.G.nodes[neighbor].keys():
-                            impact_myths = []
-                        else:
-                            impact_myths = self.G.nodes[neighbor]["impact myths"]
-                        impact_myths.append(myth)
-                        nx.set_node_attributes(self.G, {neighbor: impact_myths}, "impact myths")
-                    if neighbor in nodes_upstream_greenhouse_effect:
-                        general_myths.append(myth)
-            self.add_myth_sources(myth)
+        nx.set_node_attributes(
+            self.G,
+            {node: self.sort_by_frequency(myths) for node, myths in solution_myths.items()},
+            "solution myths",
+        )
+        nx.set_node_attributes(
+            self.G,
+            {node: self.sort_by_frequency(myths) for node, myths in impact_myths.items()},
+            "impact myths",
+        )
+        nx.set_node_attributes(
+            self.G,
+            {myth: self.get_myth_sources(myth) for myth in all_myths},
+            "myth sources",
+        )
 
         # get unique general myths
         self.general_myths = list(dict.fromkeys(general_myths))
 
         self.sort_myths()
 
-    def add_myth_sources(self, myth):
+    def get_myth_sources(self, myth):
         """
-        Process myth sources into nice field called 'myth sources' 
-        with only unique urls from any source type
+        Unique urls of a myth from any source type, in source type order
         """
         myth_sources = list()
+        properties = self.G.nodes[myth].get("properties") or {}
         for source_type in self.source_types:
-            if (
-                "properties" in self.G.nodes[myth]
-                and source_type in self.G.nodes[myth]["properties"]
-            ):
-                myth_sources.extend(self.G.nodes[myth]["properties"][source_type])
+            if source_type in properties:
+                myth_sources.extend(properties[source_type])
 
-        myth_sources = list(
+        return list(
             OrderedDict.fromkeys(myth_sources)
         )  # removes any duplicates while preserving order
-        nx.set_node_attributes(
-            self.G,
-            {myth: myth_sources},
-            "myth sources",
-        )
 
-    def sort_myths(self):
+    def get_myth_frequency(self, myth):
         """
-        Sort the myths by popularity (skeptical science)
+        Skeptical science popularity of a myth. Myths without one rank last.
         """
-        general_myths_dict = dict()
-
-        for myth in self.general_myths:
-            general_myths_dict[myth] = self.G.nodes[myth]["data_properties"]["myth_frequency"]
+        frequency = (self.G.nodes[myth].get("data_properties") or {}).get("myth_frequency")
+        return float("-inf") if frequency is None else frequency
 
-        general_myths_sorted = sorted(
-            general_myths_dict,
-            key=general_myths_dict.get,
-            reverse=True,
-        )
+    def sort_by_frequency(self, myths):
+        """
+        Myths ordered by popularity (highest myth_frequency first) using a heap.
+        Myths with the same frequency keep their order.
+        """
+        heap = [
+            (-self.get_myth_frequency(myth), position, myth)
+            for position, myth in enumerate(myths)
+        ]
+        heapq.heapify(heap)
+        return [heapq.heappop(heap)[2] for _ in range(len(heap))]
 
-        self.general_myths = general_myths_sorted
+    def sort_myths(self):
+        """
+        Sort the myths by popularity (skeptical science)
+        """
+        self.general_myths = self.sort_by_frequency(self.general_myths)
     
     def add_general_myths(self):
         """
@@ -0,0 +1,304 @@
+"""
+SQLite side store for heavy node attributes.
+
+The processed graph keeps "comment" and the full annotation "properties" (sources, long
+descriptions...) inline on every node, so loading the gpickle pays for text the backend only
+reads when rendering a single card. move_to_side_store writes those attributes to a SQLite
+file next to the gpickle and replaces them on the nodes with LazyValue proxies. A LazyValue
+pickles as a reference (store, node, attribute) and fetches and caches its value on first
+access, so the gpickle loads without the heavy text.
+
+The store pickles as its file name and the folder it was written to. read_graph_with_side_store
+looks for it in the folder of the gpickle instead, so output folders can be moved or renamed.
+A plain pickle.load / nx.read_gpickle only works while the store is still in the folder it was
+written to, or relocated to with relocate_side_store (the watch mode does so before publishing
+a version). Either way a missing store raises FileNotFoundError when the graph is loaded, not
+on the first attribute access. Consumers should load the graph with read_graph_with_side_store
+(or ontology_processing.loader.load_graph).
+
+A LazyValue is neither a str nor a dict: isinstance checks fail on it and json.dumps needs
+default=resolve. Load with lazy=False to get the plain values back.
+
+Sample Usage
+------------
+    move_to_side_store(G, "output/Climate_Mind_DiGraph.sidestore.sqlite")
+    G = read_graph_with_side_store("output/Climate_Mind_DiGraph.gpickle")
+    G.nodes["solar panels"]["properties"]["schema_longDescription"]
+"""
+
+import argparse
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+SIDE_STORE_FILE_NAME = "Climate_Mind_DiGraph.sidestore.sqlite"
+HEAVY_ATTRIBUTES = ("comment", "properties")
+
+# folder of the gpickle being loaded by read_graph_with_side_store, used when unpickling stores
+_loading = threading.local()
+
+
+class SideStore:
+    """
+    Read access to a side store file. The connection is opened on the first fetch (and again
+    in a forked process), and the store pickles as its file name and folder.
+    """
+
+    def __init__(self, file_name, folder=None):
+        self.file_name = file_name
+        self.folder = folder
+        self._connection = None
+        self._pid = None
+
+    def __reduce__(self):
+        return (_restore_side_store, (self.file_name, self.folder))
+
+    @property
+    def path(self):
+        if self.folder is None:
+            return self.file_name
+        return os.path.join(self.folder, self.file_name)
+
+    def _connect(self):
+        if self._connection is None or self._pid != os.getpid():
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"Side store {self.path} not found")
+            self._connection = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    def fetch(self, node, attribute):
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value FROM attributes WHERE node = ? AND attribute = ?",
+                (node, attribute),
+            )
+            .fetchone()
+        )
+        if row is None:
+            raise KeyError((node, attribute))
+        return pickle.loads(row[0])
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def _restore_side_store(file_name, folder):
+    """
+    Unpickle a SideStore, checking right away that its file can be found.
+    """
+    store = SideStore(file_name, getattr(_loading, "folder", None) or folder)
+    if not os.path.exists(store.path):
+        raise FileNotFoundError(
+            f"The graph keeps node attributes in the side store {file_name}, which was not "
+            f"found at {store.path}. Keep it next to the gpickle and load the graph with "
+            "read_graph_with_side_store (or ontology_processing.loader.load_graph)."
+        )
+    return store
+
+
+class LazyValue:
+    """
+    Proxy of a node attribute kept in a SideStore. The common dict / str operations are
+    forwarded to the value, which is fetched on first use; .value returns the value itself.
+    """
+
+    __slots__ = ("store", "node", "attribute", "_value")
+
+    _MISSING = object()
+
+    def __init__(self, store, node, attribute):
+        self.store = store
+        self.node = node
+        self.attribute = attribute
+        self._value = LazyValue._MISSING
+
+    def __reduce__(self):
+        return (LazyValue, (self.store, self.node, self.attribute))
+
+    @property
+    def value(self):
+        if self._value is LazyValue._MISSING:
+            self._value = self.store.fetch(self.node, self.attribute)
+        return self._value
+
+    @property
+    def is_loaded(self):
+        return self._value is not LazyValue._MISSING
+
+    def __getattr__(self, name):
+        return getattr(self.value, name)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyValue):
+            other = other.value
+        return self.value == other
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        if self.is_loaded:
+            return repr(self._value)
+        return f"LazyValue({self.node!r}, {self.attribute!r})"
+
+    __hash__ = None
+
+
+def resolve(value):
+    """
+    The value itself for a LazyValue, value unchanged otherwise.
+    """
+    return value.value if isinstance(value, LazyValue) else value
+
+
+def move_to_side_store(G, path, attributes=HEAVY_ATTRIBUTES):
+    """
+    Write the given node attributes to a SQLite side store at path (atomically) and replace
+    them on the nodes with LazyValue proxies, in place. The store is kept in
+    G.graph["side store"].
+
+    output: the SideStore
+    """
+    from ontology_processing.graph_creation.ontology_processing_utils import (
+        atomic_output_path,
+    )
+
+    folder, file_name = os.path.split(os.path.abspath(path))
+    store = SideStore(file_name, folder)
+    with atomic_output_path(path) as temp_path:
+        connection = sqlite3.connect(temp_path)
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE attributes (node TEXT, attribute TEXT, value BLOB, "
+                    "PRIMARY KEY (node, attribute)) WITHOUT ROWID"
+                )
+                connection.executemany(
+                    "INSERT INTO attributes VALUES (?, ?, ?)",
+                    (
+                        (node, attribute, pickle.dumps(resolve(data[attribute]), protocol=4))
+                        for node, data in G.nodes(data=True)
+                        for attribute in attributes
+                        if attribute in data
+                    ),
+                )
+        finally:
+            connection.close()
+
+    for node, data in G.nodes(data=True):
+        for attribute in attributes:
+            if attribute in data:
+                data[attribute] = LazyValue(store, node, attribute)
+    G.graph["side store"] = store
+    return store
+
+
+def read_graph_with_side_store(gpickle_path, lazy=True):
+    """
+    Load a gpickle, looking for its side store (if any) in the folder of the gpickle.
+
+    input: lazy = keep the LazyValue proxies. False loads every value from the store, for
+                  consumers that need plain str / dict values (isinstance checks, json.dumps...)
+    """
+    _loading.folder = os.path.dirname(os.path.abspath(gpickle_path))
+    try:
+        with open(gpickle_path, "rb") as f:
+            G = pickle.load(f)
+    finally:
+        _loading.folder = None
+    if not lazy:
+        load_side_store_values(G)
+    return G
+
+
+def relocate_side_store(gpickle_path, folder):
+    """
+    Rewrite the gpickle at gpickle_path (atomically) so that a plain load looks for its side
+    store in folder, e.g. the folder the output is about to be moved to. Graphs without a
+    side store are left alone.
+    """
+    from ontology_processing.graph_creation.ontology_processing_utils import (
+        atomic_output_path,
+    )
+
+    G = read_graph_with_side_store(gpickle_path)
+    store = G.graph.get("side store")
+    if store is None:
+        return
+    # every LazyValue shares this store
+    store.folder = os.path.abspath(folder)
+    with atomic_output_path(gpickle_path) as temp_path:
+        with open(temp_path, "wb") as f:
+            pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_side_store_values(G):
+    """
+    Replace every LazyValue of G by its value, in place (e.g. before writing other formats).
+    """
+    for node, data in G.nodes(data=True):
+        for attribute, value in data.items():
+            if isinstance(value, LazyValue):
+                data[attribute] = value.value
+    G.graph.pop("side store", None)
+    return G
+
+
+def main(args):
+    """
+    Move the heavy attributes of a processed gpickle to a side store and compare load times.
+
+    example: python3 side_store.py "Climate_Mind_DiGraph.gpickle" ./lazy_output
+    """
+    with open(args.gpickle_file_path, "rb") as f:
+        G = pickle.load(f)
+    os.makedirs(args.output_folder, exist_ok=True)
+    move_to_side_store(G, os.path.join(args.output_folder, SIDE_STORE_FILE_NAME))
+    lazy_path = os.path.join(args.output_folder, "Climate_Mind_DiGraph.gpickle")
+    with open(lazy_path, "wb") as f:
+        pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    for label, path in (("inline", args.gpickle_file_path), ("side store", lazy_path)):
+        start = time.perf_counter()
+        read_graph_with_side_store(path)
+        print(
+            f"{label:>10}: {os.path.getsize(path) / 1e6:8.2f} MB gpickle, "
+            f"loaded in {time.perf_counter() - start:.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="move comments and annotation properties of a processed graph to a SQLite side store"
+    )
+    parser.add_argument(
+        "gpickle_file_path", type=str, help="path to the processed networkx gpickle"
+    )
+    parser.add_argument(
+        "output_folder", type=str, help="folder for the lazy gpickle and the side store"
+    )
+    args = parser.parse_args()
+    main(args)
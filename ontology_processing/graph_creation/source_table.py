@@ -0,0 +1,241 @@
+"""
+Graph-level table of source urls.
+
+The same source url is repeated in node "properties", edge "properties" and the "causal
+sources", "myth sources" and "solution sources" lists, each time as its own string. With
+intern_sources every distinct (canonicalized) url is stored once in G.graph["source table"],
+together with the source types it was curated as, and all those attributes hold integer
+source ids instead. The accessors below return urls for interned and plain graphs alike.
+
+Sample Usage
+------------
+    intern_sources(G)
+    get_node_sources(G, "solar panels", "solution sources")
+    get_edge_sources(G, "deforestation", "increase in greenhouse effect", "dc_source")
+    measure_source_interning(G)
+"""
+
+import argparse
+import pickle
+import sys
+import urllib.parse
+
+SOURCE_LIST_ATTRIBUTES = ("causal sources", "myth sources", "solution sources")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url):
+    """
+    Strip surrounding whitespace, lower case the scheme and host and drop default ports.
+    Path, query and fragment are kept as curated.
+    """
+    url = url.strip()
+    try:
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.username or parts.password:
+        # leave urls with credentials untouched
+        return url
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    return urllib.parse.urlunsplit(
+        (scheme, netloc, parts.path, parts.query, parts.fragment)
+    )
+
+
+class _SourceTableBuilder:
+    def __init__(self):
+        self.ids = {}
+        self.urls = []
+        self.types = []
+
+    def intern(self, url, source_type=None):
+        url = canonicalize_url(url)
+        source_id = self.ids.get(url)
+        if source_id is None:
+            source_id = self.ids[url] = len(self.urls)
+            self.urls.append(url)
+            self.types.append(set())
+        if source_type is not None:
+            self.types[source_id].add(source_type)
+        return source_id
+
+    def intern_list(self, urls, source_type=None):
+        # dict.fromkeys keeps the first occurrence when two urls canonicalize the same
+        return list(dict.fromkeys(self.intern(url, source_type) for url in urls))
+
+
+def intern_sources(G, source_types=None):
+    """
+    Replace the source urls of all nodes and edges with ids into G.graph["source table"]
+    (a list of urls indexed by id) and record their source types in
+    G.graph["source table types"] (a list of sorted tuples). Does nothing if G is interned.
+    """
+    if is_interned(G):
+        return G
+    if source_types is None:
+        from ontology_processing.graph_creation.ontology_processing_utils import (
+            get_source_types,
+        )
+
+        source_types = get_source_types()
+    table = _SourceTableBuilder()
+
+    def intern_properties(properties):
+        for source_type in source_types:
+            if properties and properties.get(source_type):
+                properties[source_type] = table.intern_list(
+                    properties[source_type], source_type
+                )
+
+    for node, data in G.nodes(data=True):
+        intern_properties(data.get("properties"))
+    for node_a, node_b, data in G.edges(data=True):
+        intern_properties(data.get("properties"))
+    for node, data in G.nodes(data=True):
+        for attribute in SOURCE_LIST_ATTRIBUTES:
+            if data.get(attribute):
+                data[attribute] = table.intern_list(data[attribute])
+
+    G.graph["source table"] = table.urls
+    G.graph["source table types"] = [tuple(sorted(types)) for types in table.types]
+    return G
+
+
+def is_interned(G):
+    return "source table" in G.graph
+
+
+def get_source_url(G, source_id):
+    return G.graph["source table"][source_id]
+
+
+def get_source_types_of(G, source_id):
+    return G.graph["source table types"][source_id]
+
+
+def _urls(G, values):
+    if not values:
+        return []
+    if not is_interned(G):
+        return list(values)
+    table = G.graph["source table"]
+    return [table[source_id] for source_id in values]
+
+
+def get_node_sources(G, node, attribute):
+    """
+    Urls of a node source list ("causal sources", "myth sources", "solution sources") or of
+    a source type in its properties (e.g. "dc_source").
+    """
+    data = G.nodes[node]
+    if attribute in SOURCE_LIST_ATTRIBUTES:
+        return _urls(G, data.get(attribute))
+    return _urls(G, (data.get("properties") or {}).get(attribute))
+
+
+def get_edge_sources(G, node_a, node_b, source_type):
+    return _urls(G, (G[node_a][node_b].get("properties") or {}).get(source_type))
+
+
+def expand_sources(G):
+    """
+    Undo intern_sources: put the urls back on the nodes and edges and drop the table.
+    """
+    if not is_interned(G):
+        return G
+    from ontology_processing.graph_creation.ontology_processing_utils import (
+        get_source_types,
+    )
+
+    source_types = set(get_source_types())
+
+    def expand_properties(properties):
+        for key, value in (properties or {}).items():
+            if key in source_types and value:
+                properties[key] = _urls(G, value)
+
+    for node, data in G.nodes(data=True):
+        expand_properties(data.get("properties"))
+        for attribute in SOURCE_LIST_ATTRIBUTES:
+            if data.get(attribute):
+                data[attribute] = _urls(G, data[attribute])
+    for node_a, node_b, data in G.edges(data=True):
+        expand_properties(data.get("properties"))
+
+    del G.graph["source table"]
+    del G.graph["source table types"]
+    return G
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Bytes used by obj and everything it references, counting shared objects once.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            deep_sizeof(key, seen) + deep_sizeof(value, seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def measure_source_interning(G):
+    """
+    Memory and pickle size of G with plain and with interned sources (G is not modified).
+
+    output: dict of "plain" / "interned" to {"memory bytes", "pickle bytes"} (also printed)
+    """
+    plain = pickle.loads(pickle.dumps(G, protocol=pickle.HIGHEST_PROTOCOL))
+    expand_sources(plain)
+    interned = intern_sources(pickle.loads(pickle.dumps(plain)))
+
+    results = {}
+    for label, graph in (("plain", plain), ("interned", interned)):
+        results[label] = {
+            "memory bytes": deep_sizeof(graph),
+            "pickle bytes": len(pickle.dumps(graph, protocol=pickle.HIGHEST_PROTOCOL)),
+        }
+        print(
+            f"{label:>9}: {results[label]['memory bytes'] / 1e6:8.2f} MB in memory, "
+            f"{results[label]['pickle bytes'] / 1e6:8.2f} MB pickled"
+        )
+    print(f"{len(interned.graph['source table'])} distinct source urls")
+    return results
+
+
+def main(args):
+    """
+    Measure the savings of interning the sources of a processed graph.
+
+    example: python3 source_table.py "Climate_Mind_DiGraph.gpickle"
+    """
+    import networkx as nx
+
+    measure_source_interning(nx.read_gpickle(args.gpickle_file_path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="measure memory and pickle size savings of the interned source table"
+    )
+    parser.add_argument(
+        "gpickle_file_path", type=str, help="path to the processed networkx gpickle"
+    )
+    args = parser.parse_args()
+    main(args)
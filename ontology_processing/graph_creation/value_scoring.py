@@ -0,0 +1,201 @@
+"""
+Vectorized personal value scoring of the processed Climate Mind graph.
+
+add_personal_values stores personal_values_10 / personal_values_19 lists on every node. Here
+they are stacked once into N x 10 and N x 19 matrices (None counts as 0) along with the node
+names and the node ids of each feed category. Scoring a user is then one matrix product per
+category, and the top K nodes are picked with argpartition, for one user or a batch of users.
+
+Sample Usage
+------------
+    save_value_matrices(G, output_folder_path)
+    scorer = ValueScorer.load(os.path.join(output_folder_path, "Climate_Mind_Values.npz"))
+    scorer.top_k(user_scores_10, k=5, category="solutions")
+    scorer.top_k_all_categories(batch_of_user_scores_19, k=5)
+"""
+
+import os
+
+import numpy as np
+
+PERSONAL_VALUES_10 = (
+    "achievement",
+    "benevolence",
+    "conformity",
+    "hedonism",
+    "power",
+    "security",
+    "self-direction",
+    "stimulation",
+    "tradition",
+    "universalism",
+)
+
+PERSONAL_VALUES_19 = (
+    "achievement",
+    "benevolence_caring",
+    "benevolence_dependability",
+    "conformity_interpersonal",
+    "conformity_rules",
+    "face",
+    "hedonism",
+    "humility",
+    "power_dominance",
+    "power_resources",
+    "security_personal",
+    "security_societal",
+    "self-direction_autonomy_of_action",
+    "self-direction_autonomy_of_thought",
+    "stimulation",
+    "tradition",
+    "universalism_concern",
+    "universalism_nature",
+    "universalism_tolerance",
+)
+
+CATEGORIES = ("impacts", "solutions", "myths")
+
+
+def _value_matrix(G, nodes, attribute, width):
+    matrix = np.zeros((len(nodes), width), dtype=np.float32)
+    for i, node in enumerate(nodes):
+        values = G.nodes[node].get(attribute)
+        if values:
+            matrix[i] = [0 if value is None else value for value in values]
+    return matrix
+
+
+def get_category_nodes(G):
+    """
+    Nodes of each feed category: impacts have adaptation solutions, solutions are the
+    adaptation and mitigation solutions and myths carry the myth attribute.
+    """
+    impacts = []
+    solutions = {}
+    myths = []
+    for node, data in G.nodes(data=True):
+        if data.get("adaptation solutions"):
+            impacts.append(node)
+            solutions.update(dict.fromkeys(data["adaptation solutions"]))
+        solutions.update(dict.fromkeys(data.get("mitigation solutions") or ()))
+        if data.get("myth"):
+            myths.append(node)
+    return {"impacts": impacts, "solutions": list(solutions), "myths": myths}
+
+
+def build_value_matrices(G):
+    """
+    output: dict of numpy arrays: node_names, values_10 (N x 10), values_19 (N x 19) and
+            one array of node ids per category
+    """
+    nodes = list(G.nodes)
+    node_id = {node: i for i, node in enumerate(nodes)}
+    arrays = {
+        "node_names": np.array(nodes, dtype=str),
+        "values_10": _value_matrix(G, nodes, "personal_values_10", 10),
+        "values_19": _value_matrix(G, nodes, "personal_values_19", 19),
+    }
+    for category, category_nodes in get_category_nodes(G).items():
+        arrays[category] = np.array(
+            [node_id[node] for node in category_nodes if node in node_id],
+            dtype=np.int32,
+        )
+    return arrays
+
+
+def save_value_matrices(G, outfile_path, fname="Climate_Mind_Values"):
+    """
+    Save the value matrices and node index as an .npz file for ValueScorer.load, atomically.
+    """
+    from ontology_processing.graph_creation.ontology_processing_utils import (
+        atomic_output_path,
+    )
+
+    file_path = os.path.join(outfile_path, fname + ".npz")
+    arrays = build_value_matrices(G)
+    with atomic_output_path(file_path) as temp_path:
+        # a file object, np.savez would add .npz to the temporary path
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+    return file_path
+
+
+class ValueScorer:
+    """
+    Rank the nodes of each feed category by how well they match user personal values.
+
+    The score of a node is the dot product of its value vector with the user's value vector.
+    User vectors of length 10 use the 10 value matrix and vectors of length 19 the 19 value
+    one (orders as in PERSONAL_VALUES_10 / PERSONAL_VALUES_19).
+
+    Parameters
+    ----------
+    arrays : dict or npz file from build_value_matrices / save_value_matrices
+    """
+
+    def __init__(self, arrays):
+        self.node_names = arrays["node_names"]
+        self.values = {10: arrays["values_10"], 19: arrays["values_19"]}
+        self.category_ids = {category: arrays[category] for category in CATEGORIES}
+        # value matrices restricted to each category, so scoring never touches other nodes
+        self._category_values = {
+            (category, width): matrix[ids]
+            for category, ids in self.category_ids.items()
+            for width, matrix in self.values.items()
+        }
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls({name: arrays[name] for name in arrays.files})
+
+    @classmethod
+    def from_graph(cls, G):
+        return cls(build_value_matrices(G))
+
+    def scores(self, user_values, category="solutions"):
+        """
+        Scores of the category nodes, shape (number of category nodes, number of users).
+        """
+        users = np.atleast_2d(np.asarray(user_values, dtype=np.float32))
+        width = users.shape[1]
+        if width not in self.values:
+            raise ValueError(
+                f"User value vectors must have 10 or 19 values, got {width}"
+            )
+        return self._category_values[(category, width)] @ users.T
+
+    def top_k(self, user_values, k=10, category="solutions"):
+        """
+        Top k nodes of a category for a user value vector, or for each row of a batch of
+        user value vectors.
+
+        output: list of (node name, score) pairs sorted by score, or a list of those lists
+                for a batch
+        """
+        users = np.asarray(user_values, dtype=np.float32)
+        scores = self.scores(users, category)
+        ids = self.category_ids[category]
+        k = min(k, len(ids))
+        if k == 0:
+            results = [[] for _ in range(scores.shape[1])]
+        else:
+            top = np.argpartition(-scores, k - 1, axis=0)[:k]
+            top_scores = np.take_along_axis(scores, top, axis=0)
+            order = np.argsort(-top_scores, axis=0, kind="stable")
+            top = np.take_along_axis(top, order, axis=0)
+            top_scores = np.take_along_axis(top_scores, order, axis=0)
+            names = self.node_names[ids[top]]
+            results = [
+                list(zip(names[:, user].tolist(), top_scores[:, user].tolist()))
+                for user in range(scores.shape[1])
+            ]
+        return results[0] if users.ndim == 1 else results
+
+    def top_k_all_categories(self, user_values, k=10):
+        """
+        top_k for every category, as a dict of category to results.
+        """
+        return {
+            category: self.top_k(user_values, k, category) for category in CATEGORIES
+        }
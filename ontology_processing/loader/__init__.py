@@ -0,0 +1,51 @@
+"""
+Lightweight entry point for consumers that only load and query the processed outputs (e.g.
+the Climate Mind backend). Nothing from the processing pipeline (owlready2, pandas,
+validators) or the dashboard (dash, pygraphviz) is imported, and every name below is only
+imported from its module on first use, so `import ontology_processing.loader` is cheap and
+e.g. MappedGraph only pulls in numpy.
+
+Sample Usage
+------------
+    from ontology_processing.loader import load_graph, GraphQuery, ValueScorer
+
+    G = load_graph("output/Climate_Mind_DiGraph.gpickle")
+    query = GraphQuery(G)
+    scorer = ValueScorer.load("output/Climate_Mind_Values.npz")
+"""
+
+import importlib
+
+_EXPORTS = {
+    "load_graph": "ontology_processing.loader.readers",
+    "read_compact_graph": "ontology_processing.graph_creation.compact_graph",
+    "CompactGraph": "ontology_processing.graph_creation.compact_graph",
+    "MappedGraph": "ontology_processing.graph_creation.mmap_graph",
+    "GraphQuery": "ontology_processing.graph_creation.graph_query",
+    "ValueScorer": "ontology_processing.graph_creation.value_scoring",
+    "apply_delta": "ontology_processing.graph_creation.graph_diff",
+    "load_delta": "ontology_processing.graph_creation.graph_diff",
+    "DeltaMismatchError": "ontology_processing.graph_creation.graph_diff",
+    "read_graph_with_side_store": "ontology_processing.graph_creation.side_store",
+    "LazyValue": "ontology_processing.graph_creation.side_store",
+    "resolve": "ontology_processing.graph_creation.side_store",
+    "get_source_url": "ontology_processing.graph_creation.source_table",
+    "get_node_sources": "ontology_processing.graph_creation.source_table",
+    "get_edge_sources": "ontology_processing.graph_creation.source_table",
+    "get_causal_chain": "ontology_processing.graph_creation.ontology_processing_utils",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,30 @@
+"""
+Load a processed graph from any of the files written by make_graph.
+"""
+
+import os
+
+from ontology_processing.graph_creation.side_store import read_graph_with_side_store
+
+
+def load_graph(path, lazy=True):
+    """
+    Load a processed graph by file extension:
+        .gpickle -> networkx DiGraph (with its side store, if it has one)
+        .cmgraph -> CompactGraph
+        .cmmap   -> MappedGraph (read-only, memory-mapped)
+
+    input: lazy = keep the side store attributes as LazyValue proxies (see side_store.py)
+    """
+    ext = os.path.splitext(path)[1]
+    if ext == ".gpickle":
+        return read_graph_with_side_store(path, lazy=lazy)
+    if ext == ".cmgraph":
+        from ontology_processing.graph_creation.compact_graph import read_compact_graph
+
+        return read_compact_graph(path)
+    if ext == ".cmmap":
+        from ontology_processing.graph_creation.mmap_graph import MappedGraph
+
+        return MappedGraph(path)
+    raise ValueError(f"Unknown processed graph file {path}")
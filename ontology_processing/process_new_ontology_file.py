@@ -1,29 +1,118 @@
 # From an input OWL file, process it to make files needed for Climate Mind app production and to run helper scripts like visualize.py. Be sure to run from the "backend" folder (not from "knowledge_graph")
 
 import os
+import time
+import functools
+import logging
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-import ontology_processing.graph_creation.make_network as make_network
-import ontology_processing.graph_creation.make_graph as make_graph
+from ontology_processing.graph_creation.phase_timings import PhaseTimings
+from ontology_processing.graph_creation.ontology_watcher import OntologyWatcher
+from ontology_processing.graph_creation.preflight import check_ontology
 
 
-def processOntology(onto_path, output_folder_path):
+def timed_output_edges(onto_path, output_path, source=None):
+    """
+    Run make_network.outputEdges and return its (start, end) wall clock times, so edge
+    extraction running in another process can be added to the PhaseTimings.
+    """
+    import ontology_processing.graph_creation.make_network as make_network
+
+    start = time.time()
+    make_network.outputEdges(onto_path=onto_path, output_path=output_path, source=source)
+    return start, time.time()
+
+
+def processOntology(
+    onto_path,
+    output_folder_path,
+    check_links=False,
+    intern_source_urls=False,
+    concurrent=False,
+    timings=None,
+    class_closure=None,
+    java_memory=500,
+    compact_node_attributes=False,
+    side_store=False,
+    preflight=True,
+):
     """
     Main function that builds files from OWL file starter file. Saved these files to the knowledge_graph repo (note these added files are ignored by git so they don't end up in github later if they are present during a git push). This function should be run from backend repo folder.
 
     input: args = args from the argument parser for the function (refOntologyPath)
-    output: saves all ontology-related files needed and used by scripts for the Climate Mind app and tools to knowledge_graph folder.
+           check_links = request every source url and drop the ones answering 404 or 410 (results are cached in the output folder)
+           intern_source_urls = store each source url once in a graph-level table and reference it by id on nodes and edges
+           concurrent = extract the edges in a separate process while make_graph loads the ontology and runs the reasoner (the edge DFS does not need the reasoned ontology)
+           timings = PhaseTimings to record the phases in (a new one by default). The summary is logged at the end.
+           class_closure = ClassClosure shared between runs (used by the watch mode)
+           java_memory = JVM memory limit of the reasoner in MB
+           compact_node_attributes = intern class names and edge types and share class and value lists as tuples across nodes
+           side_store = keep node comments and annotation properties in a SQLite file next to the gpickle, loaded lazily on first access
+           preflight = check the OWL file for problems that would make processing fail before loading and reasoning it (raises a PreflightError listing all of them)
+    output: returns the processed networkx graph and saves all ontology-related files needed and used by scripts for the Climate Mind app and tools to knowledge_graph folder.
 
     example: python3 process_new_ontology_file.py "./climate_mind_ontology20200721.owl"
     """
+    if timings is None:
+        timings = PhaseTimings()
+
+    if preflight:
+        with timings.phase("pre-flight check"):
+            check_ontology(onto_path)
+
+    # owlready2, pandas and the processing modules are only imported when processing, so the
+    # command line, the watch mode and the batch parent process start quickly
+    import ontology_processing.graph_creation.make_network as make_network
+    import ontology_processing.graph_creation.make_graph as make_graph
+
     # build output path
     csv_path = os.path.join(output_folder_path, "output.csv")
 
-    # get the network edges from the OWL ontology object
-    make_network.outputEdges(onto_path=onto_path, output_path=csv_path, source=None)
-
-    # from the network edges, make a networkx graph and save as a pickle file
-    make_graph.make_graph(onto_path, csv_path, output_folder_path)
+    if concurrent:
+        # the edge DFS loads the ontology in its own process (and owlready2 World) while
+        # make_graph loads and reasons. make_graph waits for it before reading the edges.
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            edges = executor.submit(timed_output_edges, onto_path, csv_path)
+
+            def wait_for_edges():
+                start, end = edges.result()
+                timings.add("edge extraction (separate process)", start, end)
+
+            G = make_graph.make_graph(
+                onto_path,
+                csv_path,
+                output_folder_path,
+                check_links=check_links,
+                intern_source_urls=intern_source_urls,
+                wait_for_edges=wait_for_edges,
+                timings=timings,
+                class_closure=class_closure,
+                java_memory=java_memory,
+                compact_node_attributes=compact_node_attributes,
+                side_store=side_store,
+            )
+    else:
+        # get the network edges from the OWL ontology object
+        with timings.phase("edge extraction"):
+            make_network.outputEdges(onto_path=onto_path, output_path=csv_path, source=None)
+
+        # from the network edges, make a networkx graph and save as a pickle file
+        G = make_graph.make_graph(
+            onto_path,
+            csv_path,
+            output_folder_path,
+            check_links=check_links,
+            intern_source_urls=intern_source_urls,
+            timings=timings,
+            class_closure=class_closure,
+            java_memory=java_memory,
+            compact_node_attributes=compact_node_attributes,
+            side_store=side_store,
+        )
+
+    timings.log_summary()
+    return G
 
 
 def main(args):
@@ -40,8 +129,36 @@ def main(args):
 
     onto_path = args.OWL_file
 
+    if args.watch:
+        # OWL_file is the folder the exports are saved to
+        watcher = OntologyWatcher(
+            input_folder=onto_path,
+            output_folder_path=output_folder_path,
+            process=functools.partial(
+                processOntology,
+                check_links=args.check_links,
+                intern_source_urls=args.intern_source_urls,
+                concurrent=args.concurrent,
+                compact_node_attributes=args.compact_attributes,
+                side_store=args.side_store,
+                preflight=not args.skip_preflight,
+            ),
+            poll_interval=args.poll_interval,
+        )
+        watcher.run_forever()
+        return
+
     # process the OWL ontology file
-    processOntology(onto_path=onto_path, output_folder_path=output_folder_path)
+    processOntology(
+        onto_path=onto_path,
+        output_folder_path=output_folder_path,
+        check_links=args.check_links,
+        intern_source_urls=args.intern_source_urls,
+        concurrent=args.concurrent,
+        compact_node_attributes=args.compact_attributes,
+        side_store=args.side_store,
+        preflight=not args.skip_preflight,
+    )
 
 
 if __name__ == "__main__":
@@ -50,6 +167,48 @@ if __name__ == "__main__":
     )
     parser.add_argument("OWL_file", type=str, help="path to OWL file")
     parser.add_argument("output_folder", type=str, help="Path to output folder")
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="drop source urls answering 404 or 410 (results are cached in the output folder)",
+    )
+    parser.add_argument(
+        "--intern-source-urls",
+        action="store_true",
+        help="store each source url once in a graph-level table referenced by id",
+    )
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="extract the edges in a separate process while the ontology is loaded and reasoned",
+    )
+    parser.add_argument(
+        "--compact-attributes",
+        action="store_true",
+        help="intern class names and edge types and share class and value lists across nodes",
+    )
+    parser.add_argument(
+        "--side-store",
+        action="store_true",
+        help="keep node comments and annotation properties in a SQLite file next to the gpickle, loaded on first access",
+    )
+    parser.add_argument(
+        "--skip-preflight",
+        action="store_true",
+        help="do not check the OWL file for problems before loading and reasoning it",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="treat OWL_file as a folder, process every new .owl file saved to it and publish the outputs to output_folder/latest",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="seconds between two scans of the watched folder",
+    )
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main(args)
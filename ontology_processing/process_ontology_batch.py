@@ -0,0 +1,185 @@
+# Process many OWL ontology versions (e.g. historical web protege exports) in parallel for regression analysis.
+# Every version gets its own output folder, and a summary table with node and edge counts and per-phase timings is written next to them.
+
+import os
+import time
+import logging
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from ontology_processing.process_new_ontology_file import processOntology
+from ontology_processing.graph_creation.phase_timings import PhaseTimings
+
+logger = logging.getLogger(__name__)
+
+# JVM memory (MB) below which the reasoner is not started, fewer workers are used instead
+MIN_JAVA_MEMORY = 500
+
+
+def get_owl_files(paths):
+    """
+    Expand a list of OWL files and folders into the sorted list of OWL files.
+    """
+    owl_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            owl_files.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.lower().endswith(".owl")
+            )
+        else:
+            owl_files.append(path)
+    return owl_files
+
+
+def get_version_names(owl_files):
+    """
+    Output folder name of each OWL file: its file name without extension, numbered when
+    the name is already taken (a.owl, a.owl and a-1.owl give a, a-1 and a-1-1).
+    """
+    names = []
+    taken = set()
+    for owl_file in owl_files:
+        base = name = os.path.splitext(os.path.basename(owl_file))[0]
+        count = 0
+        while name in taken:
+            count += 1
+            name = f"{base}-{count}"
+        taken.add(name)
+        names.append(name)
+    return names
+
+
+def get_workers_and_java_memory(max_workers, total_java_memory):
+    """
+    Number of worker processes and JVM memory per reasoner, so that all the reasoners
+    running at once stay within total_java_memory (MB).
+    """
+    if total_java_memory < MIN_JAVA_MEMORY:
+        raise ValueError(
+            f"total_java_memory ({total_java_memory} MB) is below the {MIN_JAVA_MEMORY} MB "
+            "needed by one reasoner"
+        )
+    workers = max_workers or os.cpu_count() or 1
+    workers = max(1, min(workers, total_java_memory // MIN_JAVA_MEMORY))
+    return workers, total_java_memory // workers
+
+
+def process_version(job):
+    """
+    Process one OWL file into its output folder (run in a worker process).
+
+    output: dict with one row of the summary table
+    """
+    owl_file, version, output_folder, java_memory, options = job
+    os.makedirs(output_folder, exist_ok=True)
+    timings = PhaseTimings()
+    row = {"version": version, "owl file": owl_file, "output folder": output_folder}
+    started = time.time()
+    try:
+        G = processOntology(
+            owl_file,
+            output_folder,
+            timings=timings,
+            java_memory=java_memory,
+            **options,
+        )
+        row.update(
+            status="ok", error="", nodes=G.number_of_nodes(), edges=G.number_of_edges()
+        )
+    except Exception as error:
+        # one broken version should not stop the batch
+        logger.error("processing %s failed:\n%s", owl_file, traceback.format_exc())
+        row.update(status="failed", error=repr(error), nodes=None, edges=None)
+    row["total seconds"] = time.time() - started
+    for name, start, end in timings.phases:
+        row[f"{name} seconds"] = row.get(f"{name} seconds", 0.0) + end - start
+    return row
+
+
+def process_ontology_batch(
+    paths,
+    output_folder_path,
+    max_workers=None,
+    total_java_memory=2000,
+    summary_file_name="batch_summary.csv",
+    **options,
+):
+    """
+    Process OWL files across a process pool. Every file gets its own output folder
+    (output_folder_path/<file name>) and every load uses its own owlready2 World.
+
+    input: paths = OWL files and/or folders containing OWL files
+           max_workers = number of worker processes (defaults to the number of CPUs, reduced
+                         so each reasoner gets at least MIN_JAVA_MEMORY)
+           total_java_memory = JVM memory (MB) shared by the reasoners running at once
+           options = extra keyword arguments for processOntology (check_links...). The versions
+                     already run in parallel, so concurrent=True is not supported here.
+    output: pandas DataFrame of the summary, also saved as csv to output_folder_path
+    """
+    import pandas as pd
+
+    if options.get("concurrent"):
+        raise ValueError("process_ontology_batch already runs versions in parallel")
+    owl_files = get_owl_files(paths)
+    workers, java_memory = get_workers_and_java_memory(max_workers, total_java_memory)
+    logger.info(
+        "processing %d ontology versions with %d workers and %d MB of JVM memory each",
+        len(owl_files),
+        workers,
+        java_memory,
+    )
+
+    jobs = [
+        (owl_file, version, os.path.join(output_folder_path, version), java_memory, options)
+        for owl_file, version in zip(owl_files, get_version_names(owl_files))
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(process_version, jobs))
+
+    summary = pd.DataFrame(rows)
+    os.makedirs(output_folder_path, exist_ok=True)
+    summary_path = os.path.join(output_folder_path, summary_file_name)
+    summary.to_csv(summary_path, index=False)
+    logger.info("wrote %s", summary_path)
+    return summary
+
+
+def main(args):
+    """
+    Process many OWL files in parallel, each into its own output folder.
+
+    example: python3 process_ontology_batch.py ./ontology_exports ./batch_output --workers 4
+    """
+    summary = process_ontology_batch(
+        args.OWL_files,
+        args.output_folder,
+        max_workers=args.workers,
+        total_java_memory=args.total_java_memory,
+    )
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Process many OWL ontology versions in parallel, each into its own output folder, and summarize node and edge counts and timings"
+    )
+    parser.add_argument(
+        "OWL_files", type=str, nargs="+", help="OWL files or folders of OWL files"
+    )
+    parser.add_argument("output_folder", type=str, help="Path to output folder")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="number of worker processes"
+    )
+    parser.add_argument(
+        "--total-java-memory",
+        type=int,
+        default=2000,
+        help="JVM memory in MB shared by all the reasoners running at once",
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main(args)
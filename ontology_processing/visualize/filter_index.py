@@ -0,0 +1,172 @@
+# Lookup tables for the visualize dashboard filters. Built once at startup so that the
+# figure callbacks never have to scan the node/edge lists or eval graphviz attribute strings.
+
+import numpy as np
+
+DEFAULT_EDGE_TYPES = (
+    "is_inhibited_or_prevented_or_blocked_or_slowed_by",
+    "causes_or_promotes",
+)
+
+
+class FilterIndex:
+    """
+    Indexes of the layout details used by the dashboard filters.
+
+    Node ids and edge ids are positions in N_node_details and N_edge_details.
+
+    Parameters
+    ----------
+    N_node_details : node layout details (see visualize.get_layout_details)
+    N_edge_details : edge layout details (see visualize.get_layout_details)
+    G : networkx graph the layout was made from
+
+    Sample Usage
+    ------------
+        index = FilterIndex(N_node_details, N_edge_details, G)
+        node_ids, edge_ids = index.filtered("causes_or_promotes")
+        highlighted = index.class_node_ids("risk solution")
+        node_ids, edge_ids = index.visible(node_ids, edge_ids, (0, 2000, 0, 700))
+    """
+
+    def __init__(self, N_node_details, N_edge_details, G):
+        self.node_id = {node["name"]: i for i, node in enumerate(N_node_details)}
+
+        self.all_node_ids = tuple(range(len(N_node_details)))
+        self.all_edge_ids = tuple(range(len(N_edge_details)))
+
+        # edge type -> edge ids, and the nodes at either end of those edges
+        edges_by_type = {}
+        nodes_by_type = {}
+        for edge_id, edge in enumerate(N_edge_details):
+            edge_type = G.edges[edge["node1"], edge["node2"]].get("type")
+            edges_by_type.setdefault(edge_type, []).append(edge_id)
+            type_nodes = nodes_by_type.setdefault(edge_type, set())
+            type_nodes.add(self.node_id[edge["node1"]])
+            type_nodes.add(self.node_id[edge["node2"]])
+        self.edges_by_type = {
+            edge_type: tuple(edge_ids) for edge_type, edge_ids in edges_by_type.items()
+        }
+        self.nodes_by_type = {
+            edge_type: tuple(sorted(node_ids))
+            for edge_type, node_ids in nodes_by_type.items()
+        }
+
+        # class -> node ids and non empty property -> node ids
+        nodes_by_class = {}
+        nodes_by_property = {}
+        for node_id, node in enumerate(N_node_details):
+            data = G.nodes[node["name"]]
+            for node_class in data.get("all classes") or ():
+                nodes_by_class.setdefault(node_class, set()).add(node_id)
+            for prop, value in (data.get("properties") or {}).items():
+                nodes_by_property.setdefault(prop, set())
+                if value:
+                    nodes_by_property[prop].add(node_id)
+        self.nodes_by_class = {
+            node_class: frozenset(node_ids)
+            for node_class, node_ids in nodes_by_class.items()
+        }
+        self.nodes_by_property = {
+            prop: frozenset(node_ids) for prop, node_ids in nodes_by_property.items()
+        }
+
+        # first direct class of each node, used to collapse dense clusters when zoomed out
+        self.node_primary_class = tuple(
+            min(G.nodes[node["name"]].get("direct classes") or [None])
+            for node in N_node_details
+        )
+
+        # bounding boxes (xmin, xmax, ymin, ymax) for viewport culling.
+        # Uses the geometry computed by geometry.add_layout_geometry.
+        self.node_bbox = np.array(
+            [
+                [
+                    node["outline"][:, 0].min(),
+                    node["outline"][:, 0].max(),
+                    node["outline"][:, 1].min(),
+                    node["outline"][:, 1].max(),
+                ]
+                for node in N_node_details
+            ],
+            dtype=float,
+        ).reshape(-1, 4)
+        self.edge_bbox = np.array(
+            [
+                [
+                    edge["path"][:, 0].min(),
+                    edge["path"][:, 0].max(),
+                    edge["path"][:, 1].min(),
+                    edge["path"][:, 1].max(),
+                ]
+                for edge in N_edge_details
+            ],
+            dtype=float,
+        ).reshape(-1, 4)
+        all_bbox = np.concatenate((self.node_bbox, self.edge_bbox))
+        if len(all_bbox):
+            self.bounds = (
+                float(all_bbox[:, 0].min()),
+                float(all_bbox[:, 1].max()),
+                float(all_bbox[:, 2].min()),
+                float(all_bbox[:, 3].max()),
+            )
+        else:
+            self.bounds = (0.0, 1.0, 0.0, 1.0)
+
+        # nodes with an outgoing edge beyond the default edge types
+        self.extra_edge_type_node_ids = frozenset(
+            node_id
+            for node_id, node in enumerate(N_node_details)
+            if node.get("non_default_edge_type")
+        )
+
+    def filtered(self, edge_type=None):
+        """
+        Node ids and edge ids to display for an edge type filter (None displays everything).
+        """
+        if edge_type is None:
+            return self.all_node_ids, self.all_edge_ids
+        return (
+            self.nodes_by_type.get(edge_type, ()),
+            self.edges_by_type.get(edge_type, ()),
+        )
+
+    def visible(self, node_ids, edge_ids, viewport=None):
+        """
+        Keep only the node ids and edge ids whose bounding box overlaps the viewport
+        (x0, x1, y0, y1). A viewport of None keeps everything.
+        """
+        if viewport is None:
+            return node_ids, edge_ids
+        return (
+            self._overlapping(self.node_bbox, node_ids, viewport),
+            self._overlapping(self.edge_bbox, edge_ids, viewport),
+        )
+
+    @staticmethod
+    def _overlapping(bbox, ids, viewport):
+        if not len(ids):
+            return ()
+        x0, x1, y0, y1 = viewport
+        ids = np.asarray(ids)
+        boxes = bbox[ids]
+        mask = (
+            (boxes[:, 0] <= x1)
+            & (boxes[:, 1] >= x0)
+            & (boxes[:, 2] <= y1)
+            & (boxes[:, 3] >= y0)
+        )
+        return tuple(ids[mask].tolist())
+
+    def class_node_ids(self, node_class):
+        return self.nodes_by_class.get(node_class, frozenset())
+
+    def property_node_ids(self, node_property):
+        return self.nodes_by_property.get(node_property, frozenset())
+
+    def classes(self):
+        return sorted(self.nodes_by_class)
+
+    def properties(self):
+        return sorted(self.nodes_by_property)
@@ -0,0 +1,279 @@
+# Edge spline and node outline geometry for the visualize dashboard.
+# Everything here is computed once per graphviz layout (see add_layout_geometry) and stored on the
+# node and edge layout details, so figure callbacks only have to pick up the precomputed arrays.
+
+import functools
+import math
+
+import numpy as np
+
+
+# sample counts used for the Bezier chunks. Counts are rounded up to one of these levels so
+# that chunks can be grouped and evaluated together with a shared Bernstein basis matrix.
+SAMPLE_LEVELS = (8, 16, 32, 64, 128, 200)
+
+# The arrow and tee adornments used to be computed from fixed indexes of a path sampled
+# with 200 points per chunk (path[20] and path[2], where path[0] is the edge start point).
+# These are the chunk parameters those indexes corresponded to.
+ARROW_T = 19 / 199
+TEE_T = 1 / 199
+
+
+def _binom(n, k):
+    return math.factorial(n) // (math.factorial(k) * math.factorial(n - k))
+
+
+@functools.lru_cache(maxsize=None)
+def bernstein_basis(degree, num):
+    """
+    Bernstein basis matrix of shape (num, degree + 1) evaluated at num evenly spaced
+    parameters between 0 and 1. Multiplying it with the control points of a Bezier curve
+    gives num points along the curve.
+    """
+    t = np.linspace(0, 1, num=num)
+    return bernstein_rows(degree, t)
+
+
+def bernstein_rows(degree, t):
+    """
+    Bernstein basis evaluated at the parameters t, shape (len(t), degree + 1).
+    """
+    t = np.asarray(t, dtype=float).reshape(-1, 1)
+    k = np.arange(degree + 1)
+    coeff = np.array([_binom(degree, kk) for kk in k], dtype=float)
+    return coeff * t ** k * (1 - t) ** (degree - k)
+
+
+def Bernstein(n, k):
+    """
+    Bernstein polynomial.
+    """
+    coeff = _binom(n, k)
+
+    def _bpoly(x):
+        return coeff * x ** k * (1 - x) ** (n - k)
+
+    return _bpoly
+
+
+def Bezier(points, num=200):
+    """
+    Build Bezier curve from points.
+    """
+    points = np.asarray(points, dtype=float)
+    return bernstein_basis(len(points) - 1, num) @ points
+
+
+# divide graphviz edge curve coordinates into groups of coordinates to help draw edges as correct spline curves (cubic B splines)
+def divide_into_4s(input):
+    size = 4
+    step = 3
+    output = [input[i : i + size] for i in range(1, len(input) - 2, step)]
+    return output
+
+
+def get_edge_control_points(edge):
+    """
+    Reorder the graphviz edge positions into spline order.
+
+    input: edge = edge layout details from N_edge_details
+    output: (start point, list of Bezier chunks of control points)
+    """
+    edge_position = edge.get("positions")
+    start = edge_position[0]
+    end = edge_position[1]
+    backwards = edge_position[2:][::-1]
+    edge_fix = (
+        [start] + backwards + [end]
+    )  # graphviz has weird edge coordinate format that doesn't have coordinates in correct order
+    # approximate the B spline curve
+    # see the following websites to better understand:
+    # http://graphviz.996277.n3.nabble.com/how-to-draw-b-spline-td1328.html
+    # https://stackoverflow.com/questions/28279060/splines-with-python-using-control-knots-and-endpoints
+    # https://stackoverflow.com/questions/53934876/how-to-draw-a-graphviz-spline-in-d3
+    # https://ocw.mit.edu/courses/electrical-engineering-and-computer-science/6-837-computer-graphics-fall-2012/lecture-notes/MIT6_837F12_Lec01.pdf
+    # https://github.com/kawache/Python-B-spline-examples
+    # https://stackoverflow.com/questions/12643079/b%C3%A9zier-curve-fitting-with-scipy
+    # https://nurbs-python.readthedocs.io/en/latest/module_bspline.html
+    return start, divide_into_4s(edge_fix)
+
+
+def sample_counts(control_polygon_lengths, tolerance=4.0, max_samples=200):
+    """
+    Number of points to sample per Bezier chunk. The length of the control polygon bounds
+    the length of the curve, so sampling one point per `tolerance` layout points keeps
+    segments short enough to look smooth while short, almost straight chunks get only a few
+    points instead of 200.
+    """
+    wanted = np.ceil(np.asarray(control_polygon_lengths) / tolerance)
+    levels = np.array([level for level in SAMPLE_LEVELS if level <= max_samples])
+    index = np.searchsorted(levels, wanted)
+    return levels[np.minimum(index, len(levels) - 1)]
+
+
+def evaluate_edge_splines(N_edge_details, tolerance=4.0, max_samples=200):
+    """
+    Evaluate the splines of all edges in one vectorized pass.
+
+    Chunks are grouped by degree and sample count, and each group is evaluated with a single
+    matrix product against the cached Bernstein basis.
+
+    output: (paths, first_chunks) where paths[i] is an (n, 2) array of points along edge i
+            (starting at the edge start point) and first_chunks[i] the control points of the
+            first Bezier chunk of edge i (None for edges without chunks)
+    """
+    starts = []
+    chunks = []
+    chunk_edge = []
+    first_chunks = []
+    for edge_index, edge in enumerate(N_edge_details):
+        start, blocks = get_edge_control_points(edge)
+        starts.append(start)
+        first_chunks.append(np.asarray(blocks[0], dtype=float) if blocks else None)
+        for chunk in blocks:
+            chunks.append(np.asarray(chunk, dtype=float))
+            chunk_edge.append(edge_index)
+
+    curves = [None] * len(chunks)
+    if chunks:
+        lengths = [
+            np.linalg.norm(np.diff(chunk, axis=0), axis=1).sum() for chunk in chunks
+        ]
+        counts = sample_counts(lengths, tolerance, max_samples)
+        groups = {}
+        for chunk_index, chunk in enumerate(chunks):
+            key = (len(chunk) - 1, int(counts[chunk_index]))
+            groups.setdefault(key, []).append(chunk_index)
+        for (degree, num), chunk_indexes in groups.items():
+            control_points = np.stack([chunks[i] for i in chunk_indexes])
+            evaluated = np.einsum(
+                "sk,ckd->csd", bernstein_basis(degree, num), control_points
+            )
+            for i, curve in zip(chunk_indexes, evaluated):
+                curves[i] = curve
+
+    pieces = [[np.asarray([start], dtype=float)] for start in starts]
+    for edge_index, curve in zip(chunk_edge, curves):
+        pieces[edge_index].append(curve)
+    paths = [np.concatenate(edge_pieces) for edge_pieces in pieces]
+    return paths, first_chunks
+
+
+def _points_on_first_chunks(first_chunks, edge_indexes, t):
+    """
+    Evaluate the first Bezier chunk of the given edges at parameter t.
+    """
+    points = np.empty((len(edge_indexes), 2))
+    by_degree = {}
+    for row, edge_index in enumerate(edge_indexes):
+        by_degree.setdefault(len(first_chunks[edge_index]) - 1, []).append(row)
+    for degree, rows in by_degree.items():
+        control_points = np.stack([first_chunks[edge_indexes[r]] for r in rows])
+        basis = bernstein_rows(degree, [t])[0]
+        points[rows] = np.einsum("k,ckd->cd", basis, control_points)
+    return points
+
+
+def _adornments(tips, bases, height, width):
+    """
+    Three point adornments (v1, tip, v2) for many edges at once using linear algebra.
+    """
+    U = tips - bases
+    U = U / np.linalg.norm(U, axis=1, keepdims=True)
+    V = np.stack((-1 * U[:, 1], U[:, 0]), axis=1)
+    v1 = tips - height * U + width * V
+    v2 = tips - height * U - width * V
+    return np.stack((v1, tips, v2), axis=1)
+
+
+def evaluate_edge_adornments(N_edge_details, paths, first_chunks):
+    """
+    Arrow (causes_or_promotes) and tee (is_inhibited_or_prevented_or_blocked_or_slowed_by)
+    adornments for all edges, computed in bulk.
+
+    output: (adornments, colors) where adornments[i] is a (3, 2) array or None and colors[i]
+            is the colour edge i should be drawn with
+    """
+    adornments = [None] * len(N_edge_details)
+    colors = ["black"] * len(N_edge_details)
+
+    arrow_edges = []
+    tee_edges = []
+    for edge_index, edge in enumerate(N_edge_details):
+        if first_chunks[edge_index] is None:
+            continue
+        if edge.get("edge_type") == "causes_or_promotes":
+            arrow_edges.append(edge_index)
+        elif (
+            edge.get("edge_type") == "is_inhibited_or_prevented_or_blocked_or_slowed_by"
+        ):
+            tee_edges.append(edge_index)
+
+    if arrow_edges:
+        # A,B = [path[20],path[0]]
+        tips = np.stack([paths[i][0] for i in arrow_edges])
+        bases = _points_on_first_chunks(first_chunks, arrow_edges, ARROW_T)
+        height = 5 * math.sqrt(3)
+        theta = 45
+        width = height * math.tan(theta / 2)
+        for edge_index, adornment in zip(
+            arrow_edges, _adornments(tips, bases, height, width)
+        ):
+            adornments[edge_index] = adornment
+            colors[edge_index] = "blue"
+
+    if tee_edges:
+        # B,A = [path[-1],path[2]]
+        tips = np.stack([paths[i][-1] for i in tee_edges])
+        bases = _points_on_first_chunks(first_chunks, tee_edges, TEE_T)
+        for edge_index, adornment in zip(tee_edges, _adornments(tips, bases, 0, 10)):
+            adornments[edge_index] = adornment
+            colors[edge_index] = "red"
+
+    return adornments, colors
+
+
+def node_outlines(N_node_details, num=32):
+    """
+    Polygons approximating the ovals drawn for all nodes, shape (len(N_node_details), num, 2).
+    Note how 72 is the conversion of graphviz point scale to inches scale
+    """
+    t = np.linspace(0, 2 * math.pi, num=num)
+    centers = np.array(
+        [
+            [node.get("position").get("x"), node.get("position").get("y")]
+            for node in N_node_details
+        ],
+        dtype=float,
+    ).reshape(-1, 2)
+    radii = 0.5 * 72 * np.array(
+        [[node.get("width"), node.get("height")] for node in N_node_details],
+        dtype=float,
+    ).reshape(-1, 2)
+    unit = np.stack((np.cos(t), np.sin(t)), axis=1)
+    return centers[:, None, :] + radii[:, None, :] * unit[None, :, :]
+
+
+def ellipse(cx, cy, rx, ry, num=32):
+    """
+    Closed polygon approximating an ellipse, shape (num, 2).
+    """
+    t = np.linspace(0, 2 * math.pi, num=num)
+    return np.stack((cx + rx * np.cos(t), cy + ry * np.sin(t)), axis=1)
+
+
+def add_layout_geometry(N_node_details, N_edge_details, tolerance=4.0, max_samples=200):
+    """
+    Compute the geometry of a layout once and store it on the layout details:
+    node["outline"] is the node oval polygon, edge["path"] the sampled spline,
+    edge["adornment"] the arrow/tee points (or None) and edge["edge_color"] its colour.
+    """
+    for node, outline in zip(N_node_details, node_outlines(N_node_details)):
+        node["outline"] = outline
+
+    paths, first_chunks = evaluate_edge_splines(N_edge_details, tolerance, max_samples)
+    adornments, colors = evaluate_edge_adornments(N_edge_details, paths, first_chunks)
+    for edge, path, adornment, color in zip(N_edge_details, paths, adornments, colors):
+        edge["path"] = path
+        edge["adornment"] = adornment
+        edge["edge_color"] = color
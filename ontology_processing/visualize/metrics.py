@@ -0,0 +1,232 @@
+# Metrics for the visualize dashboard, served in the Prometheus text format on the /metrics route of
+# the Dash app's Flask server: callback latency histograms, figure payload bytes and trace counts,
+# startup phase timings and figure cache hit rates.
+#
+# Metrics are off by default. Turn them on with visualize(..., metrics=True), the --metrics flag or
+# the CLIMATEMIND_VISUALIZE_METRICS=1 environment variable, then scrape http://host:8050/metrics
+
+import contextlib
+import os
+import threading
+import time
+
+METRICS_ENVIRONMENT_VARIABLE = "CLIMATEMIND_VISUALIZE_METRICS"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PAYLOAD_BUCKETS = (1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7)
+TRACE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def metrics_enabled(enabled=None):
+    """
+    enabled if given, otherwise whether the metrics environment variable is set to a true value.
+    """
+    if enabled is not None:
+        return bool(enabled)
+    return os.environ.get(METRICS_ENVIRONMENT_VARIABLE, "").strip().lower() in (
+        "1",
+        "true",
+        "yes",
+        "on",
+    )
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        for value in labels.values()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Cumulative histogram of observations, one series per label set.
+    """
+
+    def __init__(self, name, help_text, buckets, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.label_names = tuple(label_names)
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        counts, total = self.series.get(key, ([0] * len(self.buckets), 0.0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        self.series[key] = (counts, total + value)
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total) in sorted(self.series.items()):
+            labels = dict(zip(self.label_names, key))
+            for bound, count in zip(self.buckets, counts):
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                yield f"{self.name}_bucket{bucket_labels} {count}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {counts[-1]}"
+
+
+class DashboardMetrics:
+    """
+    Collects the dashboard metrics and renders them in the Prometheus text format. When
+    disabled, every method is a cheap no-op, so the dashboard code can call them unconditionally.
+
+    Parameters
+    ----------
+    enabled : collect metrics (see metrics_enabled)
+
+    Sample Usage
+    ------------
+        metrics = DashboardMetrics(enabled=True)
+        with metrics.time_callback("update_base_figure"):
+            fig = render()
+        metrics.observe_figure(fig, render_mode="batched")
+        metrics.register(app.server)
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.callback_latency = Histogram(
+            "visualize_callback_latency_seconds",
+            "Latency of the dashboard callbacks.",
+            LATENCY_BUCKETS,
+            ("callback",),
+        )
+        self.figure_bytes = Histogram(
+            "visualize_figure_payload_bytes",
+            "JSON size of the rendered figures.",
+            PAYLOAD_BUCKETS,
+            ("render_mode",),
+        )
+        self.figure_traces = Histogram(
+            "visualize_figure_traces",
+            "Number of traces in the rendered figures.",
+            TRACE_BUCKETS,
+            ("render_mode",),
+        )
+        self.callback_errors = {}
+        self.startup_phases = []
+        self.figure_caches = {}
+
+    @contextlib.contextmanager
+    def time_callback(self, callback):
+        """
+        Observe the latency of the wrapped callback body. Exceptions other than dash's
+        PreventUpdate are counted as errors.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as error:
+            if type(error).__name__ != "PreventUpdate":
+                with self._lock:
+                    self.callback_errors[callback] = (
+                        self.callback_errors.get(callback, 0) + 1
+                    )
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.callback_latency.observe(elapsed, callback=callback)
+
+    def observe_figure(self, fig, render_mode):
+        """
+        Record the JSON payload size and trace count of a newly rendered plotly figure.
+        """
+        if not self.enabled:
+            return
+        payload_bytes = len(fig.to_json().encode("utf-8"))
+        with self._lock:
+            self.figure_bytes.observe(payload_bytes, render_mode=render_mode)
+            self.figure_traces.observe(len(fig.data), render_mode=render_mode)
+
+    def set_startup_timings(self, timings):
+        """
+        Startup phase durations from a PhaseTimings (load, to_agraph, layout, parse...).
+        """
+        if self.enabled:
+            self.startup_phases = [(name, end - start) for name, start, end in timings.phases]
+
+    def add_figure_cache(self, name, figure_cache):
+        """
+        Report the hits, misses and size of a FigureCache.
+        """
+        if self.enabled:
+            self.figure_caches[name] = figure_cache
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for histogram in (self.callback_latency, self.figure_bytes, self.figure_traces):
+                lines.extend(histogram.lines())
+
+            lines.append(
+                "# HELP visualize_callback_errors_total Dashboard callbacks that raised an error."
+            )
+            lines.append("# TYPE visualize_callback_errors_total counter")
+            for callback, count in sorted(self.callback_errors.items()):
+                lines.append(
+                    f"visualize_callback_errors_total{_format_labels({'callback': callback})} {count}"
+                )
+
+            lines.append(
+                "# HELP visualize_startup_phase_seconds Duration of the dashboard startup phases."
+            )
+            lines.append("# TYPE visualize_startup_phase_seconds gauge")
+            for phase, seconds in self.startup_phases:
+                lines.append(
+                    f"visualize_startup_phase_seconds{_format_labels({'phase': phase})} "
+                    f"{_format_value(float(seconds))}"
+                )
+
+            for metric, kind, help_text, value in (
+                ("hits_total", "counter", "Figure cache hits.", lambda c: c.hits),
+                ("misses_total", "counter", "Figure cache misses.", lambda c: c.misses),
+                ("entries", "gauge", "Figures in the cache.", lambda c: len(c.figures)),
+                (
+                    "hit_ratio",
+                    "gauge",
+                    "Share of figure requests answered from the cache.",
+                    lambda c: c.hits / (c.hits + c.misses) if c.hits + c.misses else 0.0,
+                ),
+            ):
+                name = f"visualize_figure_cache_{metric}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for cache_name, figure_cache in sorted(self.figure_caches.items()):
+                    lines.append(
+                        f"{name}{_format_labels({'cache': cache_name})} "
+                        f"{_format_value(value(figure_cache))}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def register(self, server, path="/metrics"):
+        """
+        Serve the metrics on path of the Flask server (app.server of a Dash app).
+        """
+        if not self.enabled:
+            return
+        server.add_url_rule(
+            path,
+            "visualize_metrics",
+            lambda: (self.render(), 200, {"Content-Type": CONTENT_TYPE}),
+        )
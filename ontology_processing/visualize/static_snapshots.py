@@ -0,0 +1,173 @@
+# Render static, self-contained HTML snapshots of the visualize dashboard without running
+# the Dash server. The graphviz layout is computed once and the figures for the requested
+# filter combinations are rendered across a process pool.
+#
+# example: python3 visualize.py "Climate_Mind_DiGraph.gpickle" --static-output snapshots --all-combinations
+
+import html
+import itertools
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+
+from ontology_processing.visualize.filter_index import FilterIndex
+from ontology_processing.visualize.visualize import get_figure, get_layout_details
+
+EDGE_TYPES = [
+    None,
+    "causes_or_promotes",
+    "is_inhibited_or_prevented_or_blocked_or_slowed_by",
+]
+
+# layout shared by the worker processes (inherited on fork, loaded by _init_worker otherwise)
+_layout = None
+
+
+def load_layout(gpickle_file_path):
+    """
+    Load the graph and compute its layout, geometry and filter indexes.
+
+    output: dict with G, N, N_node_details, N_edge_details and index
+    """
+    G = nx.read_gpickle(gpickle_file_path)
+    N, N_node_details, N_edge_details = get_layout_details(G)
+    return {
+        "G": G,
+        "N": N,
+        "N_node_details": N_node_details,
+        "N_edge_details": N_edge_details,
+        "index": FilterIndex(N_node_details, N_edge_details, G),
+    }
+
+
+def _init_worker(gpickle_file_path):
+    global _layout
+    if _layout is None:
+        _layout = load_layout(gpickle_file_path)
+
+
+def get_static_combinations(index, all_combinations=False):
+    """
+    Filter combinations (edge_type, node_class) to render.
+
+    all_combinations = every edge type filter with every class highlight. Otherwise each
+                       edge type filter without highlight plus each class highlight on the
+                       whole graph.
+    """
+    classes = index.classes()
+    if all_combinations:
+        return list(itertools.product(EDGE_TYPES, [None] + classes))
+    return [(edge_type, None) for edge_type in EDGE_TYPES] + [
+        (None, node_class) for node_class in classes
+    ]
+
+
+def snapshot_file_name(edge_type, node_class):
+    def slug(value, default):
+        return re.sub(r"[^A-Za-z0-9]+", "-", value or default).strip("-").lower()
+
+    return f"{slug(edge_type, 'all-edges')}__{slug(node_class, 'no-highlight')}.html"
+
+
+def _render_snapshot(job):
+    edge_type, node_class, output_dir, webgl = job
+    fig = get_figure(
+        _layout["N_node_details"],
+        _layout["N_edge_details"],
+        _layout["N"],
+        _layout["G"],
+        edge_type=edge_type,
+        node_class=node_class,
+        render_mode="batched",
+        webgl=webgl,
+        index=_layout["index"],
+    )
+    title = f"Climate Mind DiGraph - edges: {edge_type or 'all'}, highlighted class: {node_class or 'none'}"
+    fig.update_layout(title=title)
+    file_name = snapshot_file_name(edge_type, node_class)
+    # include_plotlyjs=True embeds plotly.js so every file opens on its own
+    fig.write_html(
+        os.path.join(output_dir, file_name), include_plotlyjs=True, full_html=True
+    )
+    return edge_type, node_class, file_name
+
+
+def write_index_page(output_dir, rendered):
+    """
+    Write index.html linking to every rendered snapshot.
+    """
+    rows = "\n".join(
+        f"<tr><td>{html.escape(edge_type or 'all')}</td>"
+        f"<td>{html.escape(node_class or 'none')}</td>"
+        f'<td><a href="{html.escape(file_name)}">{html.escape(file_name)}</a></td></tr>'
+        for edge_type, node_class, file_name in rendered
+    )
+    page = f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Climate Mind DiGraph snapshots</title></head>
+<body>
+<h1>Climate Mind DiGraph snapshots</h1>
+<table>
+<tr><th>Edge type</th><th>Highlighted class</th><th>Snapshot</th></tr>
+{rows}
+</table>
+</body>
+</html>
+"""
+    index_path = os.path.join(output_dir, "index.html")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return index_path
+
+
+def render_static_snapshots(
+    gpickle_file_path,
+    output_dir,
+    combinations=None,
+    all_combinations=False,
+    max_workers=None,
+    webgl=False,
+):
+    """
+    Render the dashboard figure for a list of filter combinations to self-contained HTML files
+    plus an index.html page, without starting the Dash server.
+
+    input: gpickle_file_path = path to gpickle of the networkx graph of the ontology
+           output_dir = folder to write the HTML files to
+           combinations = list of (edge_type, node_class) tuples (None for all edges / no
+                          highlight). Defaults to get_static_combinations.
+           all_combinations = render every edge type filter with every class highlight
+           max_workers = number of worker processes (defaults to the number of CPUs)
+    output: path of the index page
+    """
+    global _layout
+    os.makedirs(output_dir, exist_ok=True)
+
+    # compute the layout once. Forked workers inherit it, spawned workers load it themselves.
+    _layout = load_layout(gpickle_file_path)
+    if combinations is None:
+        combinations = get_static_combinations(_layout["index"], all_combinations)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+
+    jobs = [
+        (edge_type, node_class, output_dir, webgl)
+        for edge_type, node_class in combinations
+    ]
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(gpickle_file_path,),
+    ) as executor:
+        rendered = list(executor.map(_render_snapshot, jobs))
+
+    index_path = write_index_page(output_dir, rendered)
+    print(f"Wrote {len(rendered)} snapshots and {index_path}")
+    return index_path
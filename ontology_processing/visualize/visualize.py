@@ -6,7 +6,6 @@
 # must run process_ontology_OWL_file.py before running visualize.py !
 
 
-import pandas as pd
 import dash
 import dash_html_components as html
 import dash_core_components as dcc
@@ -14,40 +13,202 @@ from dash.dependencies import Input, Output
 import plotly.graph_objs as go
 
 import networkx as nx
-import pygraphviz
 import math
 import numpy as np
 
 import io
 import json
+import time
+import logging
+from collections import OrderedDict
 
-import matplotlib.pyplot as plt
-from scipy.special import binom
 import argparse
 
+# Bernstein, Bezier and divide_into_4s moved to geometry.py and are re-exported for existing callers
+from ontology_processing.visualize.geometry import (  # noqa: F401
+    Bernstein,
+    Bezier,
+    add_layout_geometry,
+    divide_into_4s,
+    ellipse,
+)
+from ontology_processing.visualize.filter_index import FilterIndex
+from ontology_processing.visualize.metrics import DashboardMetrics, metrics_enabled
+from ontology_processing.graph_creation.phase_timings import PhaseTimings
 
-def Bernstein(n, k):
+logger = logging.getLogger(__name__)
+
+
+def get_node_style(
+    node_id, index, node_class=None, node_property=None, extra_edge_type=None
+):
+    """
+    Colours used to draw a node given the active highlight filters.
+
+    input: node_id = position of the node in N_node_details
+           index = FilterIndex of the layout
+    output: (fillcolor, line_color, textcolor) tuple
+    """
+    fillcolor = None
+    textcolor = "black"
+    line_color = "black"
+    if node_class:
+        if node_id in index.class_node_ids(node_class):
+            fillcolor = "#aed9f6"
+            textcolor = "#0D3BF6"
+
+    if extra_edge_type:
+        if node_id in index.extra_edge_type_node_ids:
+            line_color = "orange"
+            fillcolor = "orange"
+
+    if node_property:
+        if node_id in index.property_node_ids(node_property):
+            line_color = "yellow"
+            fillcolor = "yellow"
+
+    return fillcolor, line_color, textcolor
+
+
+def get_extra_edge_type(checklist_value):
+    """
+    "yes" when the extra edge type checkbox is ticked, None otherwise. dcc.Checklist gives
+    its value as the list of ticked options (["yes"] or []).
+    """
+    return "yes" if "yes" in (checklist_value or []) else None
+
+
+# decimals kept in the coordinates of the batched traces. Layout units are points (1/72 inch),
+# so a tenth of a point is invisible, and the short numbers keep the figure JSON small.
+COORDINATE_DECIMALS = 1
+
+
+def join_with_gaps(arrays):
     """
-    Bernstein polynomial.
+    Concatenate (n, 2) point arrays into a single array with a row of NaN between them, so a
+    single plotly trace draws them as separate lines (NaN is serialized as null). Coordinates
+    are rounded to COORDINATE_DECIMALS.
     """
-    coeff = binom(n, k)
+    if not arrays:
+        return np.empty((0, 2))
+    gap = np.full((1, 2), np.nan)
+    pieces = []
+    for array in arrays:
+        pieces.append(array)
+        pieces.append(gap)
+    return np.round(np.concatenate(pieces), COORDINATE_DECIMALS)
 
-    def _bpoly(x):
-        return coeff * x ** k * (1 - x) ** (n - k)
 
-    return _bpoly
+# level of detail used by get_batched_figure
+LOD_FULL = "full"
+LOD_COARSE = "coarse"
 
+# views showing more nodes than this are drawn with LOD_COARSE
+LOD_NODE_THRESHOLD = 250
 
-def Bezier(points, num=200):
+# when zoomed out, nodes sharing a direct class in a cell of a grid with this many columns
+# are collapsed into one cluster once there are at least MIN_CLUSTER_SIZE of them
+CLUSTER_GRID_DIVISIONS = 24
+MIN_CLUSTER_SIZE = 4
+
+
+def get_layout_bounds(N, index):
+    """
+    Bounding box (x0, x1, y0, y1) of the layout. Uses the graphviz bounding box ("bb" in the
+    'header' of the graphviz graph layout) and falls back to the bounding box of the geometry.
+    """
+    bb = N.graph_attr.get("bb")
+    if bb:
+        x0, y0, x1, y1 = [float(value) for value in bb.split(",")]
+        return x0, x1, y0, y1
+    return index.bounds
+
+
+def get_viewport(relayout_data):
+    """
+    Visible axis ranges from the relayoutData of the dcc.Graph.
+
+    output: (x range, y range) where a range is an (a0, a1) tuple or None when that axis shows
+            everything (autorange) or did not change
+    """
+    relayout_data = relayout_data or {}
+    ranges = []
+    for axis in ("xaxis", "yaxis"):
+        if f"{axis}.range[0]" in relayout_data and f"{axis}.range[1]" in relayout_data:
+            axis_range = (
+                float(relayout_data[f"{axis}.range[0]"]),
+                float(relayout_data[f"{axis}.range[1]"]),
+            )
+        elif f"{axis}.range" in relayout_data:
+            axis_range = tuple(float(v) for v in relayout_data[f"{axis}.range"])
+        else:
+            axis_range = None
+        ranges.append(axis_range)
+    return tuple(ranges)
+
+
+def is_viewport_change(relayout_data):
     """
-    Build Bezier curve from points.
+    Whether relayoutData describes a change of the axis ranges (zoom, pan or autorange) rather
+    than e.g. a change of drag mode.
     """
-    N = len(points)
-    t = np.linspace(0, 1, num=num)
-    curve = np.zeros((num, 2))
-    for ii in range(N):
-        curve += np.outer(Bernstein(N - 1, ii)(t), points[ii])
-    return curve
+    return any(key.startswith(("xaxis.", "yaxis.")) for key in (relayout_data or {}))
+
+
+def snap_viewport(viewport, bounds, divisions=16, margin=0.25):
+    """
+    Grow the viewport by a margin (so small pans don't need a new figure) and snap it outwards
+    to a grid over the layout (so nearby viewports share figure cache entries).
+
+    input: viewport = (x range, y range) as returned by get_viewport
+           bounds = (x0, x1, y0, y1) of the layout
+    output: (x0, x1, y0, y1) or None when the viewport covers the whole layout
+    """
+    snapped = []
+    for axis_range, low, high in zip(viewport, bounds[0::2], bounds[1::2]):
+        if axis_range is None:
+            snapped.extend([low, high])
+            continue
+        a0, a1 = sorted(axis_range)
+        pad = (a1 - a0) * margin
+        step = (high - low) / divisions
+        a0 = max(low, low + math.floor((a0 - pad - low) / step) * step)
+        a1 = min(high, low + math.ceil((a1 + pad - low) / step) * step)
+        snapped.extend([a0, a1])
+    if (
+        snapped[0] <= bounds[0]
+        and snapped[1] >= bounds[1]
+        and snapped[2] <= bounds[2]
+        and snapped[3] >= bounds[3]
+    ):
+        return None
+    return tuple(snapped)
+
+
+def get_level_of_detail(num_visible_nodes, lod_threshold=LOD_NODE_THRESHOLD):
+    """
+    LOD_COARSE when more than lod_threshold nodes are on display, LOD_FULL otherwise, so
+    small graphs are drawn in full detail even when zoomed out. A lod_threshold of None
+    always gives LOD_FULL.
+    """
+    if lod_threshold is None:
+        return LOD_FULL
+    return LOD_COARSE if num_visible_nodes > lod_threshold else LOD_FULL
+
+
+def update_figure_layout(fig, bounds):
+    # change the x and y axis ranges to be the bounding box of the graphviz graph layout.
+    # uirevision keeps the user's zoom when the figure is replaced by a callback.
+    fig.update_xaxes(range=[bounds[0], bounds[1]])
+    fig.update_yaxes(range=[bounds[2], bounds[3]])
+    fig.update_layout(
+        showlegend=False,
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=700,
+        xaxis={"showgrid": False},
+        yaxis={"showgrid": False},
+        uirevision="graph",
+    )
 
 
 def get_figure(
@@ -59,38 +220,59 @@ def get_figure(
     node_class=None,
     node_property=None,
     extra_edge_type=None,
+    render_mode="per_element",
+    webgl=False,
+    index=None,
+    viewport=None,
+    lod=LOD_FULL,
 ):
+    """
+    Build the plotly figure of the laid out graph.
+
+    render_mode = "per_element" adds one trace and one shape per node and one or two traces per edge.
+                  "batched" emits a handful of traces (see get_batched_figure) and is much
+                  cheaper to serialize and send to the browser.
+    webgl = use go.Scattergl instead of go.Scatter (batched render mode only)
+    index = FilterIndex of the layout. Build it once and pass it in, otherwise it is
+            rebuilt on every call.
+    viewport = (x0, x1, y0, y1); only nodes and edges overlapping it are drawn (None draws all)
+    lod = LOD_FULL or LOD_COARSE level of detail (batched render mode only)
+    """
+    if index is None:
+        index = FilterIndex(N_node_details, N_edge_details, G)
+    if render_mode == "batched":
+        return get_batched_figure(
+            N_node_details,
+            N_edge_details,
+            N,
+            G,
+            edge_type,
+            node_class,
+            node_property,
+            extra_edge_type,
+            webgl=webgl,
+            index=index,
+            viewport=viewport,
+            lod=lod,
+        )
+    if render_mode != "per_element":
+        raise ValueError(f"Unknown render_mode {render_mode!r}")
+
     the_nodes_to_display, the_edges_to_display = get_filtered_data(
-        N_node_details, N_edge_details, N, G, edge_type
+        N_node_details, N_edge_details, N, G, edge_type, index, viewport
     )
     # blank figure object
     fig = go.Figure()
 
     # Add node traces as ovals to the figure object
     # Note how 72 is the conversion of graphviz point scale to inches scale
-    for node in N_node_details:
+    for node_id in the_nodes_to_display:
+        node = N_node_details[node_id]
         node_name = node.get("name")
-        # Do not show the nodes not in the_nodes_to_display
-        if node_name not in the_nodes_to_display:
-            continue
-
-        fillcolor = None
-        textcolor = "black"
-        line_color = "black"
-        if node_class:
-            node_class_list = eval(N.get_node(node_name).attr.get("all classes"))
-            if node_class in node_class_list:
-                fillcolor = "#aed9f6"
-                textcolor = "#0D3BF6"
 
-        if node.get("non_default_edge_type"):
-            line_color = "orange"
-            fillcolor = "orange"
-
-        if node_property:
-            if G.nodes.get(node_name).get("properties").get(node_property):
-                line_color = "yellow"
-                fillcolor = "yellow"
+        fillcolor, line_color, textcolor = get_node_style(
+            node_id, index, node_class, node_property, extra_edge_type
+        )
 
         fig.add_shape(
             type="circle",
@@ -121,84 +303,18 @@ def get_figure(
         )
 
     # adding edges (and arrows and tees to edges)
-    for edge in N_edge_details:
-        edge_position = edge.get("positions")
-
-        # # Do not show the edges not in edges_to_display
-        o_edge = N.get_edge(edge["node1"], edge["node2"])
-        if o_edge not in the_edges_to_display:
-            continue
-
-        start = edge_position[0]
-        end = edge_position[1]
-        backwards = edge_position[2:][::-1]
-        edge_fix = (
-            [start] + backwards + [end]
-        )  # graphviz has weird edge coordinate format that doesn't have coordinates in correct order
-        # approximate the B spline curve
-        # see the following websites to better understand:
-        # http://graphviz.996277.n3.nabble.com/how-to-draw-b-spline-td1328.html
-        # https://stackoverflow.com/questions/28279060/splines-with-python-using-control-knots-and-endpoints
-        # https://stackoverflow.com/questions/53934876/how-to-draw-a-graphviz-spline-in-d3
-        # https://ocw.mit.edu/courses/electrical-engineering-and-computer-science/6-837-computer-graphics-fall-2012/lecture-notes/MIT6_837F12_Lec01.pdf
-        # https://github.com/kawache/Python-B-spline-examples
-        # https://stackoverflow.com/questions/12643079/b%C3%A9zier-curve-fitting-with-scipy
-        # https://nurbs-python.readthedocs.io/en/latest/module_bspline.html
-        blocks = divide_into_4s(edge_fix)
-        path = []  # path to draw
-        path.append(start)
-        for chunk in blocks:
-            curve = Bezier(chunk, 200)
-            path = path + curve.tolist()
-
-        edge_color = "black"
-        # add arrow adornment using linear algebra
-        if edge.get("edge_type") == "causes_or_promotes":
-            # A,B = [path[-20],path[-1]]
-            A, B = [path[20], path[0]]
-            A = np.array(A)
-            B = np.array(B)
-            height = 5 * math.sqrt(3)
-            theta = 45
-            width = height * math.tan(theta / 2)
-            U = (B - A) / np.linalg.norm(B - A)
-            V = np.array((-1 * U[1], U[0]))
-            v1 = B - height * U + width * V
-            v2 = B - height * U - width * V
-            adornment_to_add = [v1.tolist()] + [B] + [v2.tolist()]
-            xpoint = [coordinate[0] for coordinate in adornment_to_add]
-            ypoint = [coordinate[1] for coordinate in adornment_to_add]
-            edge_color = "blue"
+    for edge_id in the_edges_to_display:
+        edge = N_edge_details[edge_id]
+
+        # spline path and arrow/tee adornment are precomputed once per layout (see geometry.py)
+        path = edge["path"]
+        edge_color = edge["edge_color"]
+        adornment = edge["adornment"]
+        if adornment is not None:
             fig.add_trace(
                 go.Scatter(
-                    x=xpoint,
-                    y=ypoint,
-                    line_shape="linear",
-                    mode="lines",
-                    line=dict(color=edge_color),
-                )
-            )
-
-        # add tee adornment using linear algebra
-        if edge.get("edge_type") == "is_inhibited_or_prevented_or_blocked_or_slowed_by":
-            # B,A = [path[0],path[1]]
-            B, A = [path[-1], path[2]]
-            A = np.array(A)
-            B = np.array(B)
-            height = 0
-            width = 10
-            U = (B - A) / np.linalg.norm(B - A)
-            V = np.array((-1 * U[1], U[0]))
-            v1 = B - height * U + width * V
-            v2 = B - height * U - width * V
-            adornment_to_add = [v1.tolist()] + [B] + [v2.tolist()]
-            xpoint = [coordinate[0] for coordinate in adornment_to_add]
-            ypoint = [coordinate[1] for coordinate in adornment_to_add]
-            edge_color = "red"
-            fig.add_trace(
-                go.Scatter(
-                    x=xpoint,
-                    y=ypoint,
+                    x=adornment[:, 0],
+                    y=adornment[:, 1],
                     line_shape="linear",
                     mode="lines",
                     line=dict(color=edge_color),
@@ -206,105 +322,536 @@ def get_figure(
             )
 
         # add edge spline trace to the figure object
-        xp = [coordinate[0] for coordinate in path]
-        yp = [coordinate[1] for coordinate in path]
         fig.add_trace(
             go.Scatter(
-                x=xp,
-                y=yp,
+                x=path[:, 0],
+                y=path[:, 1],
                 marker=dict(color=edge_color),
                 line_shape="spline",
                 hovertemplate=edge.get("edge_hovertext"),
             )
         )
 
-    # change the x and y axis ranges to be the values found in the 'header' of the graphviz graph layout string
-    fig.update_xaxes(range=[0, 8395.7])
-    fig.update_yaxes(range=[0, 1404])
-    fig.update_layout(
-        showlegend=False,
-        plot_bgcolor="rgba(0,0,0,0)",
-        height=700,
-        xaxis={"showgrid": False},
-        yaxis={"showgrid": False},
-    )
-    print("get_figure! FIG IS RETURNING")
+    update_figure_layout(fig, get_layout_bounds(N, index))
+    logger.debug("get_figure returning %d traces", len(fig.data))
     return fig
 
 
-# divide graphviz edge curve coordinates into groups of coordinates to help draw edges as correct spline curves (cubic B splines)
-def divide_into_4s(input):
-    size = 4
-    step = 3
-    output = [input[i : i + size] for i in range(1, len(input) - 2, step)]
-    return output
+# names of the batched figure traces that highlight_figure (and the dashboard's clientside
+# callback) restyle in place
+CLASS_HIGHLIGHT_TRACE = "class-highlight"
+PROPERTY_HIGHLIGHT_TRACE = "property-highlight"
+NODE_LABELS_TRACE = "node-labels"
 
 
-# unit vector to help with edge geometry (specifically drawing arrows)
-def unit_vector(v):
-    return v / np.linalg.norm(v)
+def get_batched_figure(
+    N_node_details,
+    N_edge_details,
+    N,
+    G,
+    edge_type=None,
+    node_class=None,
+    node_property=None,
+    extra_edge_type=None,
+    webgl=False,
+    index=None,
+    viewport=None,
+    lod=LOD_FULL,
+):
+    """
+    Build the plotly figure using a handful of batched traces instead of one per element:
+    one filled outline trace per node style, one line trace per edge colour (edges and their
+    arrow/tee adornments separated by gaps), one hover marker trace at the edge midpoints
+    and one text trace holding all node labels.
+
+    Class and property highlights are drawn by two overlay traces (below and above the node
+    style traces, so the colour precedence of get_node_style is kept) that are filled in by
+    highlight_figure. This lets the dashboard restyle highlights in the browser.
+
+    webgl = use go.Scattergl so the browser renders with WebGL
+    index = FilterIndex of the layout
+    viewport = (x0, x1, y0, y1); only nodes and edges overlapping it are drawn (None draws all)
+    lod = LOD_COARSE drops the labels (nodes keep their hover text), draws edges as straight
+          lines and collapses dense clusters of nodes sharing a direct class; used when many
+          nodes are on display. Highlighted nodes are never collapsed.
+    """
+    if index is None:
+        index = FilterIndex(N_node_details, N_edge_details, G)
+    scatter = go.Scattergl if webgl else go.Scatter
+    coarse = lod == LOD_COARSE
+    bounds = get_layout_bounds(N, index)
+
+    the_nodes_to_display, the_edges_to_display = get_filtered_data(
+        N_node_details, N_edge_details, N, G, edge_type, index, viewport
+    )
+    # blank figure object
+    fig = go.Figure()
+
+    # class highlight overlay, filled in by highlight_figure
+    fig.add_trace(
+        scatter(
+            x=[],
+            y=[],
+            name=CLASS_HIGHLIGHT_TRACE,
+            mode="lines",
+            fill="toself",
+            fillcolor="#aed9f6",
+            line=dict(color="black", width=2),
+            hoverinfo="skip",
+        )
+    )
+
+    node_styles = {
+        node_id: get_node_style(node_id, index, extra_edge_type=extra_edge_type)
+        for node_id in the_nodes_to_display
+    }
+
+    # when zoomed out collapse dense groups of default styled, not highlighted nodes of the
+    # same class
+    clusters = []
+    clustered = set()
+    if coarse:
+        highlighted = (
+            index.class_node_ids(node_class) if node_class else frozenset()
+        ) | (index.property_node_ids(node_property) if node_property else frozenset())
+        view = viewport or bounds
+        cell = max(view[1] - view[0], 1e-9) / CLUSTER_GRID_DIVISIONS
+        cells = {}
+        for node_id, style in node_styles.items():
+            primary_class = index.node_primary_class[node_id]
+            if style[0] is not None or primary_class is None or node_id in highlighted:
+                continue
+            position = N_node_details[node_id]["position"]
+            key = (
+                math.floor(position["x"] / cell),
+                math.floor(position["y"] / cell),
+                primary_class,
+            )
+            cells.setdefault(key, []).append(node_id)
+        for (_, _, primary_class), members in cells.items():
+            if len(members) >= MIN_CLUSTER_SIZE:
+                clusters.append((primary_class, members))
+                clustered.update(members)
+
+    # group node outlines by style so each style is a single trace
+    node_outlines = {}
+    text_x, text_y, text, text_hovertemplates = [], [], [], []
+    for node_id in the_nodes_to_display:
+        node = N_node_details[node_id]
+        node_name = node.get("name")
+
+        fillcolor, line_color, textcolor = node_styles[node_id]
+        if node_id not in clustered:
+            node_outlines.setdefault((fillcolor, line_color), []).append(
+                node["outline"]
+            )
+
+        text_x.append(node.get("position").get("x"))
+        text_y.append(node.get("position").get("y"))
+        text.append(node_name)
+        text_hovertemplates.append(node.get("node_hovertext"))
+
+    for (fillcolor, line_color), outlines in node_outlines.items():
+        points = join_with_gaps(outlines)
+        fig.add_trace(
+            scatter(
+                x=points[:, 0],
+                y=points[:, 1],
+                mode="lines",
+                # the default style is transparent so the class highlight shows through
+                fill="toself",
+                fillcolor=fillcolor or "rgba(0,0,0,0)",
+                line=dict(color=line_color, width=2),
+                hoverinfo="skip",
+            )
+        )
 
+    if clusters:
+        cluster_outlines = []
+        cluster_x, cluster_y, cluster_hovertemplates = [], [], []
+        for primary_class, members in clusters:
+            bbox = index.node_bbox[members]
+            x0, x1 = bbox[:, 0].min(), bbox[:, 1].max()
+            y0, y1 = bbox[:, 2].min(), bbox[:, 3].max()
+            cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+            cluster_outlines.append(ellipse(cx, cy, (x1 - x0) / 2, (y1 - y0) / 2))
+            cluster_x.append(cx)
+            cluster_y.append(cy)
+            cluster_hovertemplates.append(
+                f"<b>{len(members)} nodes</b> of class <b>{primary_class}</b><extra></extra>"
+            )
+        points = join_with_gaps(cluster_outlines)
+        fig.add_trace(
+            scatter(
+                x=points[:, 0],
+                y=points[:, 1],
+                mode="lines",
+                fill="toself",
+                fillcolor="#dddddd",
+                line=dict(color="grey", width=2),
+                hoverinfo="skip",
+            )
+        )
+        fig.add_trace(
+            scatter(
+                x=cluster_x,
+                y=cluster_y,
+                mode="markers",
+                marker=dict(size=12, opacity=0),
+                hovertemplate=cluster_hovertemplates,
+            )
+        )
 
-def get_filtered_data(N_node_details, N_edge_details, N, G, edge_type=None):
-    if edge_type is None:
-        # By default display everything
-        nodes_to_display = [n.get("name") for n in N_node_details]
-        edges_to_display = [N.get_edge(e["node1"], e["node2"]) for e in N_edge_details]
+    # property highlight overlay, filled in by highlight_figure
+    fig.add_trace(
+        scatter(
+            x=[],
+            y=[],
+            name=PROPERTY_HIGHLIGHT_TRACE,
+            mode="lines",
+            fill="toself",
+            fillcolor="yellow",
+            line=dict(color="yellow", width=2),
+            hoverinfo="skip",
+        )
+    )
+
+    # group edge splines and adornments by colour so each colour is a single trace
+    edge_lines = {}
+    hover_x, hover_y, hover_templates = [], [], []
+    for edge_id in the_edges_to_display:
+        edge = N_edge_details[edge_id]
+
+        # spline path and arrow/tee adornment are precomputed once per layout (see geometry.py)
+        path = edge["path"]
+        lines = edge_lines.setdefault(edge["edge_color"], [])
+        if edge["adornment"] is not None:
+            lines.append(edge["adornment"])
+        if coarse:
+            # straight line between the edge end points
+            lines.append(path[[0, -1]])
+        else:
+            lines.append(path)
+
+        midpoint = path[len(path) // 2]
+        hover_x.append(midpoint[0])
+        hover_y.append(midpoint[1])
+        hover_templates.append(edge.get("edge_hovertext"))
+
+    for edge_color, lines in edge_lines.items():
+        points = join_with_gaps(lines)
+        fig.add_trace(
+            scatter(
+                x=points[:, 0],
+                y=points[:, 1],
+                mode="lines",
+                line=dict(color=edge_color),
+                hoverinfo="skip",
+            )
+        )
+
+    # invisible markers so edge properties can still be inspected on hover
+    fig.add_trace(
+        scatter(
+            x=hover_x,
+            y=hover_y,
+            mode="markers",
+            marker=dict(size=8, opacity=0),
+            hovertemplate=hover_templates,
+        )
+    )
+
+    # add scatter trace of text labels to the figure object
+    # customdata holds the node ids so highlights can find the nodes on display.
+    # When zoomed out the labels are dropped and only invisible hover markers are kept.
+    if coarse:
+        label_options = dict(mode="markers", marker=dict(size=8, opacity=0))
     else:
-        nodes_to_display = []
-        edges_to_display = []
+        label_options = dict(text=text, mode="text")
+    fig.add_trace(
+        scatter(
+            x=text_x,
+            y=text_y,
+            name=NODE_LABELS_TRACE,
+            customdata=list(the_nodes_to_display),
+            # https://plotly.com/python/hover-text-and-formatting/#customizing-hover-text-with-a-hovertemplate
+            hovertemplate=text_hovertemplates,
+            textfont=dict(
+                color=["black"] * len(text),
+                size=8.5,
+                family="sans-serif",
+            ),
+            **label_options,
+        )
+    )
 
-        for edge in G.edges:
-            if G.edges.get(edge).get("type") == edge_type:
-                node1, node2 = [edge[0], edge[1]]
-                edges_to_display.append(edge)
-                nodes_to_display.append(node1)
-                nodes_to_display.append(node2)
+    update_figure_layout(fig, bounds)
+    highlight_figure(fig, N_node_details, index, node_class, node_property)
+    return fig
 
-    return nodes_to_display, edges_to_display
+
+def highlight_figure(fig, N_node_details, index, node_class=None, node_property=None):
+    """
+    Fill the highlight overlays and label colours of a batched figure in place.
+    HIGHLIGHT_FIGURE_JS does the same in the browser for the dashboard.
+    """
+    labels = next(fig.select_traces(selector=dict(name=NODE_LABELS_TRACE)))
+    displayed = labels.customdata or ()
+
+    class_ids = index.class_node_ids(node_class) if node_class else frozenset()
+    property_ids = (
+        index.property_node_ids(node_property) if node_property else frozenset()
+    )
+
+    for trace_name, ids in [
+        (CLASS_HIGHLIGHT_TRACE, class_ids),
+        (PROPERTY_HIGHLIGHT_TRACE, property_ids),
+    ]:
+        points = join_with_gaps(
+            [N_node_details[node_id]["outline"] for node_id in displayed if node_id in ids]
+        )
+        fig.update_traces(
+            x=points[:, 0], y=points[:, 1], selector=dict(name=trace_name)
+        )
+
+    labels.textfont.color = [
+        "#0D3BF6" if node_id in class_ids else "black" for node_id in displayed
+    ]
+    return fig
 
 
-def visualize(gpickle_file_path):
+def get_highlight_data(N_node_details, index, num=32):
+    """
+    Data the dashboard keeps in a dcc.Store so highlights can be drawn in the browser:
+    node oval centres and radii and the node ids per class and per non empty property.
+    """
+    return {
+        "num": num,
+        "cx": [node["position"]["x"] for node in N_node_details],
+        "cy": [node["position"]["y"] for node in N_node_details],
+        "rx": [0.5 * node["width"] * 72 for node in N_node_details],
+        "ry": [0.5 * node["height"] * 72 for node in N_node_details],
+        "classes": {
+            node_class: sorted(index.class_node_ids(node_class))
+            for node_class in index.classes()
+        },
+        "properties": {
+            prop: sorted(index.property_node_ids(prop)) for prop in index.properties()
+        },
+    }
+
+
+# Clientside (browser) version of highlight_figure. Takes the figure rendered by the server,
+# copies it and fills in the highlight overlays so that changing the class or property
+# highlight needs no round trip to the server.
+HIGHLIGHT_FIGURE_JS = """
+function(baseFigure, nodeClass, nodeProperty, highlightData) {
+    if (!baseFigure || !highlightData) {
+        return window.dash_clientside.no_update;
+    }
+    var figure = Object.assign({}, baseFigure);
+    figure.data = baseFigure.data.map(function(trace) {
+        return Object.assign({}, trace);
+    });
+    var byName = {};
+    figure.data.forEach(function(trace) {
+        if (trace.name) {
+            byName[trace.name] = trace;
+        }
+    });
+    var labels = byName["%(labels)s"];
+    if (!labels) {
+        return figure;
+    }
+    var displayed = labels.customdata || [];
+
+    function idSet(table, key) {
+        return new Set((key && key !== "none" && table[key]) || []);
+    }
+    var classIds = idSet(highlightData.classes, nodeClass);
+    var propertyIds = idSet(highlightData.properties, nodeProperty);
+
+    function outlines(ids) {
+        var x = [], y = [];
+        var num = highlightData.num;
+        displayed.forEach(function(id) {
+            if (!ids.has(id)) {
+                return;
+            }
+            for (var k = 0; k < num; k++) {
+                var t = 2 * Math.PI * k / (num - 1);
+                x.push(highlightData.cx[id] + highlightData.rx[id] * Math.cos(t));
+                y.push(highlightData.cy[id] + highlightData.ry[id] * Math.sin(t));
+            }
+            x.push(null);
+            y.push(null);
+        });
+        return [x, y];
+    }
+
+    [["%(class_trace)s", classIds], ["%(property_trace)s", propertyIds]].forEach(
+        function(item) {
+            var trace = byName[item[0]];
+            if (trace) {
+                var points = outlines(item[1]);
+                trace.x = points[0];
+                trace.y = points[1];
+            }
+        }
+    );
+    labels.textfont = Object.assign({}, labels.textfont, {
+        color: displayed.map(function(id) {
+            return classIds.has(id) ? "#0D3BF6" : "black";
+        })
+    });
+    return figure;
+}
+""" % {
+    "labels": NODE_LABELS_TRACE,
+    "class_trace": CLASS_HIGHLIGHT_TRACE,
+    "property_trace": PROPERTY_HIGHLIGHT_TRACE,
+}
+
+
+class FigureCache:
+    """
+    Bounded least recently used cache of rendered figures keyed by the filter tuple.
     """
-    Main function to run the dashboard to visualize the ontology.
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.figures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """
+        Return the figure cached for key, calling render() to make it on a miss.
+        """
+        if key in self.figures:
+            self.hits += 1
+            self.figures.move_to_end(key)
+            return self.figures[key]
+        self.misses += 1
+        fig = render()
+        if self.maxsize > 0:
+            self.figures[key] = fig
+            if len(self.figures) > self.maxsize:
+                self.figures.popitem(last=False)
+        return fig
+
+
+def measure_figure(make_figure, repeat=3):
+    """
+    Measure the cost of building and serializing a figure.
+
+    input: make_figure = callable returning a plotly figure
+           repeat = number of timed runs (the best is reported)
+    output: dict with number of traces, number of shapes, figure JSON size in bytes and
+            seconds to build and serialize the figure (what a dash callback pays)
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = make_figure()
+        fig_json = fig.to_json()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "traces": len(fig.data),
+        "shapes": len(fig.layout.shapes),
+        "json_bytes": len(fig_json.encode("utf-8")),
+        "seconds": best,
+    }
+
+
+def benchmark_render_modes(gpickle_file_path, repeat=3):
+    """
+    Compare figure size and build time of the per_element and batched render modes.
 
     input: gpickle_file_path = path to gpickle of the networkx graph of the ontology
-    output: app = Dash app object
+    output: dict of render mode to measure_figure results (also printed)
     """
-    # load in networkx graph to access graph information
     G = nx.read_gpickle(gpickle_file_path)
-    print(nx.info(G))
+    N, N_node_details, N_edge_details = get_layout_details(G)
+    index = FilterIndex(N_node_details, N_edge_details, G)
+
+    results = {}
+    for label, render_mode, webgl in [
+        ("per_element", "per_element", False),
+        ("batched", "batched", False),
+        ("batched_webgl", "batched", True),
+    ]:
+        results[label] = measure_figure(
+            lambda: get_figure(
+                N_node_details,
+                N_edge_details,
+                N,
+                G,
+                render_mode=render_mode,
+                webgl=webgl,
+                index=index,
+            ),
+            repeat=repeat,
+        )
 
-    # pos = nx.nx_agraph.graphviz_layout(G, prog='dot')
+    baseline = results["per_element"]
+    for label, result in results.items():
+        print(
+            f"{label:>15}: {result['traces']:>6} traces, {result['shapes']:>5} shapes, "
+            f"{result['json_bytes'] / 1e6:8.2f} MB json "
+            f"({result['json_bytes'] / baseline['json_bytes']:.1%}), "
+            f"{result['seconds']:7.3f} s "
+            f"({result['seconds'] / baseline['seconds']:.1%})"
+        )
+    return results
 
-    # convert the network x graph to a graphviz graph
-    N = nx.nx_agraph.to_agraph(G)
 
-    # Class filter to go under the graph
-    # Get all nodes classes
-    allclasses = set()
-    for node in N.nodes():
-        nodeclasslist = eval(node.attr.get("all classes"))
-        if isinstance(nodeclasslist, list) or isinstance(nodeclasslist, set):
-            allclasses.update([e for e in nodeclasslist])
-    # build the filter items for the layout
-    allclasses_filter_radioitems = [{"value": ee, "label": ee} for ee in allclasses]
-    allclasses_filter_radioitems.append({"label": "None", "value": "none"})
+# unit vector to help with edge geometry (specifically drawing arrows)
+def unit_vector(v):
+    return v / np.linalg.norm(v)
 
-    # Node Property filter to go under the graph
-    # Get all nodes properties
-    allnodeproperties = set()
-    for node in G.nodes():
-        props = G.nodes.get(node).get("properties")
-        allnodeproperties.update(props.keys())
-    allnodeproperties_filter_radioitems = [
-        {"value": ee, "label": ee} for ee in allnodeproperties
-    ]
-    allnodeproperties_filter_radioitems.append({"label": "None", "value": "none"})
+
+def get_filtered_data(
+    N_node_details, N_edge_details, N, G, edge_type=None, index=None, viewport=None
+):
+    """
+    Nodes and edges to display for an edge type filter (None displays everything),
+    culled to the viewport (x0, x1, y0, y1) when one is given.
+
+    output: (node ids, edge ids) as positions in N_node_details and N_edge_details
+    """
+    if index is None:
+        index = FilterIndex(N_node_details, N_edge_details, G)
+    node_ids, edge_ids = index.filtered(edge_type)
+    return index.visible(node_ids, edge_ids, viewport)
+
+
+def get_layout_details(G, timings=None):
+    """
+    Lay out the graph with graphviz dot and parse the layout into node and edge details
+    that can be drawn with plotly. The drawing geometry (see geometry.py) is computed here,
+    once per layout, rather than on every figure callback.
+
+    input: G = networkx graph of the ontology
+           timings = PhaseTimings to record the to_agraph, layout, parse and geometry phases in
+    output: (N, N_node_details, N_edge_details) where N is the laid out graphviz graph
+    """
+    if timings is None:
+        timings = PhaseTimings()
+
+    # pos = nx.nx_agraph.graphviz_layout(G, prog='dot')
+
+    # convert the network x graph to a graphviz graph
+    with timings.phase("to_agraph"):
+        N = nx.nx_agraph.to_agraph(G)
 
     # change the graphviz graph settings to make the graph layout of edges and nodes as we want
-    N.edge_attr.update(splines="curved", directed=True)
-    N.layout(prog="dot")
+    with timings.phase("layout"):
+        N.edge_attr.update(splines="curved", directed=True)
+        N.layout(prog="dot")
+
+    parse_start = time.time()
 
     # output the graphviz graph layout details as a string file to parse and vizualize using native python plotly and dash
     f = (
@@ -405,6 +952,63 @@ def visualize(gpickle_file_path):
         }
         N_edge_details.append(edge_details)
 
+    timings.add("parse", parse_start, time.time())
+
+    # compute node outlines, edge splines and adornments once for this layout
+    with timings.phase("geometry"):
+        add_layout_geometry(N_node_details, N_edge_details)
+
+    return N, N_node_details, N_edge_details
+
+
+def visualize(
+    gpickle_file_path,
+    render_mode="batched",
+    webgl=False,
+    figure_cache_size=32,
+    lod_threshold=LOD_NODE_THRESHOLD,
+    metrics=None,
+):
+    """
+    Main function to run the dashboard to visualize the ontology.
+
+    input: gpickle_file_path = path to gpickle of the networkx graph of the ontology
+           render_mode = "batched" (few traces) or "per_element" (one trace per node/edge), see get_figure
+           webgl = render with go.Scattergl (batched render mode only)
+           figure_cache_size = number of rendered figures kept in the LRU figure cache
+           lod_threshold = draw less detail once more than this many nodes are on display
+                           (None always draws full detail)
+           metrics = serve Prometheus metrics on /metrics (see metrics.py). None reads the
+                     CLIMATEMIND_VISUALIZE_METRICS environment variable
+    output: app = Dash app object
+    """
+    metrics = DashboardMetrics(enabled=metrics_enabled(metrics))
+    timings = PhaseTimings()
+
+    # load in networkx graph to access graph information
+    with timings.phase("load"):
+        G = nx.read_gpickle(gpickle_file_path)
+    logger.info("%d nodes, %d edges", G.number_of_nodes(), G.number_of_edges())
+
+    N, N_node_details, N_edge_details = get_layout_details(G, timings=timings)
+
+    # lookup tables for the filters, built once so callbacks don't have to scan the graph
+    with timings.phase("filter index"):
+        index = FilterIndex(N_node_details, N_edge_details, G)
+
+    # Class filter to go under the graph
+    # build the filter items for the layout
+    allclasses_filter_radioitems = [
+        {"value": ee, "label": ee} for ee in index.classes()
+    ]
+    allclasses_filter_radioitems.append({"label": "None", "value": "none"})
+
+    # Node Property filter to go under the graph
+    allnodeproperties_filter_radioitems = [
+        {"value": ee, "label": ee} for ee in index.properties()
+    ]
+    allnodeproperties_filter_radioitems.append({"label": "None", "value": "none"})
+
     # divide the x and y coordinates into separate lists
     node_x_list = []
     node_y_list = []
@@ -417,8 +1021,76 @@ def visualize(gpickle_file_path):
     # https://plotly.com/python/shapes/
     # radio icons and dropdown menus
     # https://www.datacamp.com/community/tutorials/learn-build-dash-python
+    # rendered figures are kept in a bounded LRU cache keyed by the filter tuple.
+    # In batched render mode the class and property highlights are applied in the browser
+    # (see HIGHLIGHT_FIGURE_JS), so the server only renders one figure per edge type filter.
+    # Only the nodes and edges inside the current (snapped) viewport are sent to the browser,
+    # with less detail when many nodes are on display (see get_level_of_detail). Zoomed out
+    # figures depend on the highlights too, highlighted nodes are kept out of the clusters.
+    figure_cache = FigureCache(figure_cache_size)
+    metrics.add_figure_cache("figures", figure_cache)
+    clientside_highlights = render_mode == "batched"
+    bounds = get_layout_bounds(N, index)
+
+    def get_view(edge_type=None, relayout_data=None):
+        viewport = snap_viewport(get_viewport(relayout_data), bounds)
+        node_ids, _ = get_filtered_data(
+            N_node_details, N_edge_details, N, G, edge_type, index, viewport
+        )
+        return viewport, get_level_of_detail(len(node_ids), lod_threshold)
+
+    def render_figure(
+        edge_type=None,
+        node_class=None,
+        node_property=None,
+        extra_edge_type=None,
+        relayout_data=None,
+    ):
+        viewport, lod = get_view(edge_type, relayout_data)
+        if clientside_highlights and lod == LOD_FULL:
+            node_class = None
+            node_property = None
+
+        def render():
+            fig = get_figure(
+                N_node_details,
+                N_edge_details,
+                N,
+                G,
+                edge_type,
+                node_class,
+                node_property,
+                extra_edge_type,
+                render_mode=render_mode,
+                webgl=webgl,
+                index=index,
+                viewport=viewport,
+                lod=lod,
+            )
+            metrics.observe_figure(fig, render_mode)
+            return fig
+
+        return figure_cache.get(
+            (edge_type, node_class, node_property, extra_edge_type, viewport, lod), render
+        )
+
+    with timings.phase("initial figure"):
+        initial_figure = render_figure()
+    metrics.set_startup_timings(timings)
+    timings.log_summary()
+
+    stores = []
+    if clientside_highlights:
+        stores = [
+            dcc.Store(id="base-figure", data=initial_figure),
+            dcc.Store(
+                id="highlight-data", data=get_highlight_data(N_node_details, index)
+            ),
+        ]
+
     ################### START OF DASH APP ###################
     app = dash.Dash()
+    metrics.register(app.server)
 
     # NEED TO ADD HTML formating and maybe CSS
     app.layout = html.Div(
@@ -426,7 +1098,7 @@ def visualize(gpickle_file_path):
             html.H1(children="Climate Mind DiGraph"),
             dcc.Graph(
                 id="graph",
-                figure=get_figure(N_node_details, N_edge_details, N, G),
+                figure=initial_figure,
                 config=dict({"scrollZoom": True}),
             ),
             html.Div(
@@ -493,6 +1165,7 @@ def visualize(gpickle_file_path):
                 ],
             ),
         ]
+        + stores
     )
 
     @app.callback(
@@ -500,48 +1173,106 @@ def visualize(gpickle_file_path):
         [dash.dependencies.Input("graph", "clickData")],
     )
     def display_click_data(clickData):
-        return json.dumps(clickData, indent=2)
+        with metrics.time_callback("display_click_data"):
+            return json.dumps(clickData, indent=2)
 
-    @app.callback(
-        dash.dependencies.Output("graph", "figure"),
-        [
-            dash.dependencies.Input("edge-type-filter", "value"),
-            dash.dependencies.Input("node-class-filter", "value"),
-            dash.dependencies.Input("node-property-filter", "value"),
-            dash.dependencies.Input("node-extra-edge-type-filter", "value"),
-        ],
-    )
-    def display_click_data(edge_type, node_class, node_property, extra_edge_type):
-        print("display_click_data!")
-        if (
-            not edge_type
-            and not node_class
-            and not node_property
-            and not extra_edge_type
+    def relayout_triggered_without_viewport_change(relayout_data):
+        triggered = [t["prop_id"] for t in dash.callback_context.triggered]
+        return triggered == ["graph.relayoutData"] and not is_viewport_change(
+            relayout_data
+        )
+
+    if clientside_highlights:
+
+        @app.callback(
+            dash.dependencies.Output("base-figure", "data"),
+            [
+                dash.dependencies.Input("edge-type-filter", "value"),
+                dash.dependencies.Input("node-extra-edge-type-filter", "value"),
+                dash.dependencies.Input("node-class-filter", "value"),
+                dash.dependencies.Input("node-property-filter", "value"),
+                dash.dependencies.Input("graph", "relayoutData"),
+            ],
+        )
+        def update_base_figure(
+            edge_type, extra_edge_type, node_class, node_property, relayout_data
         ):
-            # Nothing has to happen.
-            # otherwise the callback is called in some load/init cases
-            raise dash.exceptions.PreventUpdate
-        if edge_type == "all":
-            edge_type = None
-        if node_class == "none":
-            node_class = None
-        if node_property == "none":
-            node_property = None
-        if extra_edge_type != "yes":
-            extra_edge_type = None
-        print(f"display_click_data! edge_type={edge_type}, node_class={node_class}")
-        return get_figure(
-            N_node_details,
-            N_edge_details,
-            N,
-            G,
-            edge_type,
-            node_class,
-            node_property,
-            extra_edge_type,
+            if not edge_type and not extra_edge_type:
+                # Nothing has to happen.
+                # otherwise the callback is called in some load/init cases
+                raise dash.exceptions.PreventUpdate
+            if relayout_triggered_without_viewport_change(relayout_data):
+                raise dash.exceptions.PreventUpdate
+            if edge_type == "all":
+                edge_type = None
+            if node_class == "none":
+                node_class = None
+            if node_property == "none":
+                node_property = None
+            triggered = {t["prop_id"] for t in dash.callback_context.triggered}
+            if (
+                triggered <= {"node-class-filter.value", "node-property-filter.value"}
+                and get_view(edge_type, relayout_data)[1] == LOD_FULL
+            ):
+                # full detail figures do not depend on the highlights
+                raise dash.exceptions.PreventUpdate
+            extra_edge_type = get_extra_edge_type(extra_edge_type)
+            with metrics.time_callback("update_base_figure"):
+                return render_figure(
+                    edge_type, node_class, node_property, extra_edge_type, relayout_data
+                )
+
+        # class and property highlights restyle the server figure in the browser
+        app.clientside_callback(
+            HIGHLIGHT_FIGURE_JS,
+            dash.dependencies.Output("graph", "figure"),
+            [
+                dash.dependencies.Input("base-figure", "data"),
+                dash.dependencies.Input("node-class-filter", "value"),
+                dash.dependencies.Input("node-property-filter", "value"),
+            ],
+            [dash.dependencies.State("highlight-data", "data")],
         )
 
+    else:
+
+        @app.callback(
+            dash.dependencies.Output("graph", "figure"),
+            [
+                dash.dependencies.Input("edge-type-filter", "value"),
+                dash.dependencies.Input("node-class-filter", "value"),
+                dash.dependencies.Input("node-property-filter", "value"),
+                dash.dependencies.Input("node-extra-edge-type-filter", "value"),
+                dash.dependencies.Input("graph", "relayoutData"),
+            ],
+        )
+        def display_click_data(
+            edge_type, node_class, node_property, extra_edge_type, relayout_data
+        ):
+            if (
+                not edge_type
+                and not node_class
+                and not node_property
+                and not extra_edge_type
+            ):
+                # Nothing has to happen.
+                # otherwise the callback is called in some load/init cases
+                raise dash.exceptions.PreventUpdate
+            if relayout_triggered_without_viewport_change(relayout_data):
+                raise dash.exceptions.PreventUpdate
+            if edge_type == "all":
+                edge_type = None
+            if node_class == "none":
+                node_class = None
+            if node_property == "none":
+                node_property = None
+            extra_edge_type = get_extra_edge_type(extra_edge_type)
+            logger.debug("update_figure edge_type=%s, node_class=%s", edge_type, node_class)
+            with metrics.time_callback("update_figure"):
+                return render_figure(
+                    edge_type, node_class, node_property, extra_edge_type, relayout_data
+                )
+
     return app
 
 
@@ -556,7 +1287,43 @@ def main(args):
     # load arguments
     gpickle_file_path = args.gpickle_file_path
 
-    app = visualize(gpickle_file_path=gpickle_file_path)
+    if args.benchmark:
+        benchmark_render_modes(gpickle_file_path)
+        return None
+
+    if args.static_output:
+        # headless mode: write static HTML snapshots instead of running the dashboard
+        from ontology_processing.visualize.static_snapshots import (
+            render_static_snapshots,
+        )
+
+        combinations = None
+        if args.combination:
+            combinations = [
+                (
+                    None if edge_type == "all" else edge_type,
+                    None if node_class == "none" else node_class,
+                )
+                for edge_type, node_class in args.combination
+            ]
+        render_static_snapshots(
+            gpickle_file_path,
+            args.static_output,
+            combinations=combinations,
+            all_combinations=args.all_combinations,
+            max_workers=args.workers,
+            webgl=args.webgl,
+        )
+        return None
+
+    app = visualize(
+        gpickle_file_path=gpickle_file_path,
+        render_mode=args.render_mode,
+        webgl=args.webgl,
+        figure_cache_size=args.figure_cache_size,
+        lod_threshold=None if args.lod_threshold <= 0 else args.lod_threshold,
+        metrics=True if args.metrics else None,
+    )
     return app
 
 
@@ -567,7 +1334,65 @@ if __name__ == "__main__":
     parser.add_argument(
         "gpickle_file_path", type=str, help="path to reference networkx gpickle object"
     )
+    parser.add_argument(
+        "--render-mode",
+        type=str,
+        choices=["batched", "per_element"],
+        default="batched",
+        help="batched draws the graph with a handful of traces, per_element with one trace per node and edge",
+    )
+    parser.add_argument(
+        "--webgl",
+        action="store_true",
+        help="render the batched traces with WebGL (go.Scattergl)",
+    )
+    parser.add_argument(
+        "--figure-cache-size",
+        type=int,
+        default=32,
+        help="number of rendered figures to keep in the LRU figure cache (0 disables it)",
+    )
+    parser.add_argument(
+        "--lod-threshold",
+        type=int,
+        default=LOD_NODE_THRESHOLD,
+        help="draw less detail (no labels, straight edges, collapsed clusters) once more than this many nodes are on display (0 disables it)",
+    )
+    parser.add_argument(
+        "--static-output",
+        type=str,
+        help="write static HTML snapshots and an index page to this folder instead of running the dashboard",
+    )
+    parser.add_argument(
+        "--combination",
+        nargs=2,
+        action="append",
+        metavar=("EDGE_TYPE", "CLASS"),
+        help="edge type filter ('all' for every edge) and class to highlight ('none' for no highlight) to render with --static-output. Can be repeated",
+    )
+    parser.add_argument(
+        "--all-combinations",
+        action="store_true",
+        help="with --static-output, render every edge type filter with every class highlight",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="number of worker processes used by --static-output (defaults to the number of CPUs)",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="serve Prometheus metrics on /metrics (also enabled by CLIMATEMIND_VISUALIZE_METRICS=1)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="print figure JSON size and build time for each render mode instead of running the dashboard",
+    )
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     app = main(args)
-    app.run(debug=False, host="0.0.0.0")
-    app.run_server(debug=False, host="0.0.0.0", port=8050)
+    if app is not None:
+        app.run(debug=False, host="0.0.0.0")
+        app.run_server(debug=False, host="0.0.0.0", port=8050)
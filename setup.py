@@ -17,7 +17,7 @@ setuptools.setup(
     ],
     packages=setuptools.find_packages(),
     scripts=['ontology_processing/process_new_ontology_file.py'],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=[
         'Brotli',
         'click',
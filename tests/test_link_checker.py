@@ -0,0 +1,199 @@
+"""
+Offline tests of the link checker against a local http.server stand-in.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import networkx as nx
+
+from ontology_processing.graph_creation.link_checker import LinkChecker, filter_dead_links
+
+TIMEOUT = 0.5
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _respond(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/alive":
+            self.send_response(200)
+        elif path == "/dead":
+            self.send_response(404)
+        elif path == "/gone":
+            self.send_response(410)
+        elif path == "/forbidden":
+            self.send_response(403)
+        elif path == "/rate-limited":
+            self.send_response(429)
+        elif path == "/bad-status-line":
+            self.wfile.write(b"not http\r\n\r\n")
+            self.close_connection = True
+            return
+        elif path == "/redirect":
+            self.send_response(301)
+            self.send_header("Location", "/alive")
+        elif path == "/redirect-dead":
+            self.send_response(302)
+            self.send_header("Location", "/dead")
+        elif path == "/redirect-gone":
+            self.send_response(302)
+            self.send_header("Location", "/gone")
+        elif path == "/no-head" and self.command == "HEAD":
+            self.send_response(405)
+        elif path == "/no-head":
+            self.send_response(200)
+        elif path == "/slow":
+            time.sleep(TIMEOUT * 4)
+            self.send_response(200)
+        else:
+            self.send_response(500)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class LinkCheckerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.folder.name, "link_cache.json")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def checker(self, **options):
+        options.setdefault("per_host_interval", 0)
+        return LinkChecker(cache_path=self.cache_path, timeout=TIMEOUT, **options)
+
+    def url(self, path):
+        return self.base + path
+
+    def test_alive_dead_redirect_and_timeout(self):
+        results = self.checker().check(
+            [
+                self.url(path)
+                for path in ("/alive", "/dead", "/redirect", "/redirect-dead", "/no-head", "/slow")
+            ]
+        )
+        self.assertEqual(
+            results,
+            {
+                self.url("/alive"): True,
+                self.url("/dead"): False,
+                self.url("/redirect"): True,
+                self.url("/redirect-dead"): False,
+                self.url("/no-head"): True,
+                self.url("/slow"): None,
+            },
+        )
+
+    def test_only_404_and_410_are_dead(self):
+        paths = (
+            "/gone",
+            "/redirect-gone",
+            "/forbidden",
+            "/rate-limited",
+            "/server-error",
+            "/bad-status-line",
+        )
+        results = self.checker().check([self.url(path) for path in paths])
+        self.assertEqual(
+            results,
+            {
+                self.url("/gone"): False,
+                self.url("/redirect-gone"): False,
+                self.url("/forbidden"): None,
+                self.url("/rate-limited"): None,
+                self.url("/server-error"): None,
+                self.url("/bad-status-line"): None,
+            },
+        )
+        self.assertEqual(
+            sorted(self.checker().cache), [self.url("/gone"), self.url("/redirect-gone")]
+        )
+
+    def test_only_answers_are_cached(self):
+        self.checker().check([self.url("/alive"), self.url("/dead"), self.url("/slow")])
+
+        cache = self.checker().cache
+        self.assertEqual(cache[self.url("/alive")]["status"], 200)
+        self.assertEqual(cache[self.url("/dead")]["status"], 404)
+        self.assertNotIn(self.url("/slow"), cache)
+
+    def test_cached_results_are_not_requested_again(self):
+        self.checker().check([self.url("/dead")])
+        checker = self.checker()
+        checker._request = None  # any request would fail
+        self.assertEqual(checker.check([self.url("/dead")]), {self.url("/dead"): False})
+
+    def test_unknown_entries_of_older_caches_are_rechecked(self):
+        checker = self.checker()
+        for status in (None, 503):
+            checker.cache[self.url("/alive")] = {
+                "alive": False,
+                "status": status,
+                "checked": time.time(),
+            }
+            self.assertEqual(
+                checker.check([self.url("/alive")]), {self.url("/alive"): True}
+            )
+
+    def test_filter_dead_links_keeps_unknown_urls(self):
+        G = nx.DiGraph()
+        G.add_node(
+            "solar panels",
+            **{"solution sources": [self.url("/alive"), self.url("/dead"), self.url("/slow")]},
+        )
+        removed = filter_dead_links(G, self.checker())
+
+        self.assertEqual(removed, [self.url("/dead")])
+        self.assertEqual(
+            G.nodes["solar panels"]["solution sources"],
+            [self.url("/alive"), self.url("/slow")],
+        )
+
+    def test_one_slow_host_does_not_hold_every_slot(self):
+        # many urls of a throttled host and one url of another host: the other host is
+        # checked right away instead of after the throttled ones
+        throttled = [self.url(f"/alive?{i}") for i in range(5)]
+        other = self.url("/alive").replace("127.0.0.1", "localhost")
+        start = time.perf_counter()
+        finished = {}
+
+        checker = self.checker(concurrency=2, per_host_interval=0.2)
+        request = checker._request
+
+        def timed_request(url):
+            status = request(url)
+            finished[url] = time.perf_counter() - start
+            return status
+
+        checker._request = timed_request
+        results = checker.check(throttled + [other])
+
+        self.assertTrue(all(results.values()))
+        self.assertLess(finished[other], min(finished[url] for url in throttled[1:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""
+Tests of the overlap reported by PhaseTimings.
+"""
+
+import unittest
+
+from ontology_processing.graph_creation.phase_timings import PhaseTimings
+
+
+class OverlapTest(unittest.TestCase):
+    def test_wait_phase_is_not_counted(self):
+        # edges extracted in another process while the ontology is loaded and reasoned,
+        # then the main process waits for them
+        timings = PhaseTimings()
+        timings.add("edge extraction (separate process)", 100.0, 110.0)
+        timings.add("load ontology", 100.0, 101.0)
+        timings.add("reasoning", 101.0, 104.0)
+        timings.add("wait for edge extraction", 104.0, 110.0, wait=True)
+        timings.add("build graph", 110.0, 112.0)
+
+        self.assertAlmostEqual(timings.overlap(), 4.0)
+        self.assertAlmostEqual(timings.wall_clock(), 12.0)
+        self.assertIn("overlap", timings.summary())
+
+    def test_sequential_phases_do_not_overlap(self):
+        timings = PhaseTimings()
+        timings.add("load ontology", 0.0, 1.0)
+        timings.add("reasoning", 1.0, 4.0)
+        self.assertEqual(timings.overlap(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests of the pre-flight check on small hand written ontology files.
+"""
+
+import os
+import tempfile
+import unittest
+
+from ontology_processing.graph_creation.preflight import check_ontology
+
+EX = "http://example.org/onto#"
+
+RDF_XML = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"
+         xmlns:owl="http://www.w3.org/2002/07/owl#"
+         xmlns:ex="http://example.org/onto#"
+         xml:base="http://example.org/onto">
+    <owl:ObjectProperty rdf:about="#causes">
+        <rdfs:label>causes or promotes</rdfs:label>
+    </owl:ObjectProperty>
+    <owl:ObjectProperty rdf:about="#inhibited">
+        <rdfs:label>is inhibited or prevented or blocked or slowed by</rdfs:label>
+    </owl:ObjectProperty>
+    <owl:DatatypeProperty rdf:about="#co2">
+        <rdfs:label>CO2 eq reduced</rdfs:label>
+    </owl:DatatypeProperty>
+    <owl:NamedIndividual rdf:about="#greenhouse">
+        <rdfs:label>increase in greenhouse effect</rdfs:label>
+    </owl:NamedIndividual>
+    <owl:NamedIndividual rdf:about="#fossil">
+        <rdfs:label>burning fossil fuels</rdfs:label>
+        <ex:causes rdf:resource="#greenhouse"/>
+        <ex:inhibited rdf:resource="#solar"/>
+        <ex:inhibited rdf:resource="#wind"/>
+    </owl:NamedIndividual>
+    <owl:NamedIndividual rdf:about="#solar">
+        <rdfs:label>solar panels</rdfs:label>
+        <ex:co2>42.3</ex:co2>
+    </owl:NamedIndividual>
+    <owl:NamedIndividual rdf:about="#wind">
+        <rdfs:label>wind turbines</rdfs:label>
+    </owl:NamedIndividual>
+</rdf:RDF>
+"""
+
+NTRIPLES = f'<{EX}greenhouse> <http://www.w3.org/2000/01/rdf-schema#label> "increase in greenhouse effect" .\n'
+
+TURTLE = f"""@prefix ex: <{EX}> .
+ex:greenhouse <http://www.w3.org/2000/01/rdf-schema#label> "increase in greenhouse effect" .
+"""
+
+
+class PreflightTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def write(self, file_name, text):
+        path = os.path.join(self.folder.name, file_name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_other_formats_are_skipped(self):
+        for file_name, text in (("onto.nt", NTRIPLES), ("onto.ttl", TURTLE)):
+            with self.assertLogs(
+                "ontology_processing.graph_creation.preflight", "WARNING"
+            ) as logs:
+                report = check_ontology(self.write(file_name, text))
+            self.assertTrue(report.ok)
+            self.assertEqual(report.num_entities, 0)
+            self.assertIn("not RDF/XML", logs.output[0])
+
+    def test_broken_xml_is_an_error(self):
+        report = check_ontology(
+            self.write("onto.owl", RDF_XML[:-20]), raise_on_error=False
+        )
+        self.assertTrue(any("not well-formed XML" in e for e in report.errors))
+
+    def test_mitigation_without_co2_eq_reduced(self):
+        report = check_ontology(self.write("onto.owl", RDF_XML), raise_on_error=False)
+        co2_warnings = [w for w in report.warnings if "CO2_eq_reduced" in w]
+        self.assertEqual(len(co2_warnings), 1)
+        self.assertIn("1 mitigation solution(s)", co2_warnings[0])
+        self.assertIn("wind turbines", co2_warnings[0])
+        self.assertNotIn("solar panels", co2_warnings[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Tests of loading graphs whose heavy attributes are kept in a side store.
+"""
+
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+import networkx as nx
+
+from ontology_processing.graph_creation.ontology_watcher import OntologyWatcher
+from ontology_processing.graph_creation.side_store import (
+    SIDE_STORE_FILE_NAME,
+    LazyValue,
+    move_to_side_store,
+    read_graph_with_side_store,
+    resolve,
+)
+
+
+def write_lazy_graph(onto_path, output_folder_path, **options):
+    G = nx.DiGraph()
+    G.add_node(
+        "solar panels",
+        comment="Panels that turn sunlight into electricity.",
+        properties={"dc_source": ["https://www.drawdown.org/"]},
+    )
+    move_to_side_store(G, os.path.join(output_folder_path, SIDE_STORE_FILE_NAME))
+    with open(os.path.join(output_folder_path, "Climate_Mind_DiGraph.gpickle"), "wb") as f:
+        pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return G
+
+
+class SideStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.input_folder = os.path.join(self.folder.name, "exports")
+        self.output_folder = os.path.join(self.folder.name, "output")
+        os.makedirs(self.input_folder)
+        self.onto_path = os.path.join(self.input_folder, "onto.owl")
+        with open(self.onto_path, "w") as f:
+            f.write("<rdf:RDF/>")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def publish(self):
+        watcher = OntologyWatcher(self.input_folder, self.output_folder, write_lazy_graph)
+        version_folder = watcher.process_file(self.onto_path)
+        return os.path.join(version_folder, "Climate_Mind_DiGraph.gpickle")
+
+    def test_plain_load_of_a_published_version(self):
+        with open(self.publish(), "rb") as f:
+            G = pickle.load(f)
+        self.assertEqual(
+            G.nodes["solar panels"]["comment"],
+            "Panels that turn sunlight into electricity.",
+        )
+
+    def test_lazy_values_to_json(self):
+        G = read_graph_with_side_store(self.publish())
+        properties = G.nodes["solar panels"]["properties"]
+        self.assertIsInstance(properties, LazyValue)
+        self.assertEqual(
+            json.loads(json.dumps(properties, default=resolve)),
+            {"dc_source": ["https://www.drawdown.org/"]},
+        )
+
+    def test_eager_load(self):
+        G = read_graph_with_side_store(self.publish(), lazy=False)
+        self.assertIsInstance(G.nodes["solar panels"]["comment"], str)
+        self.assertIsInstance(G.nodes["solar panels"]["properties"], dict)
+        self.assertNotIn("side store", G.graph)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests of the dashboard figure helpers on a small laid out graph.
+"""
+
+import unittest
+
+import networkx as nx
+
+from ontology_processing.visualize.filter_index import FilterIndex
+from ontology_processing.visualize.visualize import (
+    LOD_COARSE,
+    LOD_FULL,
+    LOD_NODE_THRESHOLD,
+    get_batched_figure,
+    get_extra_edge_type,
+    get_layout_details,
+    get_level_of_detail,
+    get_node_style,
+)
+
+
+def small_graph():
+    G = nx.DiGraph()
+    for name in ("burning fossil fuels", "greenhouse effect", "coal mining"):
+        G.add_node(name, **{"all classes": ["test class"], "properties": {}})
+    G.add_edge("burning fossil fuels", "greenhouse effect", type="causes_or_promotes")
+    G.add_edge("coal mining", "burning fossil fuels", type="is_contributed_to_by")
+    return G
+
+
+class ExtraEdgeTypeHighlightTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.G = small_graph()
+        cls.N, cls.N_node_details, cls.N_edge_details = get_layout_details(cls.G)
+        cls.index = FilterIndex(cls.N_node_details, cls.N_edge_details, cls.G)
+        cls.node_id = next(
+            node_id
+            for node_id, details in enumerate(cls.N_node_details)
+            if details["name"] == "coal mining"
+        )
+
+    def test_checklist_value(self):
+        self.assertEqual(get_extra_edge_type(["yes"]), "yes")
+        self.assertIsNone(get_extra_edge_type([]))
+        self.assertIsNone(get_extra_edge_type(None))
+
+    def test_ticked_box_highlights_node(self):
+        fillcolor, line_color, _ = get_node_style(
+            self.node_id, self.index, extra_edge_type=get_extra_edge_type(["yes"])
+        )
+        self.assertEqual((fillcolor, line_color), ("orange", "orange"))
+
+        fillcolor, line_color, _ = get_node_style(
+            self.node_id, self.index, extra_edge_type=get_extra_edge_type([])
+        )
+        self.assertEqual((fillcolor, line_color), (None, "black"))
+
+    def test_ticked_box_draws_orange_trace(self):
+        def fillcolors(checklist_value):
+            fig = get_batched_figure(
+                self.N_node_details,
+                self.N_edge_details,
+                self.N,
+                self.G,
+                extra_edge_type=get_extra_edge_type(checklist_value),
+                index=self.index,
+            )
+            return {trace.fillcolor for trace in fig.data if len(trace.x)}
+
+        self.assertIn("orange", fillcolors(["yes"]))
+        self.assertNotIn("orange", fillcolors([]))
+
+
+class LevelOfDetailTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.G = nx.DiGraph()
+        names = [f"policy {i}" for i in range(6)]
+        for i, name in enumerate(names):
+            classes = ["policy", "highlighted"] if i < 2 else ["policy"]
+            cls.G.add_node(
+                name,
+                **{"direct classes": ["policy"], "all classes": classes, "properties": {}},
+            )
+        for name_a, name_b in zip(names, names[1:]):
+            cls.G.add_edge(name_a, name_b, type="causes_or_promotes")
+        cls.N, cls.N_node_details, cls.N_edge_details = get_layout_details(cls.G)
+        cls.index = FilterIndex(cls.N_node_details, cls.N_edge_details, cls.G)
+
+    def test_small_graphs_are_drawn_in_full_detail(self):
+        self.assertEqual(get_level_of_detail(self.G.number_of_nodes()), LOD_FULL)
+        self.assertEqual(get_level_of_detail(LOD_NODE_THRESHOLD + 1), LOD_COARSE)
+        self.assertEqual(get_level_of_detail(10 ** 6, lod_threshold=None), LOD_FULL)
+
+    def cluster_sizes(self, node_class=None):
+        fig = get_batched_figure(
+            self.N_node_details,
+            self.N_edge_details,
+            self.N,
+            self.G,
+            node_class=node_class,
+            index=self.index,
+            # a view so wide that every node falls in one cluster cell
+            viewport=(-1e5, 1e5, -1e5, 1e5),
+            lod=LOD_COARSE,
+        )
+        return [
+            hovertemplate.split(" nodes</b>")[0].replace("<b>", "")
+            for trace in fig.data
+            if trace.hovertemplate is not None and not isinstance(trace.hovertemplate, str)
+            for hovertemplate in trace.hovertemplate
+            if "nodes</b> of class" in hovertemplate
+        ]
+
+    def test_highlighted_nodes_are_not_clustered(self):
+        self.assertEqual(self.cluster_sizes(), ["6"])
+        self.assertEqual(self.cluster_sizes("highlighted"), ["4"])
+
+
+if __name__ == "__main__":
+    unittest.main()